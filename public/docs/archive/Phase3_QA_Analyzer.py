@@ -2,21 +2,45 @@
 """
 Phase 3 Recursive Quality Assurance Analyzer
 Runs all 8 quality gates across all 4 languages
+
+Courses are found through the course registry (scripts/course_registry.py)
+rather than fixed paths: each course's LEGO_BREAKDOWNS_COMPLETE.json is
+used when present, otherwise its lego_pairs.json is converted to the same
+breakdown shape. lego_pairs.json lists overlapping LEGOs (atomic pieces,
+M composites built from them, repeats), so the conversion keeps only the
+LEGOs that tile the seed.
+
+Each language is loaded and checked in its own worker process; workers
+send back their gate results plus a compact per-seed summary, and the
+cross-language gate 4 runs as a join over those summaries.
+
+Usage:
+  python3 Phase3_QA_Analyzer.py [--courses ita_for_eng spa_for_eng ...] [--seeds S0001-S0100]
+                                [--output results.json] [--workers N]
 """
 
 import json
 import re
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from collections import defaultdict
+from difflib import SequenceMatcher
+from math import isnan, nan, sqrt
 
-# Language file paths
-LANG_PATHS = {
-    'Italian': '/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/vfs/courses/ita_for_eng_30seeds/LEGO_BREAKDOWNS_COMPLETE.json',
-    'Spanish': '/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/vfs/courses/spa_for_eng_30seeds/LEGO_BREAKDOWNS_COMPLETE.json',
-    'French': '/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/vfs/courses/fra_for_eng_30seeds/LEGO_BREAKDOWNS_COMPLETE.json',
-    'Mandarin': '/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/vfs/courses/cmn_for_eng_30seeds/LEGO_BREAKDOWNS_COMPLETE.json'
-}
+REPO_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+from course_registry import CourseRegistry, format_seed_ranges, parse_seed_ranges, seed_in_ranges
+
+# Courses checked when none are given
+DEFAULT_COURSES = ['ita_for_eng', 'spa_for_eng', 'fra_for_eng', 'cmn_for_eng']
+DEFAULT_OUTPUT = REPO_ROOT / 'docs' / 'Phase3_QA_Iteration_01_Results.json'
+
+# Course artifacts the analyzer can read, in order of preference
+BREAKDOWN_ARTIFACTS = ['lego_breakdowns', 'lego_pairs']
 
 # Romance language glue words
 GLUE_WORDS = {
@@ -50,73 +74,591 @@ IRON_RULE_FORBIDDEN = {
     }
 }
 
+# Word lists used by the FD and FEEDER heuristics
+GENDERED_PRONOUNS = frozenset(['he', 'she', 'his', 'her', 'him'])
+GENERIC_KNOWN_WORDS = frozenset(['the', 'a', 'to', 'of', 'in', 'with'])
+TRIVIAL_FEEDER_WORDS = frozenset(['the', 'a', 'an', 'to', 'of'])
+MODAL_PREFIXES = ("I want", "I'd like", "We want", "You want")
+
+# Punctuation the tiling test ignores, removed with a single translate()
+TILING_TABLE = str.maketrans('', '', '.?!,;:¿¡。？！，、；：')
+# Punctuation fd_key drops; FD keys keep the commas and CJK marks the tiling test ignores
+FD_KEY_TABLE = str.maketrans('', '', '.?!')
+# Languages written without spaces between words; the tiling test compares characters
+UNSPACED_LANGUAGES = frozenset(['Mandarin', 'Chinese', 'Japanese'])
+# Joins texts for one bulk translate(); neither the table nor str.split() touches it
+BULK_SEPARATOR = '\x00'
+
+# Gate 4 flags seeds whose per-language z-scores spread by at least this much
+DEFAULT_GATE4_THRESHOLD = 2.5
+
+
+def resolve_languages(registry: CourseRegistry, patterns: List[str] = None) -> Dict[str, str]:
+    """
+    {language name: breakdown file} for the selected courses
+
+    One course per target language: the rule tables and gate 4 are keyed
+    by language, so two courses teaching the same language are an error.
+    """
+    languages = {}
+    codes = {}
+    for course in registry.select(patterns or DEFAULT_COURSES):
+        path = next((course.artifact_path(name) for name in BREAKDOWN_ARTIFACTS if name in course.artifacts), None)
+        if path is None:
+            continue
+        lang_name = course.target_name
+        if lang_name in languages:
+            raise ValueError(f"Both {codes[lang_name]} and {course.code} teach {lang_name}; "
+                             f"select one of them with --courses")
+        languages[lang_name] = str(path)
+        codes[lang_name] = course.code
+    return languages
+
+
+def is_spaced(lang_name: str) -> bool:
+    return lang_name not in UNSPACED_LANGUAGES
+
+
+def split_tiling(normalized: str, spaced: bool = True) -> List[str]:
+    """Words of a normalized text, or its characters for unspaced languages"""
+    return normalized.split() if spaced else [c for c in normalized if not c.isspace()]
+
+
+def tiling_tokens(text: str, spaced: bool = True) -> List[str]:
+    """Tokens the tiling test compares: TILING_TABLE punctuation dropped, case-folded"""
+    return split_tiling(text.translate(TILING_TABLE).lower(), spaced)
+
+
+def tile_seed(seed_tokens: List[str], legos: List[dict], spaced: bool = True) -> List[dict]:
+    """
+    The LEGOs that tile a seed, in seed order
+
+    Picks the tiling that covers the most seed tokens and, among those,
+    uses the most LEGOs - so an M composite loses to the pieces it is made
+    of, and a repeated chunk is only placed once per span. Seed text no
+    LEGO covers is left out, for gate 8 to report as missing.
+    """
+    pieces = {}
+    for lego in legos:
+        tokens = tuple(tiling_tokens(lego.get('lego', {}).get('target', ''), spaced))
+        if tokens:
+            pieces.setdefault(tokens[0], {}).setdefault(tokens, lego)
+
+    # best[i]: (tokens covered, LEGOs used, (tokens, lego) placed at i) for seed_tokens[i:]
+    n = len(seed_tokens)
+    best = [(0, 0, None)] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        covered, used, _ = best[i + 1]
+        best[i] = (covered, used, None)
+        for tokens, lego in pieces.get(seed_tokens[i], {}).items():
+            end = i + len(tokens)
+            if end <= n and tuple(seed_tokens[i:end]) == tokens:
+                covered, used, _ = best[end]
+                option = (covered + len(tokens), used + 1, (tokens, lego))
+                if option[:2] > best[i][:2]:
+                    best[i] = option
+
+    tiling, i = [], 0
+    while i < n:
+        placed = best[i][2]
+        if placed is None:
+            i += 1
+        else:
+            tiling.append(placed[1])
+            i += len(placed[0])
+    return tiling
+
+
+def breakdowns_from_lego_pairs(data: dict, spaced: bool = True) -> dict:
+    """Convert a lego_pairs.json course file to the LEGO_BREAKDOWNS shape the gates read"""
+    breakdowns = []
+    for seed in data.get('seeds', []):
+        seed_pair = seed.get('seed_pair') or {}
+        if isinstance(seed_pair, dict):
+            known, target = seed_pair.get('known', ''), seed_pair.get('target', '')
+        else:
+            # Older files store [target, known]
+            target, known = (list(seed_pair) + ['', ''])[:2]
+
+        breakdowns.append({
+            'seed_id': seed['seed_id'],
+            'original_known': known,
+            'original_target': target,
+            'lego_pairs': [{
+                'lego_id': lego.get('id', ''),
+                'lego_type': lego.get('type', ''),
+                'target_chunk': lego.get('lego', {}).get('target', ''),
+                'known_chunk': lego.get('lego', {}).get('known', '')
+            } for lego in tile_seed(tiling_tokens(target, spaced), seed.get('legos', []), spaced)],
+            'feeder_pairs': [],
+            'componentization': []
+        })
+    return {'lego_breakdowns': breakdowns}
+
+
+def load_breakdowns(path: str, seed_ranges: Optional[List[Tuple[int, int]]] = None,
+                    spaced: bool = True) -> dict:
+    """Load a course's LEGO breakdowns (either file format), limited to seed_ranges"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'lego_breakdowns' not in data:
+        data = breakdowns_from_lego_pairs(data, spaced)
+    if seed_ranges is not None:
+        data = dict(data, lego_breakdowns=[seed for seed in data['lego_breakdowns']
+                                           if seed_in_ranges(seed['seed_id'], seed_ranges)])
+    return data
+
+
+def compile_rule_tables(iron_rule_forbidden: Dict[str, Dict[str, List[str]]],
+                        glue_words: Dict[str, List[str]]) -> Tuple[dict, dict]:
+    """
+    Compile the rule tables for constant-time lookups
+
+    Returns (forbidden, glue):
+      forbidden[lang] maps each forbidden word to the tuple of categories
+      it belongs to (in table order); glue[lang] is a frozenset.
+    """
+    forbidden = {}
+    for lang_name, categories in iron_rule_forbidden.items():
+        reverse = defaultdict(tuple)
+        for category, words in categories.items():
+            for word in words:
+                reverse[word.lower()] += (category,)
+        forbidden[lang_name] = dict(reverse)
+
+    glue = {lang_name: frozenset(word.lower() for word in words)
+            for lang_name, words in glue_words.items()}
+
+    return forbidden, glue
+
+
+class Chunk(NamedTuple):
+    """A target/known chunk, tokenized once and shared by every gate"""
+    text: str
+    lower: str
+    stripped: str
+    words: List[str]
+    lower_words: List[str]
+
+
+def tokenize_chunk(text: str) -> Chunk:
+    lower = text.lower()
+    return Chunk(text, lower, text.strip(), text.split(), lower.split())
+
+
+def translate_all(texts: List[str], table: dict) -> List[str]:
+    """Translate many strings with one str.translate() call"""
+    if not texts:
+        return []
+    joined = BULK_SEPARATOR.join(texts)
+    if joined.count(BULK_SEPARATOR) != len(texts) - 1:
+        # A text contains the separator itself
+        return [text.translate(table) for text in texts]
+    return joined.translate(table).split(BULK_SEPARATOR)
+
+
+def diagnose_tiling(expected: List[str], found: List[str], owners: List[int], legos: List[dict],
+                    spaced: bool = True) -> dict:
+    """
+    Where a seed's LEGO tiling diverges from the seed
+
+    expected/found are the normalized tokens of the seed and of the joined
+    LEGO chunks; owners[i] is the index of the LEGO that found[i] came from.
+    Reports the first divergent token offset and what differs there:
+    missing text (in the seed, not covered by any LEGO), extra or
+    mismatched LEGO chunks, or chunks in the wrong order.
+    """
+    offset = next((i for i, (a, b) in enumerate(zip(expected, found)) if a != b), min(len(expected), len(found)))
+    diagnosis = {
+        'divergence_offset': offset,
+        'expected_token': expected[offset] if offset < len(expected) else None,
+        'found_token': found[offset] if offset < len(found) else None
+    }
+
+    def chunks_at(start: int, end: int) -> List[dict]:
+        indexes = list(dict.fromkeys(owners[start:end]))
+        return [{'lego_id': legos[i].get('lego_id'), 'target_chunk': legos[i]['target_chunk']} for i in indexes]
+
+    if sorted(expected) == sorted(found):
+        diagnosis['divergence'] = 'reordered'
+        diagnosis['misplaced_chunks'] = chunks_at(offset, offset + 1)
+        return diagnosis
+
+    tag, i1, i2, j1, j2 = next(op for op in SequenceMatcher(None, expected, found, autojunk=False).get_opcodes()
+                               if op[0] != 'equal')
+    diagnosis['divergence'] = {'delete': 'missing', 'insert': 'extra'}.get(tag, 'mismatch')
+    if i2 > i1:
+        diagnosis['missing_text'] = (' ' if spaced else '').join(expected[i1:i2])
+    if j2 > j1:
+        diagnosis['extra_chunks'] = chunks_at(j1, j2)
+    return diagnosis
+
+
+def check_tiling(seeds: List[dict], spaced: bool = True) -> List[dict]:
+    """
+    Tiling test over a whole language in bulk
+
+    Seeds and LEGO chunks are normalized with one translate() call each
+    (TILING_TABLE punctuation dropped) and case-folded; seeds whose token
+    sequences match are passed with a list comparison, and only failures
+    are diagnosed.
+    """
+    originals = translate_all([seed['original_target'] for seed in seeds], TILING_TABLE)
+    chunk_texts = iter(translate_all([lego['target_chunk'] for seed in seeds for lego in seed.get('lego_pairs', [])],
+                                     TILING_TABLE))
+    joiner = ' ' if spaced else ''
+
+    failures = []
+    for seed, original in zip(seeds, originals):
+        legos = seed.get('lego_pairs', [])
+        chunks = [next(chunk_texts) for _ in legos]
+
+        expected = split_tiling(original.lower(), spaced)
+        found, owners = [], []
+        for index, text in enumerate(chunks):
+            tokens = split_tiling(text.lower(), spaced)
+            found += tokens
+            owners += [index] * len(tokens)
+
+        if found == expected:
+            continue
+
+        failure = {
+            'seed_id': seed['seed_id'],
+            'original': original.strip(),
+            'reconstructed': joiner.join(chunk.strip() for chunk in chunks),
+            'issue': 'Tiling mismatch - LEGOs don\'t reconstruct seed',
+            'severity': 'HIGH'
+        }
+        failure.update(diagnose_tiling(expected, found, owners, legos, spaced))
+        failures.append(failure)
+
+    return failures
+
+
+def fd_key(text: str) -> str:
+    """Lookup key for FD: case-folded, whitespace collapsed, .?! dropped"""
+    return ' '.join(text.translate(FD_KEY_TABLE).lower().split())
+
+
+def fd_collisions(seeds: List[dict]) -> List[dict]:
+    """
+    Functional determinism over a whole course, in one pass over its LEGOs
+
+    Builds known → {target → LEGO ids} and target → {known → LEGO ids}
+    (keys normalized with fd_key, variants listed by first occurrence).
+    Every known chunk with more than one target, and every target chunk
+    with more than one known, is a collision: the FD loop
+    target → known → target can't come back to the same chunk.
+    """
+    known_index = defaultdict(dict)
+    target_index = defaultdict(dict)
+    # First spelling seen for each normalized chunk, and where it was seen
+    spelling = {}
+    first_seen = {}
+
+    for seed in seeds:
+        for lego in seed.get('lego_pairs', []):
+            target, known = lego['target_chunk'], lego['known_chunk']
+            target_key, known_key = fd_key(target), fd_key(known)
+            if not target_key or not known_key:
+                continue
+            spelling.setdefault(('target', target_key), target)
+            spelling.setdefault(('known', known_key), known)
+            first_seen.setdefault(('target', target_key), (seed['seed_id'], lego['lego_id']))
+            first_seen.setdefault(('known', known_key), (seed['seed_id'], lego['lego_id']))
+            known_index[known_key].setdefault(target_key, []).append(lego['lego_id'])
+            target_index[target_key].setdefault(known_key, []).append(lego['lego_id'])
+
+    collisions = []
+    for direction, index, side, other in (('known_to_target', known_index, 'known', 'target'),
+                                          ('target_to_known', target_index, 'target', 'known')):
+        for key, variants in index.items():
+            if len(variants) < 2:
+                continue
+            seed_id, lego_id = first_seen[(side, key)]
+            variant_texts = [spelling[(other, variant)] for variant in variants]
+            collisions.append({
+                'seed_id': seed_id,
+                'lego_id': lego_id,
+                side: spelling[(side, key)],
+                other: ' | '.join(variant_texts),
+                'issue': f"FD collision: {side} maps to {len(variants)} different {other} chunks",
+                'severity': 'CRITICAL',
+                'direction': direction,
+                'collisions': [{other: spelling[(other, variant)], 'lego_ids': lego_ids}
+                               for variant, lego_ids in variants.items()]
+            })
+
+    return collisions
+
+
+class SeedSummary(NamedTuple):
+    """What gate 4 needs to know about one seed in one language"""
+    lego_count: int
+    # Mean characters (whitespace excluded) per LEGO target chunk
+    chunk_length: float
+    # Share of M-type (molecular) LEGOs; nan when the LEGOs carry no type
+    molecular_share: float
+    known: str
+
+
+def summarize_seed(seed: dict) -> SeedSummary:
+    legos = seed.get('lego_pairs', [])
+    types = [lego.get('lego_type') or lego.get('type') for lego in legos]
+    typed = [t for t in types if t]
+    lengths = [len(''.join(lego['target_chunk'].split())) for lego in legos]
+    return SeedSummary(
+        len(legos),
+        sum(lengths) / len(lengths) if lengths else 0.0,
+        sum(1 for t in typed if t.upper().startswith('M')) / len(typed) if typed else nan,
+        seed['original_known']
+    )
+
+
+class AlignmentMatrix:
+    """
+    Seed × language matrix of decomposition metrics for gate 4
+
+    Each metric is one flat array('d') in row-major order (seed, language);
+    nan marks a seed a language doesn't have. Metrics are standardized per
+    language (column z-scores) so languages with different chunk scales -
+    Mandarin characters vs Romance words - are comparable, and a seed's
+    inconsistency is the spread of its z-scores across languages.
+    """
+
+    METRICS = ('lego_count', 'chunk_length', 'molecular_share')
+
+    def __init__(self, summaries: Dict[str, Dict[str, SeedSummary]]):
+        self.languages = list(summaries)
+        self.seeds = list(dict.fromkeys(seed_id for lang in self.languages for seed_id in summaries[lang]))
+        self.known = {}
+
+        width = len(self.languages)
+        rows = {seed_id: i for i, seed_id in enumerate(self.seeds)}
+        self.columns = {metric: array('d', [nan]) * (len(self.seeds) * width) for metric in self.METRICS}
+
+        for j, lang in enumerate(self.languages):
+            for seed_id, summary in summaries[lang].items():
+                cell = rows[seed_id] * width + j
+                for metric in self.METRICS:
+                    self.columns[metric][cell] = getattr(summary, metric)
+                self.known.setdefault(seed_id, summary.known)
+
+    def value(self, metric: str, seed_index: int, lang_index: int) -> float:
+        return self.columns[metric][seed_index * len(self.languages) + lang_index]
+
+    def standardized(self, metric: str) -> array:
+        """Per-language z-scores of a metric (nan stays nan; a constant language scores 0)"""
+        values = self.columns[metric]
+        width = len(self.languages)
+        scores = array('d', values)
+
+        for j in range(width):
+            column = [v for v in values[j::width] if not isnan(v)]
+            if not column:
+                continue
+            mean = sum(column) / len(column)
+            std = sqrt(sum((v - mean) ** 2 for v in column) / len(column))
+            for cell in range(j, len(values), width):
+                if not isnan(values[cell]):
+                    scores[cell] = (values[cell] - mean) / std if std else 0.0
+
+        return scores
+
+    def rank_outliers(self, threshold: float = DEFAULT_GATE4_THRESHOLD) -> List[dict]:
+        """
+        Seeds whose languages disagree, most inconsistent first
+
+        A seed's score for a metric is max z - min z over the languages that
+        have it (at least two); its overall score is the worst metric's.
+        The outlier language is the one furthest from the seed's mean z (with
+        two languages, the one with the larger |z|).
+        """
+        width = len(self.languages)
+        standardized = {metric: self.standardized(metric) for metric in self.METRICS}
+        ranked = []
+
+        for i, seed_id in enumerate(self.seeds):
+            worst = None
+            for metric, scores in standardized.items():
+                row = [(scores[i * width + j], j) for j in range(width) if not isnan(scores[i * width + j])]
+                if len(row) < 2:
+                    continue
+                spread = max(row)[0] - min(row)[0]
+                if worst is None or spread > worst[0]:
+                    worst = (spread, metric, row)
+
+            if worst is None or worst[0] < threshold:
+                continue
+
+            spread, metric, row = worst
+            present = [k for _, k in sorted(row, key=lambda item: item[1])]
+            mean = sum(z for z, _ in row) / len(row)
+            if len(row) == 2:
+                # Both are equally far from the mean; blame the one further from its own language's norm
+                z, j = max(row, key=lambda item: abs(item[0]))
+            else:
+                z, j = max(row, key=lambda item: abs(item[0] - mean))
+            outlier = self.languages[j]
+            direction = 'high' if z > mean else 'low'
+            ranked.append({
+                'seed_id': seed_id,
+                'known': self.known[seed_id],
+                'score': round(spread, 3),
+                'metric': metric,
+                'outlier_language': outlier,
+                'direction': direction,
+                'lego_counts': {self.languages[k]: int(self.value('lego_count', i, k)) for k in present},
+                'z_scores': {self.languages[k]: round(standardized[metric][i * width + k], 3) for k in present},
+                'issue': f"{outlier} {metric.replace('_', ' ')} is unusually {direction} for this seed "
+                         f"compared with the other languages",
+                'severity': 'MEDIUM'
+            })
+
+        ranked.sort(key=lambda finding: -finding['score'])
+        for rank, finding in enumerate(ranked, 1):
+            finding['rank'] = rank
+        return ranked
+
+
+class GateEngine:
+    """
+    Single-traversal gate runner
+
+    Gates register per-LEGO, per-FEEDER and per-seed visitors; run() walks
+    a language's lego_breakdowns once and hands every item to all of them.
+    Each distinct chunk text is tokenized once and the Chunk is shared.
+    Bulk visitors get the whole seed list once instead.
+
+    Visitors append their findings to the list they are given:
+      lego(out, lang_name, seed_id, lego, target: Chunk, known: Chunk)
+      feeder(out, lang_name, seed_id, feeder, target: Chunk, known: Chunk)
+      seed(out, lang_name, seed)
+      bulk(out, lang_name, seeds)
+    """
 
-class QualityGateAnalyzer:
     def __init__(self):
+        self.gates = []
+        self.visitors = {'lego': [], 'feeder': [], 'seed': [], 'bulk': []}
+
+    def register(self, gate_name: str, lego=None, feeder=None, seed=None, bulk=None):
+        self.gates.append(gate_name)
+        for kind, visit in (('lego', lego), ('feeder', feeder), ('seed', seed), ('bulk', bulk)):
+            if visit is not None:
+                self.visitors[kind].append((gate_name, visit))
+
+    def run(self, lang_name: str, data: dict, gates: List[str] = None) -> Dict[str, List[dict]]:
+        """Run the registered gates (or just `gates`) in one pass; findings per gate"""
+        results = {gate_name: [] for gate_name in self.gates if gates is None or gate_name in gates}
+        lego_visitors = [(results[g], visit) for g, visit in self.visitors['lego'] if g in results]
+        feeder_visitors = [(results[g], visit) for g, visit in self.visitors['feeder'] if g in results]
+        seed_visitors = [(results[g], visit) for g, visit in self.visitors['seed'] if g in results]
+        bulk_visitors = [(results[g], visit) for g, visit in self.visitors['bulk'] if g in results]
+
+        chunks = {}
+
+        def chunk(text: str) -> Chunk:
+            tokens = chunks.get(text)
+            if tokens is None:
+                tokens = chunks[text] = tokenize_chunk(text)
+            return tokens
+
+        for seed in data['lego_breakdowns']:
+            seed_id = seed['seed_id']
+
+            for out, visit in seed_visitors:
+                visit(out, lang_name, seed)
+
+            if lego_visitors:
+                for lego in seed.get('lego_pairs', []):
+                    target, known = chunk(lego['target_chunk']), chunk(lego['known_chunk'])
+                    for out, visit in lego_visitors:
+                        visit(out, lang_name, seed_id, lego, target, known)
+
+            if feeder_visitors:
+                for feeder in seed.get('feeder_pairs', []):
+                    target, known = chunk(feeder['target_chunk']), chunk(feeder['known_chunk'])
+                    for out, visit in feeder_visitors:
+                        visit(out, lang_name, seed_id, feeder, target, known)
+
+        for out, visit in bulk_visitors:
+            visit(out, lang_name, data['lego_breakdowns'])
+
+        return results
+
+
+class QualityGateAnalyzer:
+    def __init__(self, gate4_threshold: float = DEFAULT_GATE4_THRESHOLD):
+        self.gate4_threshold = gate4_threshold
         self.violations = defaultdict(list)
         self.stats = defaultdict(int)
         self.patterns = []
-
-    def load_language_data(self, lang_name: str) -> dict:
+        self.forbidden_words, self.glue_words = compile_rule_tables(IRON_RULE_FORBIDDEN, GLUE_WORDS)
+        self.engine = self._build_engine()
+
+    def _build_engine(self) -> GateEngine:
+        """Register every per-language gate's visitors (gate 4 compares languages separately)"""
+        engine = GateEngine()
+        engine.register('gate1_fd_loop', lego=self._visit_fd_loop, bulk=self._check_fd_index)
+        engine.register('gate2_iron_rule', lego=self._visit_iron_rule)
+        engine.register('gate3_glue_words', lego=self._visit_glue_words)
+        engine.register('gate5_chunk_up', lego=self._visit_chunk_up)
+        engine.register('gate6_feeders', feeder=self._visit_feeder)
+        engine.register('gate7_hierarchy', seed=self._visit_hierarchy)
+        engine.register('gate8_tiling', bulk=self._check_tiling)
+        return engine
+
+    def load_language_data(self, path: str, seed_ranges: Optional[List[Tuple[int, int]]] = None,
+                           spaced: bool = True) -> dict:
         """Load LEGO breakdown JSON for a language"""
-        with open(LANG_PATHS[lang_name], 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_breakdowns(path, seed_ranges, spaced)
 
     def gate1_fd_loop_validation(self, lang_name: str, data: dict) -> List[dict]:
         """
         GATE 1: FD_LOOP Validation
         Test: target → known → target = IDENTICAL
         100% pass rate required
-        """
-        violations = []
 
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-
-            for lego in seed.get('lego_pairs', []):
-                lego_id = lego['lego_id']
-                target = lego['target_chunk']
-                known = lego['known_chunk']
-
-                # Check for gender/context violations
-                if self._has_gender_context_issue(known):
-                    violations.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego_id,
-                        'target': target,
-                        'known': known,
-                        'issue': 'Gender/pronoun in known (not context-neutral)',
-                        'severity': 'CRITICAL'
-                    })
-
-                # Check for ambiguous mappings
-                if self._is_ambiguous_mapping(target, known):
-                    violations.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego_id,
-                        'target': target,
-                        'known': known,
-                        'issue': 'Ambiguous FD mapping',
-                        'severity': 'CRITICAL'
-                    })
-
-        return violations
-
-    def _has_gender_context_issue(self, known: str) -> bool:
+        Per-LEGO context checks, plus a course-wide index of every
+        known ↔ target mapping that reports each FD collision.
+        """
+        return self.engine.run(lang_name, data, ['gate1_fd_loop'])['gate1_fd_loop']
+
+    def _visit_fd_loop(self, out, lang_name, seed_id, lego, target: Chunk, known: Chunk):
+        # Check for gender/context violations
+        if self._has_gender_context_issue(known):
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'target': target.text,
+                'known': known.text,
+                'issue': 'Gender/pronoun in known (not context-neutral)',
+                'severity': 'CRITICAL'
+            })
+
+        # Check for ambiguous mappings
+        if self._is_ambiguous_mapping(target, known):
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'target': target.text,
+                'known': known.text,
+                'issue': 'Ambiguous FD mapping',
+                'severity': 'CRITICAL'
+            })
+
+    def _check_fd_index(self, out, lang_name, seeds):
+        out.extend(fd_collisions(seeds))
+
+    def _has_gender_context_issue(self, known: Chunk) -> bool:
         """Check if known chunk has gender/pronoun specificity"""
-        gendered_pronouns = ['he', 'she', 'his', 'her', 'him']
-        words = known.lower().split()
-        return any(pronoun in words for pronoun in gendered_pronouns)
+        return not GENDERED_PRONOUNS.isdisjoint(known.lower_words)
 
-    def _is_ambiguous_mapping(self, target: str, known: str) -> bool:
+    def _is_ambiguous_mapping(self, target: Chunk, known: Chunk) -> bool:
         """Check if the mapping could be ambiguous"""
         # Simple heuristic: if known is very short (1-2 words) and generic
-        if len(known.split()) <= 2:
-            # Check for overly generic translations
-            generic_words = ['the', 'a', 'to', 'of', 'in', 'with']
-            if known.lower() in generic_words:
-                return True
-        return False
+        return len(known.words) <= 2 and known.lower in GENERIC_KNOWN_WORDS
 
     def gate2_iron_rule_compliance(self, lang_name: str, data: dict) -> List[dict]:
         """
@@ -124,29 +666,19 @@ class QualityGateAnalyzer:
         No standalone prepositions/articles/conjunctions
         0 violations allowed
         """
-        violations = []
-        forbidden = IRON_RULE_FORBIDDEN.get(lang_name, {})
-
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-
-            for lego in seed.get('lego_pairs', []):
-                lego_id = lego['lego_id']
-                target = lego['target_chunk'].strip()
-
-                # Check if target is standalone forbidden word
-                for category, words in forbidden.items():
-                    if target.lower() in words:
-                        violations.append({
-                            'seed_id': seed_id,
-                            'lego_id': lego_id,
-                            'target': target,
-                            'known': lego['known_chunk'],
-                            'issue': f'Standalone {category}: "{target}"',
-                            'severity': 'CRITICAL'
-                        })
-
-        return violations
+        return self.engine.run(lang_name, data, ['gate2_iron_rule'])['gate2_iron_rule']
+
+    def _visit_iron_rule(self, out, lang_name, seed_id, lego, target: Chunk, known: Chunk):
+        # Check if target is standalone forbidden word
+        for category in self.forbidden_words.get(lang_name, {}).get(target.stripped.lower(), ()):
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'target': target.stripped,
+                'known': known.text,
+                'issue': f'Standalone {category}: "{target.stripped}"',
+                'severity': 'CRITICAL'
+            })
 
     def gate3_glue_word_containment(self, lang_name: str, data: dict) -> List[dict]:
         """
@@ -154,249 +686,172 @@ class QualityGateAnalyzer:
         Glue words INSIDE composites, never at edges
         0 violations allowed
         """
-        violations = []
-        glue_words = GLUE_WORDS.get(lang_name, [])
-
-        if not glue_words:  # Skip for Mandarin
-            return violations
-
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-
-            for lego in seed.get('lego_pairs', []):
-                lego_id = lego['lego_id']
-                target = lego['target_chunk']
-
-                # Check if LEGO ends with glue word
-                words = target.strip().split()
-                if words and words[-1].lower() in glue_words:
-                    violations.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego_id,
-                        'target': target,
-                        'issue': f'Glue word at END: "{words[-1]}"',
-                        'severity': 'CRITICAL'
-                    })
-
-                # Check if LEGO begins with glue word (unless part of fixed expression)
-                if words and words[0].lower() in glue_words and len(words) == 1:
-                    violations.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego_id,
-                        'target': target,
-                        'issue': f'Standalone glue word: "{words[0]}"',
-                        'severity': 'CRITICAL'
-                    })
-
-        return violations
+        return self.engine.run(lang_name, data, ['gate3_glue_words'])['gate3_glue_words']
+
+    def _visit_glue_words(self, out, lang_name, seed_id, lego, target: Chunk, known: Chunk):
+        glue_words = self.glue_words.get(lang_name)
+        words = target.words
+        if not glue_words or not words:  # Skip for Mandarin
+            return
+
+        # Check if LEGO ends with glue word
+        if target.lower_words[-1] in glue_words:
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'target': target.text,
+                'issue': f'Glue word at END: "{words[-1]}"',
+                'severity': 'CRITICAL'
+            })
+
+        # Check if LEGO begins with glue word (unless part of fixed expression)
+        if len(words) == 1 and target.lower_words[0] in glue_words:
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'target': target.text,
+                'issue': f'Standalone glue word: "{words[0]}"',
+                'severity': 'CRITICAL'
+            })
 
     def gate4_cross_language_consistency(self, all_data: Dict[str, dict]) -> List[dict]:
         """
         GATE 4: Cross-Language Consistency
-        Romance languages should decompose similar structures similarly
+        Parallel seeds should decompose similarly in every language
         """
-        violations = []
-
-        # Compare parallel seeds across Romance languages
-        romance_langs = ['Italian', 'Spanish', 'French']
-
-        # Build seed map
-        seed_map = defaultdict(dict)
-        for lang in romance_langs:
-            for seed in all_data[lang]['lego_breakdowns']:
-                seed_id = seed['seed_id']
-                lego_count = len(seed.get('lego_pairs', []))
-                seed_map[seed_id][lang] = {
-                    'lego_count': lego_count,
-                    'known': seed['original_known']
-                }
-
-        # Check for inconsistencies
-        for seed_id, lang_data in seed_map.items():
-            if len(lang_data) == 3:  # All three Romance languages present
-                counts = [lang_data[lang]['lego_count'] for lang in romance_langs]
-                known = lang_data[romance_langs[0]]['known']
-
-                # If counts vary significantly, flag it
-                if max(counts) - min(counts) > 2:
-                    violations.append({
-                        'seed_id': seed_id,
-                        'known': known,
-                        'italian_legos': lang_data['Italian']['lego_count'],
-                        'spanish_legos': lang_data['Spanish']['lego_count'],
-                        'french_legos': lang_data['French']['lego_count'],
-                        'issue': 'Significant decomposition inconsistency across Romance languages',
-                        'severity': 'MEDIUM'
-                    })
-
-        return violations
+        return self.gate4_join({lang: summarize_seeds(data) for lang, data in all_data.items()})
+
+    def gate4_join(self, summaries: Dict[str, Dict[str, SeedSummary]]) -> List[dict]:
+        """Gate 4 over per-language seed summaries: seeds ranked by how much their languages disagree"""
+        return AlignmentMatrix(summaries).rank_outliers(self.gate4_threshold)
 
     def gate5_chunk_up_pattern_validation(self, lang_name: str, data: dict) -> List[dict]:
         """
         GATE 5: CHUNK UP Pattern Validation
         Document where chunking was needed and why
         """
-        patterns_found = []
-
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-
-            # Look for chunked progressive constructions
-            for lego in seed.get('lego_pairs', []):
-                target = lego['target_chunk']
-                known = lego['known_chunk']
-
-                # Progressive aspect patterns
-                if "I'm trying" in known or "I'm going" in known:
-                    patterns_found.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego['lego_id'],
-                        'pattern': 'Progressive Aspect',
-                        'target': target,
-                        'known': known,
-                        'reason': 'Bare verb would fail FD, chunked with auxiliary'
-                    })
-
-                # Modal + infinitive
-                if any(modal in known for modal in ["I want", "I'd like", "We want", "You want"]):
-                    patterns_found.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego['lego_id'],
-                        'pattern': 'Modal + Infinitive',
-                        'target': target,
-                        'known': known,
-                        'reason': 'Modal verb chunked for FD compliance'
-                    })
-
-        return patterns_found
+        return self.engine.run(lang_name, data, ['gate5_chunk_up'])['gate5_chunk_up']
+
+    def _visit_chunk_up(self, out, lang_name, seed_id, lego, target: Chunk, known: Chunk):
+        # Progressive aspect patterns
+        if "I'm trying" in known.text or "I'm going" in known.text:
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'pattern': 'Progressive Aspect',
+                'target': target.text,
+                'known': known.text,
+                'reason': 'Bare verb would fail FD, chunked with auxiliary'
+            })
+
+        # Modal + infinitive
+        if any(modal in known.text for modal in MODAL_PREFIXES):
+            out.append({
+                'seed_id': seed_id,
+                'lego_id': lego['lego_id'],
+                'pattern': 'Modal + Infinitive',
+                'target': target.text,
+                'known': known.text,
+                'reason': 'Modal verb chunked for FD compliance'
+            })
 
     def gate6_feeder_quality(self, lang_name: str, data: dict) -> List[dict]:
         """
         GATE 6: FEEDER Quality
         All FEEDERs must be FD + pedagogically helpful
         """
-        violations = []
-
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-
-            for feeder in seed.get('feeder_pairs', []):
-                feeder_id = feeder['feeder_id']
-                target = feeder['target_chunk']
-                known = feeder['known_chunk']
-
-                # Check if trivial/unhelpful
-                if self._is_trivial_feeder(known):
-                    violations.append({
-                        'seed_id': seed_id,
-                        'feeder_id': feeder_id,
-                        'target': target,
-                        'known': known,
-                        'issue': 'Trivial/unhelpful FEEDER',
-                        'severity': 'LOW'
-                    })
-
-                # Check if FD
-                if self._is_ambiguous_mapping(target, known):
-                    violations.append({
-                        'seed_id': seed_id,
-                        'feeder_id': feeder_id,
-                        'target': target,
-                        'known': known,
-                        'issue': 'FEEDER not FD',
-                        'severity': 'MEDIUM'
-                    })
-
-        return violations
-
-    def _is_trivial_feeder(self, known: str) -> bool:
+        return self.engine.run(lang_name, data, ['gate6_feeders'])['gate6_feeders']
+
+    def _visit_feeder(self, out, lang_name, seed_id, feeder, target: Chunk, known: Chunk):
+        # Check if trivial/unhelpful
+        if self._is_trivial_feeder(known):
+            out.append({
+                'seed_id': seed_id,
+                'feeder_id': feeder['feeder_id'],
+                'target': target.text,
+                'known': known.text,
+                'issue': 'Trivial/unhelpful FEEDER',
+                'severity': 'LOW'
+            })
+
+        # Check if FD
+        if self._is_ambiguous_mapping(target, known):
+            out.append({
+                'seed_id': seed_id,
+                'feeder_id': feeder['feeder_id'],
+                'target': target.text,
+                'known': known.text,
+                'issue': 'FEEDER not FD',
+                'severity': 'MEDIUM'
+            })
+
+    def _is_trivial_feeder(self, known: Chunk) -> bool:
         """Check if FEEDER is too trivial"""
-        trivial = ['the', 'a', 'an', 'to', 'of']
-        return known.lower().strip() in trivial
+        return known.lower.strip() in TRIVIAL_FEEDER_WORDS
 
     def gate7_hierarchical_buildup(self, lang_name: str, data: dict) -> List[dict]:
         """
         GATE 7: Hierarchical Build-Up
         Intermediate composites properly included
         """
-        issues = []
-
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-
-            # Check componentization
-            for comp in seed.get('componentization', []):
-                lego_id = comp['lego_id']
-                explanation = comp.get('explanation', '')
-
-                # Simple check: does explanation reference components?
-                if not explanation or len(explanation) < 20:
-                    issues.append({
-                        'seed_id': seed_id,
-                        'lego_id': lego_id,
-                        'issue': 'Missing or inadequate componentization explanation',
-                        'severity': 'LOW'
-                    })
-
-        return issues
+        return self.engine.run(lang_name, data, ['gate7_hierarchy'])['gate7_hierarchy']
+
+    def _visit_hierarchy(self, out, lang_name, seed):
+        # Check componentization
+        for comp in seed.get('componentization', []):
+            explanation = comp.get('explanation', '')
+
+            # Simple check: does explanation reference components?
+            if not explanation or len(explanation) < 20:
+                out.append({
+                    'seed_id': seed['seed_id'],
+                    'lego_id': comp['lego_id'],
+                    'issue': 'Missing or inadequate componentization explanation',
+                    'severity': 'LOW'
+                })
 
     def gate8_tiling_test(self, lang_name: str, data: dict) -> List[dict]:
         """
         GATE 8: Tiling Test
-        Concatenating LEGOs reconstructs original seed
+        Concatenating LEGOs reconstructs original seed; failures report the
+        first divergent token offset and the missing, extra or misplaced chunk
         """
-        violations = []
+        return self.engine.run(lang_name, data, ['gate8_tiling'])['gate8_tiling']
 
-        for seed in data['lego_breakdowns']:
-            seed_id = seed['seed_id']
-            original = seed['original_target'].replace('.', '').replace('?', '').replace('!', '').strip()
-
-            # Concatenate all LEGO target chunks
-            lego_chunks = [lego['target_chunk'] for lego in seed.get('lego_pairs', [])]
-            reconstructed = ' '.join(lego_chunks).replace('.', '').replace('?', '').replace('!', '').strip()
-
-            # Normalize whitespace
-            original_normalized = ' '.join(original.split())
-            reconstructed_normalized = ' '.join(reconstructed.split())
-
-            if original_normalized != reconstructed_normalized:
-                violations.append({
-                    'seed_id': seed_id,
-                    'original': original,
-                    'reconstructed': reconstructed,
-                    'issue': 'Tiling mismatch - LEGOs don\'t reconstruct seed',
-                    'severity': 'HIGH'
-                })
+    def _check_tiling(self, out, lang_name, seeds):
+        out.extend(check_tiling(seeds, is_spaced(lang_name)))
 
-        return violations
+    def run_all_gates(self, iteration: int, languages: Dict[str, str], workers: int = None,
+                      seed_ranges: Optional[List[Tuple[int, int]]] = None) -> dict:
+        """
+        Run all 8 quality gates on every language ({language name: breakdown file})
 
-    def run_all_gates(self, iteration: int) -> dict:
-        """Run all 8 quality gates on all 4 languages"""
+        Languages are checked in parallel on up to `workers` processes
+        (default: one per CPU); workers=1 runs everything in-process.
+        """
         results = {
             'iteration': iteration,
             'languages': {},
             'totals': defaultdict(int)
         }
 
-        # Load all language data
-        all_data = {}
-        for lang_name in LANG_PATHS.keys():
-            all_data[lang_name] = self.load_language_data(lang_name)
-
-        # Run gates for each language
-        for lang_name, data in all_data.items():
-            results['languages'][lang_name] = {
-                'gate1_fd_loop': self.gate1_fd_loop_validation(lang_name, data),
-                'gate2_iron_rule': self.gate2_iron_rule_compliance(lang_name, data),
-                'gate3_glue_words': self.gate3_glue_word_containment(lang_name, data),
-                'gate5_chunk_up': self.gate5_chunk_up_pattern_validation(lang_name, data),
-                'gate6_feeders': self.gate6_feeder_quality(lang_name, data),
-                'gate7_hierarchy': self.gate7_hierarchical_buildup(lang_name, data),
-                'gate8_tiling': self.gate8_tiling_test(lang_name, data)
-            }
-
-        # Run cross-language gate
-        results['gate4_cross_language'] = self.gate4_cross_language_consistency(all_data)
+        # Gates 1-3 and 5-8 per language, in parallel
+        jobs = [(lang_name, path, seed_ranges) for lang_name, path in languages.items()]
+        if not jobs:
+            outcomes = []
+        elif workers == 1:
+            outcomes = [run_language_gates(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(run_language_gates, *zip(*jobs)))
+
+        summaries = {}
+        for (lang_name, _, _), (gate_results, seed_summary) in zip(jobs, outcomes):
+            results['languages'][lang_name] = gate_results
+            summaries[lang_name] = seed_summary
+
+        # Run cross-language gate as a join over the seed summaries
+        results['gate4_cross_language'] = self.gate4_join(summaries)
 
         # Calculate totals
         for lang_name, gates in results['languages'].items():
@@ -411,15 +866,58 @@ class QualityGateAnalyzer:
         return results
 
 
+def summarize_seeds(data: dict) -> Dict[str, SeedSummary]:
+    """
+    Compact per-seed summary for cross-language gates
+
+    Seeds without LEGOs are left out, so gate 4 doesn't compare a
+    language that has no breakdown for a seed.
+    """
+    return {seed['seed_id']: summarize_seed(seed) for seed in data['lego_breakdowns'] if seed.get('lego_pairs')}
+
+
+def run_language_gates(lang_name: str, path: str, seed_ranges: Optional[List[Tuple[int, int]]] = None
+                       ) -> Tuple[Dict[str, List[dict]], Dict[str, SeedSummary]]:
+    """Worker: load one language and run its gates; returns (gate results, seed summary)"""
+    data = load_breakdowns(path, seed_ranges, is_spaced(lang_name))
+    return QualityGateAnalyzer().engine.run(lang_name, data), summarize_seeds(data)
+
+
 def main():
-    analyzer = QualityGateAnalyzer()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Phase 3 recursive QA across all languages')
+    parser.add_argument('--courses', nargs='+',
+                        help=f"Course code glob patterns (default: {' '.join(DEFAULT_COURSES)})")
+    parser.add_argument('--seeds', help='Seed ranges to check, e.g. S0001-S0100,S0150 (default: all)')
+    parser.add_argument('--courses-root', type=Path, help='Courses directory (default: public/vfs/courses)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT,
+                        help='Detailed results JSON (default: docs/Phase3_QA_Iteration_01_Results.json)')
+    parser.add_argument('--workers', type=int,
+                        help='Languages checked in parallel (default: one per CPU, 1 = no subprocesses)')
+    parser.add_argument('--gate4-threshold', type=float, default=DEFAULT_GATE4_THRESHOLD,
+                        help=f"Minimum z-score spread for a gate 4 inconsistency (default: {DEFAULT_GATE4_THRESHOLD})")
+    args = parser.parse_args()
+
+    registry = CourseRegistry.discover(args.courses_root) if args.courses_root else CourseRegistry.discover()
+    try:
+        languages = resolve_languages(registry, args.courses)
+        seed_ranges = parse_seed_ranges(args.seeds)
+    except ValueError as e:
+        parser.error(str(e))
+    if not languages:
+        parser.error('No selected course has lego_pairs.json or LEGO_BREAKDOWNS_COMPLETE.json')
+
+    analyzer = QualityGateAnalyzer(gate4_threshold=args.gate4_threshold)
 
     print("=" * 80)
     print("PHASE 3 RECURSIVE QA - ITERATION 1 ANALYSIS")
     print("=" * 80)
+    print(f"Languages: {', '.join(languages)} ({format_seed_ranges(seed_ranges)})")
     print()
 
-    results = analyzer.run_all_gates(iteration=1)
+    results = analyzer.run_all_gates(iteration=1, languages=languages, workers=args.workers,
+                                     seed_ranges=seed_ranges)
 
     # Print summary
     print("CRITICAL GATES (Must be 100% pass):")
@@ -429,7 +927,7 @@ def main():
     print()
     print("QUALITY GATES (Target 95%+):")
     print(f"  GATE 4 (Cross-Lang): {results['totals']['gate4_cross_language']} inconsistencies")
-    print(f"  GATE 5 (Chunk Up):   {len(results['languages']['Italian']['gate5_chunk_up'])} patterns found")
+    print(f"  GATE 5 (Chunk Up):   {results['totals']['gate5_chunk_up']} patterns found")
     print(f"  GATE 6 (FEEDERs):    {results['totals']['gate6_feeders']} issues")
     print(f"  GATE 7 (Hierarchy):  {results['totals']['gate7_hierarchy']} issues")
     print(f"  GATE 8 (Tiling):     {results['totals']['gate8_tiling']} failures")
@@ -438,7 +936,7 @@ def main():
     print()
 
     # Save detailed results
-    output_file = '/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/docs/Phase3_QA_Iteration_01_Results.json'
+    output_file = args.output
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
 
@@ -487,6 +985,18 @@ def main():
                 if len(violations) > 5:
                     print(f"  ... and {len(violations) - 5} more")
 
+    ranked = results['gate4_cross_language']
+    if ranked:
+        print("\n" + "=" * 80)
+        print("GATE 4 (CROSS-LANGUAGE): MOST INCONSISTENT SEEDS")
+        print("=" * 80)
+        for v in ranked[:10]:
+            counts = ', '.join(f"{lang} {count}" for lang, count in v['lego_counts'].items())
+            print(f"  {v['rank']}. {v['seed_id']} (score {v['score']:.2f}): {v['known']}")
+            print(f"    {v['issue']} [LEGOs: {counts}]")
+        if len(ranked) > 10:
+            print(f"  ... and {len(ranked) - 10} more")
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Course Registry - discover courses and their artifacts under vfs/courses
+
+Scans the courses root for xxx_for_yyy directories (target language
+first, known language second, optionally with a suffix such as _test or
+_30seeds) and records which course artifacts each one has:
+- single files: seed_pairs.json, lego_pairs.json, lego_baskets.json, ...
+- per-seed basket files (seed_SXXXX_baskets.json), by directory
+
+The registry is cached as JSON in the user cache directory, keyed by the
+courses root. The cache is reused while the root, course and
+subdirectory mtimes are unchanged (adding or removing a file changes its
+directory's mtime), so repeat runs don't rescan the tree.
+
+QA tools take --courses (glob patterns over course codes) and --seeds
+(ranges such as S0101-S0150) instead of hard-coded paths.
+
+Usage:
+  registry = CourseRegistry.discover()
+  for course in registry.select(['*_for_eng'], artifact='lego_pairs'):
+      data = json.loads(course.artifact_path('lego_pairs').read_text())
+  files = registry.seed_basket_files('cmn_for_eng', parse_seed_ranges('S0101-S0150'))
+"""
+
+import fnmatch
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_COURSES_ROOT = REPO_ROOT / 'public' / 'vfs' / 'courses'
+CACHE_VERSION = 1
+
+COURSE_DIR_PATTERN = re.compile(r'^([a-z]{3})_for_([a-z]{3})(?:_(\w+))?$')
+SEED_BASKET_PATTERN = re.compile(r'^seed_(S\d{4})_baskets\.json$')
+SEED_ID_PATTERN = re.compile(r'^S?(\d{1,4})$', re.IGNORECASE)
+
+# Single-file course artifacts: name -> file name in the course directory
+ARTIFACTS = {
+    'seed_pairs': 'seed_pairs.json',
+    'lego_pairs': 'lego_pairs.json',
+    'lego_baskets': 'lego_baskets.json',
+    'introductions': 'introductions.json',
+    'lego_breakdowns': 'LEGO_BREAKDOWNS_COMPLETE.json',
+}
+
+# ISO 639-3 course codes -> (ISO 639-1 code used in APML manifests, display name)
+LANGUAGES = {
+    'bre': ('br', 'Breton'),
+    'cmn': ('zh', 'Mandarin'),
+    'cym': ('cy', 'Welsh'),
+    'deu': ('de', 'German'),
+    'eng': ('en', 'English'),
+    'fra': ('fr', 'French'),
+    'gle': ('ga', 'Irish'),
+    'ita': ('it', 'Italian'),
+    'jpn': ('ja', 'Japanese'),
+    'kor': ('ko', 'Korean'),
+    'nld': ('nl', 'Dutch'),
+    'por': ('pt', 'Portuguese'),
+    'rus': ('ru', 'Russian'),
+    'spa': ('es', 'Spanish'),
+    'tur': ('tr', 'Turkish'),
+    'zho': ('zh', 'Chinese'),
+}
+LANGUAGE_NAMES = {code: name for code, (_, name) in LANGUAGES.items()}
+
+class Course(NamedTuple):
+    code: str
+    target: str
+    known: str
+    variant: Optional[str]
+    path: str
+    artifacts: Dict[str, str]
+    # Directory (relative to the course) -> seed ids with a seed_SXXXX_baskets.json there
+    basket_dirs: Dict[str, List[str]]
+
+    @property
+    def target_name(self) -> str:
+        return LANGUAGE_NAMES.get(self.target, self.target)
+
+    @property
+    def known_name(self) -> str:
+        return LANGUAGE_NAMES.get(self.known, self.known)
+
+    def artifact_path(self, name: str) -> Optional[Path]:
+        relative = self.artifacts.get(name)
+        return Path(self.path) / relative if relative else None
+
+def course_languages(name: str) -> Tuple[str, str]:
+    """(target, known) ISO 639-3 codes of an xxx_for_yyy course directory name"""
+    match = COURSE_DIR_PATTERN.match(name)
+    if not match:
+        raise ValueError(f"Invalid directory format: {name}. Expected: xxx_for_yyy")
+
+    target, known = match.group(1), match.group(2)
+    for code in (target, known):
+        if code not in LANGUAGES:
+            raise ValueError(f"Unknown language code: {code}")
+    return target, known
+
+def parse_seed_id(value: str) -> int:
+    """'S0101', 's101' or '101' -> 101"""
+    match = SEED_ID_PATTERN.match(value.strip())
+    if not match:
+        raise ValueError(f"Not a seed id: {value!r}")
+    return int(match.group(1))
+
+def parse_seed_ranges(spec: Optional[str]) -> Optional[List[Tuple[int, int]]]:
+    """
+    'S0101-S0150,S0200' -> [(101, 150), (200, 200)]
+
+    None or an empty spec means all seeds (returns None).
+    """
+    if not spec:
+        return None
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition('-')
+        low = parse_seed_id(low)
+        high = parse_seed_id(high) if high else low
+        if high < low:
+            raise ValueError(f"Empty seed range: {part!r}")
+        ranges.append((low, high))
+    return ranges
+
+def seed_in_ranges(seed_id: str, ranges: Optional[List[Tuple[int, int]]]) -> bool:
+    if ranges is None:
+        return True
+    try:
+        number = parse_seed_id(seed_id)
+    except ValueError:
+        return False
+    return any(low <= number <= high for low, high in ranges)
+
+def format_seed_ranges(ranges: Optional[List[Tuple[int, int]]]) -> str:
+    if ranges is None:
+        return 'all seeds'
+    return ','.join(f"S{low:04d}" if low == high else f"S{low:04d}-S{high:04d}" for low, high in ranges)
+
+def default_cache_path() -> Path:
+    base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(base) / 'ssi-dashboard' / 'course_registry.json'
+
+def scan_course(path: Path) -> Optional[Course]:
+    match = COURSE_DIR_PATTERN.match(path.name)
+    if not match or not path.is_dir():
+        return None
+
+    artifacts = {name: file_name for name, file_name in ARTIFACTS.items() if (path / file_name).is_file()}
+
+    basket_dirs = {}
+    for directory in [path] + sorted(p for p in path.iterdir() if p.is_dir()):
+        seeds = sorted(m.group(1) for m in map(SEED_BASKET_PATTERN.match, os.listdir(directory)) if m)
+        if seeds:
+            basket_dirs[str(directory.relative_to(path)) if directory != path else '.'] = seeds
+
+    target, known, variant = match.groups()
+    return Course(path.name, target, known, variant, str(path), artifacts, basket_dirs)
+
+def tree_signature(root: Path) -> Dict[str, int]:
+    """mtime_ns of the root, each course directory and its subdirectories"""
+    signature = {'.': root.stat().st_mtime_ns}
+    for course_dir in root.iterdir():
+        if course_dir.is_dir() and COURSE_DIR_PATTERN.match(course_dir.name):
+            signature[course_dir.name] = course_dir.stat().st_mtime_ns
+            for sub in course_dir.iterdir():
+                if sub.is_dir():
+                    signature[f"{course_dir.name}/{sub.name}"] = sub.stat().st_mtime_ns
+    return signature
+
+class CourseRegistry:
+    def __init__(self, root: Path, courses: Dict[str, Course]):
+        self.root = Path(root)
+        self.courses = courses
+
+    @classmethod
+    def discover(cls, root: Path = DEFAULT_COURSES_ROOT, cache_path: Path = None,
+                 use_cache: bool = True) -> 'CourseRegistry':
+        """Scan root for courses, reusing the cached registry while the tree is unchanged"""
+        root = Path(root).resolve()
+        if not root.is_dir():
+            raise FileNotFoundError(f"Courses root not found: {root}")
+
+        cache_path = Path(cache_path) if cache_path else default_cache_path()
+        signature = tree_signature(root)
+
+        if use_cache:
+            cached = cls._load_cache(cache_path, root, signature)
+            if cached is not None:
+                return cached
+
+        courses = {}
+        for path in sorted(root.iterdir()):
+            course = scan_course(path)
+            if course:
+                courses[course.code] = course
+
+        registry = cls(root, courses)
+        if use_cache:
+            registry._save_cache(cache_path, signature)
+        return registry
+
+    @classmethod
+    def _load_cache(cls, cache_path: Path, root: Path, signature: dict) -> Optional['CourseRegistry']:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f).get(str(root))
+        except (OSError, ValueError):
+            return None
+        if not entry or entry.get('version') != CACHE_VERSION or entry.get('signature') != signature:
+            return None
+        return cls(root, {code: Course(**fields) for code, fields in entry['courses'].items()})
+
+    def _save_cache(self, cache_path: Path, signature: dict):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+        cache[str(self.root)] = {
+            'version': CACHE_VERSION,
+            'signature': signature,
+            'courses': {code: course._asdict() for code, course in self.courses.items()},
+        }
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # The cache is only an optimisation
+            pass
+
+    def get(self, code: str) -> Course:
+        try:
+            return self.courses[code]
+        except KeyError:
+            raise KeyError(f"Unknown course {code!r} (known: {', '.join(self.courses) or 'none'})") from None
+
+    def select(self, patterns: Iterable[str] = None, artifact: str = None) -> List[Course]:
+        """Courses whose code matches any glob pattern (all if none), optionally having an artifact"""
+        patterns = list(patterns or ['*'])
+        return [course for code, course in self.courses.items()
+                if any(fnmatch.fnmatchcase(code, pattern) for pattern in patterns)
+                and (artifact is None or artifact in course.artifacts)]
+
+    def seed_basket_files(self, code: str, seed_ranges: List[Tuple[int, int]] = None,
+                          directory: str = None) -> List[Path]:
+        """
+        Per-seed basket files of a course within the seed ranges
+
+        directory picks one basket directory; by default the one holding
+        the most seeds is used.
+        """
+        course = self.get(code)
+        if not course.basket_dirs:
+            return []
+        if directory is None:
+            directory = max(course.basket_dirs, key=lambda d: len(course.basket_dirs[d]))
+        elif directory not in course.basket_dirs:
+            raise KeyError(f"{code} has no seed basket files in {directory!r} "
+                           f"(found: {', '.join(course.basket_dirs)})")
+
+        base = Path(course.path) / directory
+        return [base / f"seed_{seed_id}_baskets.json" for seed_id in course.basket_dirs[directory]
+                if seed_in_ranges(seed_id, seed_ranges)]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='List discovered courses and their artifacts')
+    parser.add_argument('--root', type=Path, default=DEFAULT_COURSES_ROOT, help='Courses root directory')
+    parser.add_argument('--courses', nargs='*', help='Course code glob patterns (default: all)')
+    parser.add_argument('--rescan', action='store_true', help='Ignore the cached registry')
+    args = parser.parse_args()
+
+    registry = CourseRegistry.discover(args.root, use_cache=not args.rescan)
+    for course in registry.select(args.courses):
+        variant = f" [{course.variant}]" if course.variant else ''
+        print(f"{course.code}: {course.target_name} for {course.known_name} speakers{variant}")
+        print(f"  artifacts: {', '.join(course.artifacts) or 'none'}")
+        for directory, seeds in course.basket_dirs.items():
+            print(f"  seed baskets: {directory} ({len(seeds)} seeds, {seeds[0]}-{seeds[-1]})")
+
+if __name__ == '__main__':
+    main()
@@ -6,245 +6,632 @@ Instead of heuristics, ask Claude to actually read and understand the text
 to determine which is English and which is Spanish.
 
 This catches edge cases our linguistic detector missed!
+
+With --hybrid, LanguageDetector decides pairs whose score margin is at
+least --margin locally, and only ambiguous pairs go to Claude. Single
+texts (manifest samples) are decided locally when their Spanish and
+English scores are --margin apart; presentations, which quote Spanish
+inside English, always go to Claude. Every verdict records the tier
+("local" or "model") that decided it, and the summary counts checks per
+tier for nodes and samples separately. --calibrate measures how often the
+detector gets the course's own known/target texts wrong at each margin,
+as pairs and as single texts, to choose --margin.
+
+Verdicts are cached in llm_verdict_cache.sqlite in the course directory
+(shared with the Haiku quality gate, see tools/validators/llm_verdict_cache.py),
+so re-running on an unchanged course makes no API calls.
+
+Requests go through the shared rate-limit-aware scheduler
+(tools/validators/llm_scheduler.py): --rpm/--tpm budgets, a bounded
+in-flight window and jittered retries. --base-url points the client at
+another endpoint, e.g. tools/validators/fake_llm_server.py.
+
+Every finished batch is appended to claude_swap_hunter_checkpoint.jsonl in
+the course directory (see tools/validators/llm_checkpoint.py); --resume
+skips batches already in the log after an interrupted run.
+
+Responses are parsed with tools/validators/llm_json.py, so a batch answer
+that was cut off still yields every complete verdict; --stream extracts
+verdicts while the response is arriving.
 """
 
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from anthropic import Anthropic
 
-def ask_claude_about_pair(client, pair, context=""):
-    """Ask Claude which element is English and which is Spanish"""
-
-    prompt = f"""You are a language detection expert. Analyze this pair and determine which text is English and which is Spanish.
-
-Pair:
-[0]: "{pair[0]}"
-[1]: "{pair[1]}"
-
-{f"Context: {context}" if context else ""}
-
-Respond with ONLY a JSON object in this exact format:
-{{
-  "english_index": 0 or 1,
-  "spanish_index": 0 or 1,
-  "confidence": "high" or "medium" or "low",
-  "reasoning": "brief explanation"
-}}
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools' / 'validators'))
+from llm_verdict_cache import VerdictCache, make_key
+from llm_checkpoint import CheckpointLog
+from llm_json import JSONItemExtractor, parse_response, read_stream
+from llm_scheduler import LLMScheduler, DEFAULT_RPM, DEFAULT_TPM, format_metrics
+from detect_all_swaps import LanguageDetector
+from manifest_walker import NodeRecord, SampleRecord, walk_manifest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from phrase_table import PhraseTable
+
+MODEL = "claude-haiku-4-20250514"
+
+# Bump whenever the batch prompt changes meaningfully
+BATCH_PROMPT_VERSION = "batch-1"
+CACHE_FILE = "llm_verdict_cache.sqlite"
+CHECKPOINT_FILE = "claude_swap_hunter_checkpoint.jsonl"
+
+# Batched classification: pairs per request, concurrent requests, and the
+# total (estimated) token spend allowed per check
+DEFAULT_BATCH_SIZE = 40
+DEFAULT_WORKERS = 4
+DEFAULT_TOKEN_BUDGET = 500000
+BATCH_OUTPUT_TOKENS_PER_PAIR = 40
+
+# Hybrid mode: minimum LanguageDetector score margin for a local verdict.
+# On spa_for_eng's 15.4k labelled known/target pairs (--calibrate) the
+# detector makes no mistakes from a margin of 20, on pairs and on multi-word
+# texts judged alone; 30 leaves headroom.
+DEFAULT_LOCAL_MARGIN = 30
+CALIBRATION_MARGINS = [0, 5, 10, 15, 20, 25, 30, 40, 50, 60]
+
+# Sample roles spoken in both languages at once (English around quoted
+# Spanish), which neither language score describes
+MIXED_LANGUAGE_ROLES = {'presentation'}
+
+def batch_prompt(items) -> str:
+    """Prompt classifying many indexed pairs in one request"""
+    lines = []
+    for i, item in enumerate(items):
+        pair = item['pair']
+        lines.append(f"[{i}]" + (f" context: {item['context']}" if item.get('context') else ""))
+        lines.append(f"  [0]: {json.dumps(pair[0], ensure_ascii=False)}")
+        lines.append(f"  [1]: {json.dumps(pair[1], ensure_ascii=False)}")
+    pairs_text = '\n'.join(lines)
+
+    return f"""You are a language detection expert. For each numbered pair below, determine which text is English and which is Spanish.
+
+Pairs:
+{pairs_text}
+
+Respond with ONLY a JSON array containing one object per pair, in this exact format:
+[
+  {{"index": <pair number>, "english_index": 0 or 1, "spanish_index": 0 or 1, "confidence": "high" or "medium" or "low", "reasoning": "brief explanation"}}
+]
 
 Expected order is [English, Spanish], so english_index should be 0 and spanish_index should be 1.
-If they're swapped, english_index will be 1 and spanish_index will be 0."""
+If they're swapped, english_index will be 1 and spanish_index will be 0.
+An empty text is neither language - judge the pair by the other text."""
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+def classify_batch(client, items, stream: bool = False) -> dict:
+    """
+    Classify one batch of pairs, returning {batch index: verdict}
+
+    Retries are left to the client (an LLMScheduler). Every complete
+    verdict is kept even if the response was cut off; a batch that still
+    fails, or yields no verdicts, is left undecided.
+    """
+    prompt = batch_prompt(items)
+    request = dict(
+        model=MODEL,
+        max_tokens=BATCH_OUTPUT_TOKENS_PER_PAIR * len(items) + 200,
+        temperature=0,
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
 
     try:
-        message = client.messages.create(
-            model="claude-haiku-4-20250514",
-            max_tokens=200,
-            temperature=0,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-
-        response_text = message.content[0].text.strip()
-
-        # Parse JSON response
-        # Remove markdown code blocks if present
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            response_text = '\n'.join(lines[1:-1])
-
-        result = json.loads(response_text)
-        return result
-
+        if stream:
+            response_text, error = read_stream(client.messages.create(stream=True, **request),
+                                               JSONItemExtractor())
+        else:
+            response_text, error = client.messages.create(**request).content[0].text, None
     except Exception as e:
-        print(f"  ⚠️  Claude API error: {e}")
+        print(f"  ⚠️  Claude API error (batch of {len(items)}, {type(e).__name__}): {e}")
+        return {}
+
+    parsed, complete = parse_response(response_text)
+    if not isinstance(parsed, list):
+        print(f"  ⚠️  No verdicts in response (batch of {len(items)})" + (f": {error}" if error else ""))
+        return {}
+    if not complete:
+        print(f"  ⚠️  Response cut off (batch of {len(items)}) - salvaged {len(parsed)} verdicts")
+
+    verdicts = {}
+    for verdict in parsed:
+        index = verdict.get('index') if isinstance(verdict, dict) else None
+        if isinstance(index, int) and 0 <= index < len(items):
+            verdicts[index] = verdict
+    return verdicts
+
+def local_verdict(detector: LanguageDetector, pair, margin: float = DEFAULT_LOCAL_MARGIN,
+                  role: str = None):
+    """
+    Decide a pair locally when LanguageDetector is clear enough
+
+    Pairs compare the Spanish scores of both texts; single texts ([text, ""])
+    compare the text's Spanish and English scores, which share a scale.
+    Returns a verdict in the model's format, or None when the margin is too
+    small to trust - and always for samples in a MIXED_LANGUAGE_ROLES role.
+    """
+    if not pair[0]:
         return None
 
-def check_manifest_samples(manifest_path: Path, client):
-    """Check all samples in the manifest for swaps"""
-    print(f"\n{'='*60}")
-    print(f"CLAUDE SWAP HUNTER - Manifest Samples")
-    print(f"{'='*60}")
-    print(f"Using Claude Haiku 4.5 for intelligent language detection")
-    print(f"")
-
-    with open(manifest_path, 'r', encoding='utf-8') as f:
-        manifest = json.load(f)
-
-    swaps_found = []
-    samples_checked = 0
-
-    # Check samples dictionary
-    samples = manifest.get('samples', {})
-    print(f"Checking {len(samples)} sample entries...")
-
-    for text, sample_entries in samples.items():
-        if not isinstance(sample_entries, list):
-            continue
-
-        for sample in sample_entries:
-            role = sample.get('role', '')
-
-            # We're looking for mismatched roles
-            # If role is "source" (English) but text is Spanish, that's a swap
-            # If role is "target1/target2" (Spanish) but text is English, that's a swap
-
-            # Skip very short texts (single words are hard to detect)
-            if len(text.split()) < 2:
-                continue
-
-            samples_checked += 1
-
-            if samples_checked % 100 == 0:
-                print(f"  Checked {samples_checked} samples...")
-
-            # Ask Claude to identify the language
-            result = ask_claude_about_pair(client, [text, ""], context=f"Role: {role}")
-
-            if not result:
-                continue
-
-            # Determine expected language based on role
-            expected_lang = "english" if role == "source" else "spanish"
-
-            # Claude tells us which index is which language
-            # For our single-text check, we only look at [0] (the text we're checking)
-            detected_lang = "english" if result.get('english_index') == 0 else "spanish"
+    if pair[1]:
+        score0 = detector.get_spanish_score(pair[0])
+        score1 = detector.get_spanish_score(pair[1])
+        english_first = score0 < score1
+    else:
+        if role in MIXED_LANGUAGE_ROLES:
+            return None
+        score0 = detector.get_spanish_score(pair[0])
+        score1 = detector.get_english_score(pair[0])
+        english_first = score1 > score0
 
-            if detected_lang != expected_lang:
-                swaps_found.append({
-                    'text': text,
-                    'role': role,
-                    'expected_lang': expected_lang,
-                    'detected_lang': detected_lang,
-                    'confidence': result.get('confidence', 'unknown'),
-                    'reasoning': result.get('reasoning', '')
-                })
-                print(f"\n  ❌ SWAP FOUND!")
-                print(f"     Text: {text[:60]}...")
-                print(f"     Role: {role} (expects {expected_lang})")
-                print(f"     Detected: {detected_lang}")
-                print(f"     Confidence: {result.get('confidence')}")
+    if abs(score0 - score1) < margin:
+        return None
 
-    return swaps_found
+    return {
+        "english_index": 0 if english_first else 1,
+        "spanish_index": 1 if english_first else 0,
+        "confidence": "high",
+        "reasoning": f"LanguageDetector score margin {abs(score0 - score1):.0f}",
+        "tier": "local"
+    }
+
+def labelled_pairs(course_dir: Path) -> list:
+    """Distinct (known, target) pairs from the course's baskets and LEGOs, known = English"""
+    pairs = set()
+    baskets_path = course_dir / 'lego_baskets.json'
+    if baskets_path.exists():
+        table = PhraseTable.from_basket_file(baskets_path)
+        pairs.update(zip(table.values('known'), table.values('target')))
+
+    lego_pairs_path = course_dir / 'lego_pairs.json'
+    if lego_pairs_path.exists():
+        with open(lego_pairs_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for seed in data.get('seeds', []):
+            for lego in seed.get('legos', []):
+                if lego.get('known') and lego.get('target'):
+                    pairs.add((lego['known'], lego['target']))
+
+    return sorted(pairs)
+
+def calibrate_margin(detector: LanguageDetector, pairs, margins=CALIBRATION_MARGINS) -> list:
+    """
+    (margin, pairs decided, wrong, single texts decided, wrong) for each margin
+
+    pairs are labelled [English, Spanish]; a local verdict calling one of
+    them swapped is counted as wrong (the odd genuine swap included). The
+    single-text columns judge each multi-word known and target text on its
+    own, as manifest samples are.
+    """
+    scored = [(detector.get_spanish_score(known), detector.get_spanish_score(target))
+              for known, target in pairs]
+    # Spanish minus English score, and whether the text is Spanish
+    singles = [(detector.get_spanish_score(text) - detector.get_english_score(text), is_spanish)
+               for pair in pairs for text, is_spanish in zip(pair, (False, True))
+               if len(text.split()) >= 2]
+    rows = []
+    for margin in margins:
+        decided = [(score0, score1) for score0, score1 in scored
+                   if abs(score0 - score1) >= margin and score0 != score1]
+        decided_singles = [(lead, is_spanish) for lead, is_spanish in singles
+                           if abs(lead) >= margin and lead != 0]
+        rows.append((margin, len(decided), sum(1 for score0, score1 in decided if score0 > score1),
+                     len(decided_singles),
+                     sum(1 for lead, is_spanish in decided_singles if (lead > 0) != is_spanish)))
+    return rows
+
+class PairClassifier:
+    """
+    Classify {"pair", "context"} items as they are submitted
+
+    With local_margin set, LanguageDetector decides clear-cut pairs first
+    and only ambiguous ones reach the model. Cached verdicts are reused;
+    the rest are grouped into batches of batch_size, each dispatched as
+    soon as it fills, while the estimated token spend stays within
+    token_budget - once a batch doesn't fit, every later model check is
+    left undecided. With a checkpoint log, finished batches are logged and
+    batches already in the log are read back instead of sent.
+
+    submit() takes a tag identifying the item; verdicts come back as
+    (tag, verdict) pairs from ready() and finish(), verdict None if
+    undecided, each tagged with its "tier"; tiers counts every check as
+    local, cached, model or undecided. Only items waiting for the
+    model and the model's answers (bounded by token_budget) are held, so
+    memory doesn't grow with the number of items submitted.
+    """
+
+    def __init__(self, client, cache: VerdictCache = None, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS,
+                 local_margin: float = None, checkpoint: CheckpointLog = None, stream: bool = False,
+                 label: str = 'pairs'):
+        self.client = client
+        self.label = label
+        self.cache = cache
+        self.token_budget = token_budget
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.stream = stream
+        self.local_margin = local_margin
+        self.detector = LanguageDetector() if local_margin is not None else None
+
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.in_flight = {}
+        self.waiting = {}
+        self.pending = {}
+        self.answered = {}
+        self.results = []
+
+        self.submitted = 0
+        self.local = 0
+        self.cached = 0
+        self.logged = 0
+        self.batches = 0
+        self.dispatched = 0
+        self.collected = 0
+        self.asked = 0
+        self.undecided = 0
+        self.spent = 0
+        self.budget_reached = False
+        self.tiers = {'local': 0, 'cached': 0, 'model': 0, 'undecided': 0}
+
+    @staticmethod
+    def item_key(item) -> str:
+        return json.dumps([item['pair'], item.get('context', '')], ensure_ascii=False)
+
+    def submit(self, item, tag, role: str = None):
+        """Classify one item; role is the sample role of a single text, if any"""
+        self.submitted += 1
+        key = self.item_key(item)
+
+        if key in self.waiting:
+            self.waiting[key].append(tag)
+            return
+        if key in self.answered:
+            self._emit(tag, self.answered[key], 'model')
+            return
+        if self.detector is not None:
+            verdict = local_verdict(self.detector, item['pair'], self.local_margin, role)
+            if verdict is not None:
+                self.local += 1
+                self._emit(tag, verdict, 'local')
+                return
+        cached = self.cache.get(MODEL, BATCH_PROMPT_VERSION, item) if self.cache is not None else None
+        if cached is not None:
+            self.cached += 1
+            self._emit(tag, cached, 'cached')
+            return
+
+        if self.budget_reached:
+            self.undecided += 1
+            self._emit(tag, None, 'undecided')
+            return
+
+        self.waiting[key] = [tag]
+        self.pending[key] = item
+        if len(self.pending) >= self.batch_size:
+            self._dispatch()
+
+    def _dispatch(self):
+        batch = list(self.pending)
+        items = [self.pending[key] for key in batch]
+        self.pending = {}
+        self.batches += 1
+        batch_key = make_key(MODEL, BATCH_PROMPT_VERSION, items, collapse_whitespace=True)
+
+        # Batches finished by an earlier, interrupted run cost nothing
+        if self.checkpoint is not None and batch_key in self.checkpoint:
+            self.logged += 1
+            self._answer(batch, items, {index: dict(verdict, tier='model')
+                                        for index, verdict in self.checkpoint.get(batch_key)})
+            return
+
+        # Spend the token budget batch by batch, in order
+        cost = estimate_tokens(batch_prompt(items)) + BATCH_OUTPUT_TOKENS_PER_PAIR * len(items)
+        if self.budget_reached or self.spent + cost > self.token_budget:
+            self.budget_reached = True
+            self._answer(batch, items, {})
+            return
+        self.spent += cost
+        self.dispatched += 1
+        self.asked += len(items)
+
+        # Keep a couple of batches queued per worker, no more
+        while len(self.in_flight) >= 2 * self.workers:
+            self._collect(next(as_completed(self.in_flight)))
+
+        future = self.executor.submit(classify_batch, self.client, items, self.stream)
+        self.in_flight[future] = (batch, items, batch_key)
+
+    def _collect(self, future):
+        batch, items, batch_key = self.in_flight.pop(future)
+        batch_verdicts = future.result()
+        # A failed or cut-off batch is left for a resumed run to ask again
+        if self.checkpoint is not None and len(batch_verdicts) == len(batch):
+            self.checkpoint.record(batch_key, sorted(batch_verdicts.items()), pairs=len(batch))
+        for verdict in batch_verdicts.values():
+            verdict['tier'] = 'model'
+        self._answer(batch, items, batch_verdicts)
+
+        self.collected += 1
+        if self.collected % 10 == 0:
+            print(f"  Classified {self.collected} {self.label} batches...")
+
+    def _answer(self, batch, items, batch_verdicts):
+        for index, (key, item) in enumerate(zip(batch, items)):
+            verdict = batch_verdicts.get(index)
+            tags = self.waiting.pop(key)
+            if verdict is None:
+                self.undecided += len(tags)
+            else:
+                self.answered[key] = verdict
+                if self.cache is not None:
+                    self.cache.put(MODEL, BATCH_PROMPT_VERSION, item, verdict)
+            for tag in tags:
+                self._emit(tag, verdict, 'model' if verdict is not None else 'undecided')
+
+    def _emit(self, tag, verdict, tier):
+        self.tiers[tier] += 1
+        self.results.append((tag, verdict))
+
+    def ready(self) -> list:
+        """(tag, verdict) pairs decided since the last call"""
+        for future in [future for future in self.in_flight if future.done()]:
+            self._collect(future)
+        results, self.results = self.results, []
+        return results
+
+    def finish(self) -> list:
+        """Dispatch the last partial batch, wait for every answer and return the remaining results"""
+        if self.pending:
+            self._dispatch()
+        while self.in_flight:
+            self._collect(next(as_completed(self.in_flight)))
+        self.executor.shutdown()
+        return self.ready()
+
+    def summary(self) -> str:
+        return (f"{self.submitted} checks: {self.local} decided locally, {self.cached} cached, "
+                f"{self.asked} sent in {self.dispatched} batches, {self.logged} batches from checkpoint "
+                f"(~{self.spent} tokens of {self.token_budget} budget)")
+
+    def tier_summary(self) -> str:
+        return "Checks by tier: " + ", ".join(f"{tier} {count}" for tier, count in self.tiers.items())
+
+def classify_pairs(client, items, **options) -> list:
+    """One verdict per {"pair", "context"} item, in order (see PairClassifier for the options)"""
+    classifier = PairClassifier(client, **options)
+    verdicts = [None] * len(items)
+    for index, item in enumerate(items):
+        classifier.submit(item, index)
+    for index, verdict in classifier.ready() + classifier.finish():
+        verdicts[index] = verdict
+    return verdicts
+
+def sample_candidates(record: SampleRecord):
+    """(text, role, expected_lang) checks for one samples map entry"""
+    if not isinstance(record.entries, list):
+        return []
+
+    # Skip very short texts (single words are hard to detect)
+    if len(record.text.split()) < 2:
+        return []
+
+    # We're looking for mismatched roles
+    # If role is "source" (English) but text is Spanish, that's a swap
+    # If role is "target1/target2" (Spanish) but text is English, that's a swap
+    # Presentations are spoken in the known language (English)
+    # (target1/target2 share a text, so each expected language is asked once)
+    candidates = []
+    seen = set()
+    for sample in record.entries:
+        role = sample.get('role', '')
+        expected_lang = "spanish" if role in ('target1', 'target2') else "english"
+        if expected_lang not in seen:
+            seen.add(expected_lang)
+            candidates.append((record.text, role, expected_lang))
+    return candidates
+
+NODE_CONTEXTS = {
+    'seed_node': "Main seed node",
+    'intro_item': "Introduction item",
+    'sub_node': "Sub-node"
+}
+
+def is_node_candidate(record: NodeRecord) -> bool:
+    """Nodes with enough text on both sides to judge"""
+    if not record.known or not record.target or len(record.known.split()) < 2:
+        return False
+    # Seed sentences must be multi-word on both sides
+    return record.kind != 'seed_node' or len(record.target.split()) >= 2
+
+def node_swap(record: NodeRecord, result: dict) -> dict:
+    swap = {'type': record.kind, 'seed_id': record.seed_id}
+    if record.item_id:
+        swap['item_id'] = record.item_id
+    swap.update({
+        'slice': record.slice_index,
+        'known': record.known,
+        'target': record.target,
+        'confidence': result.get('confidence'),
+        'reasoning': result.get('reasoning'),
+        'tier': result.get('tier', 'model')
+    })
+    return swap
+
+def sample_swap(text: str, role: str, expected_lang: str, result: dict) -> dict:
+    """The swap if the verdict puts the text in the other language, else None"""
+    # For our single-text check, we only look at [0] (the text we're checking)
+    detected_lang = "english" if result.get('english_index') == 0 else "spanish"
+    if detected_lang == expected_lang:
+        return None
+    return {
+        'text': text,
+        'role': role,
+        'expected_lang': expected_lang,
+        'detected_lang': detected_lang,
+        'confidence': result.get('confidence', 'unknown'),
+        'reasoning': result.get('reasoning', ''),
+        'tier': result.get('tier', 'model')
+    }
+
+def check_manifest(manifest_path: Path, client, cache: VerdictCache = None,
+                   token_budget: int = DEFAULT_TOKEN_BUDGET, local_margin: float = None,
+                   workers: int = DEFAULT_WORKERS, checkpoint: CheckpointLog = None,
+                   stream: bool = False) -> tuple:
+    """
+    Check seed nodes, introduction items, sub-nodes and samples for swaps
+
+    The manifest is streamed once with manifest_walker and every record is
+    handed to a classifier as it is read - one for nodes and one for
+    samples, each capped by token_budget - so batches go out while the
+    walk continues and only records awaiting the model are held.
+    Returns (node_swaps, sample_swaps, checks_by_tier): the swaps in manifest
+    order, and each classifier's tier counts keyed 'node' and 'sample'.
+    """
+    options = dict(cache=cache, token_budget=token_budget, workers=workers,
+                   local_margin=local_margin, checkpoint=checkpoint, stream=stream)
+    nodes = PairClassifier(client, label='node', **options)
+    samples = PairClassifier(client, label='sample', **options)
+    node_swaps = []
+    sample_swaps = []
+    seeds = set()
+    node_count = sample_count = 0
+    node_decided = sample_decided = 0
+
+    def take_nodes(results):
+        nonlocal node_decided
+        for (order, record), result in results:
+            if result:
+                node_decided += 1
+                # Swapped if English isn't at index 0 (known)
+                if result.get('english_index') != 0:
+                    node_swaps.append((order, node_swap(record, result)))
+
+    def take_samples(results):
+        nonlocal sample_decided
+        for (order, text, role, expected_lang), result in results:
+            if result:
+                sample_decided += 1
+                swap = sample_swap(text, role, expected_lang, result)
+                if swap:
+                    sample_swaps.append((order, swap))
+
+    print(f"\nStreaming {manifest_path.name}: nodes and sample texts are classified as they are read...")
+    for order, record in enumerate(walk_manifest(manifest_path)):
+        if isinstance(record, NodeRecord):
+            seeds.add(record.seed_id)
+            if is_node_candidate(record):
+                node_count += 1
+                nodes.submit({"pair": [record.known, record.target], "context": NODE_CONTEXTS[record.kind]},
+                             (order, record))
+        else:
+            for text, role, expected_lang in sample_candidates(record):
+                sample_count += 1
+                samples.submit({"pair": [text, ""], "context": f"Role: {role}"},
+                               (order, text, role, expected_lang), role)
+        take_nodes(nodes.ready())
+        take_samples(samples.ready())
+    take_nodes(nodes.finish())
+    take_samples(samples.finish())
 
-def check_seeds_and_nodes(manifest_path: Path, client, max_checks=100):
-    """Check seed nodes and sub-nodes for swaps"""
     print(f"\n{'='*60}")
     print(f"CLAUDE SWAP HUNTER - Seed Nodes")
     print(f"{'='*60}")
+    print(f"Checked nodes in {len(seeds)} seeds")
+    print(f"  {nodes.summary()}")
+    print(f"  {nodes.tier_summary()}")
+    if nodes.budget_reached:
+        print(f"  ℹ️  Token budget reached - {nodes.undecided} checks left undecided")
+
+    node_swaps = [swap for _, swap in sorted(node_swaps, key=lambda entry: entry[0])]
+    for swap in node_swaps:
+        print(f"\n  ❌ SWAP in {NODE_CONTEXTS[swap['type']].lower()}!")
+        print(f"     Known: {swap['known'][:50]}...")
+        print(f"     Target: {swap['target'][:50]}...")
+    print(f"\n  Checked {node_decided}/{node_count} total nodes")
 
-    with open(manifest_path, 'r', encoding='utf-8') as f:
-        manifest = json.load(f)
-
-    swaps_found = []
-    nodes_checked = 0
-
-    seeds = manifest.get('slices', [{}])[0].get('seeds', [])
-    print(f"Checking nodes in {len(seeds)} seeds...")
-
-    for seed in seeds:
-        if nodes_checked >= max_checks:
-            print(f"\n  ℹ️  Reached max checks ({max_checks}), stopping early")
-            break
-
-        # Check main seed node
-        seed_node = seed.get('node', {})
-        known = seed_node.get('known', {}).get('text', '')
-        target = seed_node.get('target', {}).get('text', '')
-
-        if known and target and len(known.split()) >= 2 and len(target.split()) >= 2:
-            nodes_checked += 1
-
-            if nodes_checked % 20 == 0:
-                print(f"  Checked {nodes_checked} nodes...")
-
-            result = ask_claude_about_pair(client, [known, target],
-                                          context="Main seed node")
-
-            if result and result.get('english_index') != 0:
-                # Swapped! English should be at index 0 (known)
-                swaps_found.append({
-                    'type': 'seed_node',
-                    'seed_id': seed.get('id', 'unknown'),
-                    'known': known,
-                    'target': target,
-                    'confidence': result.get('confidence'),
-                    'reasoning': result.get('reasoning')
-                })
-                print(f"\n  ❌ SWAP in seed node!")
-                print(f"     Known: {known[:50]}...")
-                print(f"     Target: {target[:50]}...")
-
-        # Check introduction_items
-        for item in seed.get('introduction_items', []):
-            if nodes_checked >= max_checks:
-                break
-
-            item_node = item.get('node', {})
-            known = item_node.get('known', {}).get('text', '')
-            target = item_node.get('target', {}).get('text', '')
-
-            if known and target and len(known.split()) >= 2:
-                nodes_checked += 1
-
-                result = ask_claude_about_pair(client, [known, target],
-                                              context="Introduction item")
-
-                if result and result.get('english_index') != 0:
-                    swaps_found.append({
-                        'type': 'intro_item',
-                        'seed_id': seed.get('id', 'unknown'),
-                        'item_id': item.get('id', 'unknown'),
-                        'known': known,
-                        'target': target,
-                        'confidence': result.get('confidence'),
-                        'reasoning': result.get('reasoning')
-                    })
-                    print(f"\n  ❌ SWAP in intro item!")
-                    print(f"     Known: {known[:50]}...")
-                    print(f"     Target: {target[:50]}...")
-
-            # Check sub-nodes
-            for node in item.get('nodes', []):
-                if nodes_checked >= max_checks:
-                    break
-
-                known = node.get('known', {}).get('text', '')
-                target = node.get('target', {}).get('text', '')
-
-                if known and target and len(known.split()) >= 2:
-                    nodes_checked += 1
-
-                    result = ask_claude_about_pair(client, [known, target],
-                                                  context="Sub-node")
-
-                    if result and result.get('english_index') != 0:
-                        swaps_found.append({
-                            'type': 'sub_node',
-                            'seed_id': seed.get('id', 'unknown'),
-                            'item_id': item.get('id', 'unknown'),
-                            'known': known,
-                            'target': target,
-                            'confidence': result.get('confidence'),
-                            'reasoning': result.get('reasoning')
-                        })
-                        print(f"\n  ❌ SWAP in sub-node!")
-                        print(f"     Known: {known[:50]}...")
-                        print(f"     Target: {target[:50]}...")
-
-    print(f"\n  Checked {nodes_checked} total nodes")
-    return swaps_found
+    print(f"\n{'='*60}")
+    print(f"CLAUDE SWAP HUNTER - Manifest Samples")
+    print(f"{'='*60}")
+    print(f"Checked {sample_count} sample texts")
+    print(f"  {samples.summary()}")
+    print(f"  {samples.tier_summary()}")
+    if samples.budget_reached:
+        print(f"  ℹ️  Token budget reached - {samples.undecided} checks left undecided")
+
+    sample_swaps = [swap for _, swap in sorted(sample_swaps, key=lambda entry: entry[0])]
+    for swap in sample_swaps:
+        print(f"\n  ❌ SWAP FOUND!")
+        print(f"     Text: {swap['text'][:60]}...")
+        print(f"     Role: {swap['role']} (expects {swap['expected_lang']})")
+        print(f"     Detected: {swap['detected_lang']}")
+        print(f"     Confidence: {swap['confidence']} ({swap['tier']})")
+    print(f"\n  Checked {sample_decided}/{sample_count} sample texts")
+
+    return node_swaps, sample_swaps, {'node': nodes.tiers, 'sample': samples.tiers}
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 claude_swap_hunter.py <course_directory> [manifest_filename]")
-        print("\nExample:")
-        print("  python3 claude_swap_hunter.py public/vfs/courses/spa_for_eng")
-        print("  python3 claude_swap_hunter.py public/vfs/courses/spa_for_eng Spanish_for_English_speakers_COURSE_20251118_015936.json")
-        print("\nRequires ANTHROPIC_API_KEY environment variable")
-        sys.exit(1)
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Use Claude Haiku to find swapped [English, Spanish] pairs in a course manifest',
+        epilog='Example: python3 claude_swap_hunter.py public/vfs/courses/spa_for_eng '
+               'Spanish_for_English_speakers_COURSE_20251118_015936.json\n'
+               'Requires ANTHROPIC_API_KEY environment variable')
+    parser.add_argument('course_dir', help='Course directory path')
+    parser.add_argument('manifest_filename', nargs='?',
+                        help='Manifest to check (default: most recent *_COURSE_*.json)')
+    parser.add_argument('--token-budget', type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help=f'Estimated tokens to spend per check phase (default: {DEFAULT_TOKEN_BUDGET})')
+    parser.add_argument('--hybrid', action='store_true',
+                        help='Decide clear-cut pairs locally with LanguageDetector, ask Claude only about ambiguous ones')
+    parser.add_argument('--margin', type=float, default=DEFAULT_LOCAL_MARGIN,
+                        help=f'Score margin needed for a local verdict in --hybrid mode (default: {DEFAULT_LOCAL_MARGIN})')
+    parser.add_argument('--calibrate', action='store_true',
+                        help="Report the detector's error rate on the course's labelled pairs per margin, then exit")
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore cached verdicts and do not record new ones')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Drop all cached verdicts for this model before running')
+    parser.add_argument('--resume', action='store_true',
+                        help=f'Skip batches already finished in {CHECKPOINT_FILE} from an interrupted run')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream responses and extract verdicts as they arrive')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent requests (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--rpm', type=int, default=DEFAULT_RPM,
+                        help=f'Requests per minute budget (default: {DEFAULT_RPM})')
+    parser.add_argument('--tpm', type=int, default=DEFAULT_TPM,
+                        help=f'Tokens per minute budget (default: {DEFAULT_TPM})')
+    parser.add_argument('--base-url',
+                        help='Send requests to this endpoint instead of the API (e.g. fake_llm_server.py)')
+
+    args = parser.parse_args()
+
+    if args.calibrate:
+        pairs = labelled_pairs(Path(args.course_dir))
+        if not pairs:
+            print(f"Error: No labelled pairs (lego_baskets.json, lego_pairs.json) in {args.course_dir}")
+            sys.exit(1)
+        print(f"LanguageDetector on {len(pairs)} labelled [English, Spanish] pairs:")
+        print(f"  {'margin':>6}  {'pairs decided':>15}  {'wrong':>5}  {'texts decided':>15}  {'wrong':>5}")
+        rows = calibrate_margin(LanguageDetector(), pairs)
+        for margin, decided, wrong, texts_decided, texts_wrong in rows:
+            print(f"  {margin:>6}  {decided:>8} ({100 * decided / len(pairs):4.1f}%)  {wrong:>5}"
+                  f"  {texts_decided:>15}  {texts_wrong:>5}")
+        safe = [margin for margin, _, wrong, _, texts_wrong in rows if wrong == 0 and texts_wrong == 0]
+        if safe:
+            print(f"\nSmallest margin without a wrong local verdict: {safe[0]}")
+        return
 
     # Check for API key
     api_key = os.environ.get('ANTHROPIC_API_KEY')
@@ -254,17 +641,19 @@ def main():
         print("  export ANTHROPIC_API_KEY='your-key-here'")
         sys.exit(1)
 
-    client = Anthropic(api_key=api_key)
+    # The scheduler does the retrying
+    client = LLMScheduler(Anthropic(api_key=api_key, base_url=args.base_url, max_retries=0),
+                          rpm=args.rpm, tpm=args.tpm, max_in_flight=args.workers)
 
-    course_dir = Path(sys.argv[1])
+    course_dir = Path(args.course_dir)
 
     if not course_dir.exists():
         print(f"Error: Directory not found: {course_dir}")
         sys.exit(1)
 
     # Find manifest file
-    if len(sys.argv) >= 3:
-        manifest_file = course_dir / sys.argv[2]
+    if args.manifest_filename:
+        manifest_file = course_dir / args.manifest_filename
     else:
         # Find most recent manifest
         manifests = list(course_dir.glob("*_COURSE_*.json"))
@@ -288,12 +677,37 @@ def main():
     print(f"actually understanding which text is English vs Spanish.")
     print(f"")
 
+    cache = None
+    if not args.no_cache:
+        # Language verdicts don't depend on spacing
+        cache = VerdictCache(course_dir / CACHE_FILE, collapse_whitespace=True)
+        if args.clear_cache:
+            print(f"Cleared {cache.invalidate(model=MODEL)} cached verdicts")
+        cache.purge_expired()
+
+    checkpoint = CheckpointLog(course_dir / CHECKPOINT_FILE, resume=args.resume, tool='claude_swap_hunter',
+                               model=MODEL, manifest=manifest_file.name)
+    if checkpoint.resumed:
+        print(f"Resuming: {checkpoint.resumed} finished batches in {CHECKPOINT_FILE}")
+
     all_swaps = []
 
-    # Check nodes (limited to 100 to save API costs)
-    print(f"\nPhase 1: Checking seed nodes (max 100 nodes)")
-    node_swaps = check_seeds_and_nodes(manifest_file, client, max_checks=100)
+    # One pass over the manifest, then nodes and samples
+    # (each phase capped by the token budget)
+    print(f"\nChecking seed nodes and samples (budget ~{args.token_budget} tokens per phase)")
+    local_margin = args.margin if args.hybrid else None
+
+    node_swaps, sample_swaps, checks_by_tier = check_manifest(
+        manifest_file, client, cache=cache, token_budget=args.token_budget, local_margin=local_margin,
+        workers=args.workers, checkpoint=checkpoint, stream=args.stream)
     all_swaps.extend(node_swaps)
+    all_swaps.extend(sample_swaps)
+    checkpoint.close()
+
+    if cache is not None:
+        print(f"\n  Verdict cache: {cache.hits} verdicts reused")
+    metrics = client.metrics()
+    print(f"  Scheduler: {format_metrics(metrics)}")
 
     print(f"\n{'='*60}")
     print(f"RESULTS")
@@ -311,12 +725,22 @@ def main():
         for swap_type, count in by_type.items():
             print(f"  {swap_type}: {count}")
 
+        by_tier = {}
+        for swap in all_swaps:
+            by_tier[swap['tier']] = by_tier.get(swap['tier'], 0) + 1
+        print(f"\nSwaps by deciding tier:")
+        for tier, count in by_tier.items():
+            print(f"  {tier}: {count}")
+
         # Save detailed report
         report_file = course_dir / 'claude_swap_hunter_report.json'
         with open(report_file, 'w', encoding='utf-8') as f:
             json.dump({
                 'total_swaps': len(all_swaps),
                 'swaps_by_type': by_type,
+                'swaps_by_tier': by_tier,
+                'checks_by_tier': checks_by_tier,
+                'scheduler': metrics,
                 'swaps': all_swaps
             }, f, ensure_ascii=False, indent=2)
 
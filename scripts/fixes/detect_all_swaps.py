@@ -78,6 +78,21 @@ class LanguageDetector:
 
         return max(0, min(100, score))
 
+    def get_english_score(self, text: str) -> float:
+        """Calculate how "English" a text is (0-100), on get_spanish_score's word scale"""
+        words = re.findall(r'\b\w+\b', text.lower()) if text else []
+        if not words:
+            return 0.0
+
+        english_word_count = sum(1 for w in words if w in self.english_words)
+        spanish_word_count = sum(1 for w in words if w in self.spanish_words)
+
+        # Mirror image of the word part of get_spanish_score
+        score = (english_word_count / len(words)) * 30
+        score -= (spanish_word_count / len(words)) * 20
+
+        return max(0, min(100, score))
+
     def is_swapped(self, pair: List[str]) -> Tuple[bool, float, float]:
         """
         Check if a [text1, text2] pair is swapped
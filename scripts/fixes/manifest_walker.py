@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Manifest Walker - stream an APML course manifest as typed records
+
+Yields every seed node, introduction item, sub-node and sample entry with
+its location, in a single pass over the file, so manifest checks don't each
+re-open the manifest and walk it with their own nested loops.
+
+When ijson is installed the manifest is parsed incrementally and only one
+seed (or one sample entry) is held in memory at a time, which keeps memory
+flat for large multi-slice manifests. Without ijson it falls back to
+json.load and yields the same records.
+
+Usage:
+  for record in walk_manifest(manifest_path):
+      if isinstance(record, NodeRecord):
+          ...
+      elif isinstance(record, SampleRecord):
+          ...
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+class NodeRecord(NamedTuple):
+    """A known/target node: kind is "seed_node", "intro_item" or "sub_node" """
+    kind: str
+    slice_index: int
+    seed_id: str
+    item_id: Optional[str]
+    known: str
+    target: str
+
+class SampleRecord(NamedTuple):
+    """One entry of a slice's samples map (text → sample entries)"""
+    slice_index: int
+    text: str
+    entries: List[Dict[str, Any]]
+
+ManifestRecord = Union[NodeRecord, SampleRecord]
+
+def _node_texts(node: dict) -> tuple:
+    node = node or {}
+    return node.get('known', {}).get('text', ''), node.get('target', {}).get('text', '')
+
+def seed_records(seed: dict, slice_index: int) -> Iterator[NodeRecord]:
+    """Flatten one seed into its node records (seed node, items, sub-nodes)"""
+    seed_id = seed.get('id', 'unknown')
+
+    known, target = _node_texts(seed.get('node'))
+    yield NodeRecord('seed_node', slice_index, seed_id, None, known, target)
+
+    for item in seed.get('introduction_items', []):
+        item_id = item.get('id', 'unknown')
+
+        known, target = _node_texts(item.get('node'))
+        yield NodeRecord('intro_item', slice_index, seed_id, item_id, known, target)
+
+        for node in item.get('nodes', []):
+            known, target = _node_texts(node)
+            yield NodeRecord('sub_node', slice_index, seed_id, item_id, known, target)
+
+def _walk_loaded(manifest: dict) -> Iterator[ManifestRecord]:
+    for slice_index, slice_data in enumerate(manifest.get('slices', [])):
+        for seed in slice_data.get('seeds', []):
+            yield from seed_records(seed, slice_index)
+        for text, entries in slice_data.get('samples', {}).items():
+            yield SampleRecord(slice_index, text, entries)
+
+    # Older flat manifests keep samples at the top level
+    for text, entries in manifest.get('samples', {}).items():
+        yield SampleRecord(0, text, entries)
+
+def _walk_stream(f) -> Iterator[ManifestRecord]:
+    slice_index = -1
+    builder = None
+    depth = 0
+    building = None
+    sample_text = None
+
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+
+            if depth == 0:
+                if building == 'seed':
+                    yield from seed_records(builder.value, slice_index)
+                else:
+                    yield SampleRecord(max(slice_index, 0), sample_text, builder.value)
+                builder = None
+            continue
+
+        if prefix == 'slices.item' and event == 'start_map':
+            slice_index += 1
+        elif prefix == 'slices.item.seeds.item' and event == 'start_map':
+            builder, depth, building = ijson.ObjectBuilder(), 1, 'seed'
+            builder.event(event, value)
+        elif prefix in ('slices.item.samples', 'samples') and event == 'map_key':
+            # The sample entries list follows as the next value
+            builder, depth, building, sample_text = ijson.ObjectBuilder(), 0, 'sample', value
+
+def walk_manifest(manifest_path: Path) -> Iterator[ManifestRecord]:
+    """Yield node and sample records for a manifest in one pass"""
+    with open(manifest_path, 'rb') as f:
+        if ijson is not None:
+            yield from _walk_stream(f)
+        else:
+            yield from _walk_loaded(json.load(f))
@@ -1,14 +1,40 @@
 #!/usr/bin/env python3
 """
-Transform Spanish course data into APML format matching Italian reference
+Transform course data into APML format matching Italian reference
 
-Input files (Spanish source):
+Works for any course pair - languages are read from the xxx_for_yyy
+course directory name (e.g. spa_for_eng → known "en", target "es").
+
+Input files (course source):
   - seed_pairs.json (Phase 1)
   - lego_pairs.json (Phase 3)
-  - lego_baskets_deduplicated.json (Phase 5)
+  - lego_baskets_deduplicated.json (Phase 5, falls back to lego_baskets.json)
+  - introductions.json (Phase 6)
 
 Output file (APML format):
-  - Spanish_for_English_speakers_COURSE_YYYYMMDD_HHMMSS.json
+  - <Target>_for_<Known>_speakers_COURSE_YYYYMMDD_HHMMSS.json
+    (e.g. Spanish_for_English_speakers_COURSE_YYYYMMDD_HHMMSS.json)
+
+Sample index:
+  Durations of audio already in samples_database are filled in from an
+  index of it kept in the user cache directory
+  (~/.cache/ssi-dashboard/sample_index.json). Samples that still need
+  audio are listed in missing_samples.json next to the manifest (or in
+  the file given with --missing-samples PATH).
+
+Batch mode (--all):
+  Builds manifests for every course the CourseRegistry finds under
+  public/vfs/courses/ in a process pool. Encouragements are loaded once
+  and shared by all builds.
+
+Incremental mode (--incremental):
+  Each course gets a build directory in the user cache directory
+  (~/.cache/ssi-dashboard/apml_builds/) holding apml_build_state.json. The
+  state keeps, per seed, the hash of its seed_pairs/lego_pairs/baskets/
+  introductions inputs, its serialized manifest entry and its sample ids. Only seeds
+  whose inputs changed are rebuilt; the others are written back from the
+  state as-is. The previous manifest is updated in place unless an output
+  file is given, and files whose content is unchanged are not rewritten.
 
 Based on: Italian_for_English_speakers_COURSE_20250827_144821.json
 """
@@ -16,20 +42,254 @@ Based on: Italian_for_English_speakers_COURSE_20250827_144821.json
 import json
 import uuid
 import hashlib
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_registry import ARTIFACTS, LANGUAGES, CourseRegistry, course_languages, default_cache_path
+
+# Bump when the seed/sample output format changes so incremental builds
+# don't reuse seeds produced by an older transformer
+BUILD_FORMAT_VERSION = "2"
+BUILD_STATE_FILE = "apml_build_state.json"
+BUILD_CACHE_DIR = default_cache_path().parent / 'apml_builds'
+
+# Shared samples database (repo root), the cached encouragement pools
+# extracted from the Italian reference course, and the index of the
+# samples database (kept with the other caches, out of the repo tree)
+SAMPLES_DATABASE_DIR = Path(__file__).resolve().parents[2] / 'samples_database'
+ENCOURAGEMENT_CACHE_FILE = SAMPLES_DATABASE_DIR / 'encouragement_samples' / 'reference_encouragements_cache.json'
+SAMPLE_INDEX_FILE = default_cache_path().parent / 'sample_index.json'
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.ogg'}
+MISSING_SAMPLES_FILE = "missing_samples.json"
+
+# Course artifacts a course needs before a manifest can be built
+REQUIRED_ARTIFACTS = ['seed_pairs', 'lego_pairs', 'introductions']
+
+def detect_course_languages(course_dir: Path) -> Tuple[str, str]:
+    """Detect (known, target) ISO 639-3 codes from an xxx_for_yyy directory name"""
+    target_code, known_code = course_languages(Path(course_dir).name)
+    return known_code, target_code
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless the file already holds exactly that; returns whether it wrote"""
+    path = Path(path)
+    try:
+        if path.stat().st_size == len(text.encode('utf-8')) and path.read_text(encoding='utf-8') == text:
+            return False
+    except OSError:
+        pass
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+# Stands in for the seed list while the rest of the manifest is serialized
+SEEDS_PLACEHOLDER = '\x00seeds'
+
+def manifest_text(course: Dict[str, Any], seed_outputs: List[str]) -> str:
+    """
+    Serialize a single-slice course exactly as json.dump(course, indent=2) would
+
+    The slice's seeds are taken from seed_outputs, each seed already
+    serialized with indent=2, so incremental builds only encode the seeds
+    they rebuilt. (json.dumps in one call is also several times faster than
+    json.dump, which streams through the pure-Python encoder.)
+    """
+    if not seed_outputs:
+        return json.dumps(course, ensure_ascii=False, indent=2)
+
+    skeleton = dict(course, slices=[dict(course['slices'][0], seeds=[SEEDS_PLACEHOLDER])])
+    text = json.dumps(skeleton, ensure_ascii=False, indent=2)
+
+    # Seeds sit four levels deep: course -> slices -> slice -> seeds -> seed
+    indent = ' ' * 8
+    seeds = ',\n'.join(indent + output.replace('\n', '\n' + indent) for output in seed_outputs)
+    return text.replace(indent + json.dumps(SEEDS_PLACEHOLDER), seeds, 1)
+
+def known_target(value) -> Tuple[str, str]:
+    """
+    Read a (known, target) pair from any of the course data formats
+
+    Accepts [known, target] arrays, {"known", "target"} objects and lego
+    entries that nest the pair under "lego".
+    """
+    if isinstance(value, dict):
+        if 'lego' in value and isinstance(value['lego'], dict):
+            value = value['lego']
+        return value['known'], value['target']
+    return value[0], value[1]
+
+# Tagged phrase in a presentation: {tag}'phrase' or {tag}"phrase"
+# Handles apostrophes correctly by using backreference
+TAGGED_PHRASE_PATTERN = re.compile(r'\{(\w+(?:-\w+)?)\}[\s]*([\'\"])(.*?)\2(?=[\s,.;:!?)]|$)')
+
+class PresentationParser:
+    """
+    Parse tagged phrases out of introduction presentations
+
+    Uses a pattern compiled once at import, so the whole introductions.json
+    can be tokenized in a single bulk pass per build.
+    """
+
+    def parse(self, presentation: str) -> List[Tuple[str, str]]:
+        """Return (tag, phrase) tuples for one presentation"""
+        if not presentation:
+            return []
 
-class SpanishToAPMLTransformer:
-    def __init__(self, course_dir: str):
+        # Tag is in group 1, text is in group 3
+        return [(m.group(1), m.group(3)) for m in TAGGED_PHRASE_PATTERN.finditer(presentation)]
+
+    def parse_all(self, presentations: Dict[str, str]) -> List[Tuple[str, str, str]]:
+        """Return a flat (lego_id, tag, phrase) table for all presentations"""
+        rows = []
+        for lego_id, presentation in presentations.items():
+            if presentation is not None and not isinstance(presentation, str):
+                # Some courses store phrase lists here; they carry no tags
+                print(f"  WARNING: Skipping {type(presentation).__name__} presentation for {lego_id}")
+                continue
+            for tag, phrase in self.parse(presentation):
+                rows.append((lego_id, tag, phrase))
+        return rows
+
+class SampleIndex:
+    """
+    On-disk index of the audio samples already in samples_database
+
+    Maps sample ID (upper-case UUID) → {"duration", "file"}. Sample
+    registries (JSON files with a "samples" map) contribute durations under
+    both their uuid and canonicalId; audio files named <uuid>.<ext> contribute
+    their location. Each source file's entries are stored with its mtime and
+    size, so refreshing only re-reads files that changed.
+    """
+
+    def __init__(self, root: Path = SAMPLES_DATABASE_DIR, index_file: Path = SAMPLE_INDEX_FILE):
+        self.root = Path(root)
+        self.index_file = Path(index_file)
+        self.samples = {}
+
+    def _scan_source(self, path: Path) -> Dict[str, Dict[str, Any]]:
+        """Index entries contributed by a single file"""
+        rel = str(path.relative_to(self.root))
+
+        if path.suffix.lower() in AUDIO_EXTENSIONS:
+            return {path.stem.upper(): {"duration": None, "file": rel}}
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  WARNING: Could not index {rel}: {e}")
+            return {}
+
+        entries = {}
+        registry = data.get('samples') if isinstance(data, dict) else None
+        if isinstance(registry, dict):
+            for key, sample in registry.items():
+                if not isinstance(sample, dict):
+                    continue
+                record = {"duration": sample.get('duration'), "file": rel}
+                for sample_id in (key, sample.get('uuid'), sample.get('canonicalId')):
+                    if sample_id:
+                        entries[sample_id.upper()] = record
+        return entries
+
+    def load(self) -> 'SampleIndex':
+        """Load the index, re-reading only sources that changed since it was written"""
+        sources = {}
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    sources = json.load(f).get('sources', {})
+            except (OSError, ValueError):
+                sources = {}
+
+        current = {}
+        rescanned = 0
+        skip = {self.index_file.resolve(), ENCOURAGEMENT_CACHE_FILE.resolve()}
+
+        if self.root.exists():
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    if path.suffix.lower() not in AUDIO_EXTENSIONS | {'.json'} or path.resolve() in skip:
+                        continue
+
+                    rel = str(path.relative_to(self.root))
+                    stat = path.stat()
+                    cached = sources.get(rel)
+                    if cached and (cached['mtime'], cached['size']) == (stat.st_mtime, stat.st_size):
+                        current[rel] = cached
+                    else:
+                        current[rel] = {
+                            "mtime": stat.st_mtime,
+                            "size": stat.st_size,
+                            "samples": self._scan_source(path)
+                        }
+                        rescanned += 1
+
+        # Audio file locations win over registry entries; durations come
+        # from whichever source has one
+        self.samples = {}
+        for rel in sorted(current, key=lambda r: Path(r).suffix.lower() in AUDIO_EXTENSIONS):
+            for sample_id, record in current[rel]['samples'].items():
+                existing = self.samples.get(sample_id)
+                if existing:
+                    record = {
+                        "duration": record['duration'] if record['duration'] is not None else existing['duration'],
+                        "file": record['file']
+                    }
+                self.samples[sample_id] = record
+
+        if rescanned or set(current) != set(sources):
+            try:
+                self.index_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.index_file, 'w', encoding='utf-8') as f:
+                    json.dump({"version": 1, "sources": current}, f, ensure_ascii=False)
+            except OSError as e:
+                print(f"  WARNING: Could not write sample index: {e}")
+
+        print(f"  Sample index: {len(self.samples)} samples from {len(current)} files ({rescanned} re-read)")
+        return self
+
+    def get(self, sample_id: str) -> Optional[Dict[str, Any]]:
+        return self.samples.get(sample_id.upper())
+
+class APMLTransformer:
+    def __init__(self, course_dir: str, known_code: str = None, target_code: str = None,
+                 sample_index: SampleIndex = None):
         self.course_dir = Path(course_dir)
+        self.sample_index = sample_index
+        self.missing_samples = {}
+        self.missing_samples_file = None
         self.seed_pairs = {}
         self.lego_pairs = {}
         self.lego_baskets = {}
         self.introductions = {}
-        self.known_lang = "en"
-        self.target_lang = "es"
+        self.source_files = []
+        self.presentation_parser = PresentationParser()
+        self.presentation_rows = []
+        self.tagged_by_lego = {}
+        self.tagged_by_presentation = {}
+
+        if known_code is None or target_code is None:
+            known_code, target_code = detect_course_languages(self.course_dir)
+
+        self.known_lang, self.known_name = LANGUAGES[known_code]
+        self.target_lang, self.target_name = LANGUAGES[target_code]
 
     def generate_deterministic_uuid(self, text: str, language: str, role: str, cadence: str) -> str:
         """
@@ -68,8 +328,9 @@ class SpanishToAPMLTransformer:
         return f"{seg1}-{seg2}-{seg3}-{seg4}-{seg5}"
 
     def load_source_files(self):
-        """Load all Spanish source files"""
+        """Load all course source files"""
         print("Loading source files...")
+        self.source_files = [self.course_dir / ARTIFACTS[name] for name in REQUIRED_ARTIFACTS]
 
         # Load seed_pairs.json
         with open(self.course_dir / 'seed_pairs.json', 'r', encoding='utf-8') as f:
@@ -83,20 +344,35 @@ class SpanishToAPMLTransformer:
             for seed in lego_data.get('seeds', []):
                 self.lego_pairs[seed['seed_id']] = seed
 
-        # Load lego_baskets_deduplicated.json
-        with open(self.course_dir / 'lego_baskets_deduplicated.json', 'r', encoding='utf-8') as f:
-            basket_data = json.load(f)
-            self.lego_baskets = basket_data.get('baskets', {})
+        # Load lego_baskets_deduplicated.json (or raw lego_baskets.json if not deduplicated yet)
+        baskets_file = self.course_dir / 'lego_baskets_deduplicated.json'
+        if not baskets_file.exists():
+            baskets_file = self.course_dir / 'lego_baskets.json'
+        if baskets_file.exists():
+            self.source_files.append(baskets_file)
+            with open(baskets_file, 'r', encoding='utf-8') as f:
+                basket_data = json.load(f)
+                self.lego_baskets = basket_data.get('baskets', {})
 
         # Load introductions.json
         with open(self.course_dir / 'introductions.json', 'r', encoding='utf-8') as f:
             intro_data = json.load(f)
             self.introductions = intro_data.get('presentations', {})
 
+        self.index_presentations()
+
         print(f"  Loaded {len(self.seed_pairs)} seed pairs")
         print(f"  Loaded {len(self.lego_pairs)} lego seed entries")
         print(f"  Loaded {len(self.lego_baskets)} practice baskets")
         print(f"  Loaded {len(self.introductions)} introduction presentations")
+        print(f"  Parsed {len(self.presentation_rows)} tagged presentation phrases")
+
+    def index_presentations(self):
+        """Tokenize all presentations once into the (lego_id, tag, phrase) table"""
+        self.presentation_rows = self.presentation_parser.parse_all(self.introductions)
+        self.tagged_by_lego = {}
+        for lego_id, tag, phrase in self.presentation_rows:
+            self.tagged_by_lego.setdefault(lego_id, []).append((tag, phrase))
 
     def tokenize(self, text: str) -> List[str]:
         """Simple tokenization - split on whitespace and punctuation"""
@@ -128,22 +404,25 @@ class SpanishToAPMLTransformer:
         Lego structure:
           - id: S0001L01
           - type: A or M
-          - target: "quiero" (Spanish)
-          - known: "I want" (English)
+          - target: "quiero" (target language)
+          - known: "I want" (known language)
           - new: true/false
         """
         lego_id = lego_data['id']
-        known = lego_data['known']
-        target = lego_data['target']
+        known, target = known_target(lego_data)
 
         # Create main node
         main_node = self.create_node(known, target)
 
         # Get presentation text from introductions.json
         presentation = self.introductions.get(lego_id)
-        if not presentation:
-            # Fallback to generic presentation if not found
-            presentation = f"The Spanish for '{known}', is: ... '{target}' ... '{target}'"
+        if not isinstance(presentation, str) or not presentation:
+            # Fallback to generic presentation if not found (or not text)
+            presentation = f"The {self.target_name} for '{known}', is: ... '{target}' ... '{target}'"
+
+        # Remember this presentation's tagged phrases so collect_samples
+        # doesn't have to re-parse it (fallback presentations have no tags)
+        self.tagged_by_presentation.setdefault(presentation, self.tagged_by_lego.get(lego_id, []))
 
         # Get practice basket for this lego if available
         basket = self.lego_baskets.get(lego_id, {})
@@ -154,8 +433,7 @@ class SpanishToAPMLTransformer:
         if practice_phrases:
             # Sample a few practice phrases to create sub-nodes
             for phrase in practice_phrases[:3]:  # Take first 3
-                phrase_known = phrase[0]  # English
-                phrase_target = phrase[1]  # Spanish
+                phrase_known, phrase_target = known_target(phrase)
                 nodes.append(self.create_node(phrase_known, phrase_target))
 
         return {
@@ -172,8 +450,7 @@ class SpanishToAPMLTransformer:
         if not seed_pair:
             raise ValueError(f"Seed {seed_id} not found in seed_pairs")
 
-        known_sentence = seed_pair[0]  # English
-        target_sentence = seed_pair[1]  # Spanish
+        known_sentence, target_sentence = known_target(seed_pair)
 
         # Get lego data
         lego_data = self.lego_pairs.get(seed_id)
@@ -198,41 +475,62 @@ class SpanishToAPMLTransformer:
             "introduction_items": introduction_items
         }
 
+    def seed_input_hash(self, seed_id: str) -> str:
+        """
+        Hash every source input that feeds a seed entry
+
+        Covers the seed pair, the lego_pairs entry, and the basket and
+        introduction of each lego in the seed.
+        """
+        lego_data = self.lego_pairs.get(seed_id, {})
+        lego_ids = [lego.get('id') for lego in lego_data.get('legos', [])]
+
+        payload = {
+            "format": BUILD_FORMAT_VERSION,
+            "seed_pair": self.seed_pairs.get(seed_id),
+            "lego_pairs": lego_data,
+            "baskets": {lid: self.lego_baskets.get(lid) for lid in lego_ids},
+            "introductions": {lid: self.introductions.get(lid) for lid in lego_ids}
+        }
+
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()
+
     def extract_tagged_phrases(self, presentation: str) -> List[Tuple[str, str]]:
         """
         Extract tagged phrases from presentation text like {target1}'estoy' means I'm
         Returns list of tuples (tag, phrase)
         """
-        if not presentation:
-            return []
-
-        # Pattern: {tag}'phrase' or {tag}"phrase"
-        # Handles apostrophes correctly by using backreference
-        pattern = r'\{(\w+(?:-\w+)?)\}[\s]*([\'\"])(.*?)\2(?=[\s,.;:!?)]|$)'
+        tagged = self.tagged_by_presentation.get(presentation)
+        if tagged is None:
+            tagged = self.presentation_parser.parse(presentation)
+        return tagged
 
-        matches = re.findall(pattern, presentation)
-
-        # Process matches - tag is in group 1, text is in group 3
-        results = []
-        for tag, quote, text in matches:
-            results.append((tag, text))
+    def sample_language(self, role: str) -> str:
+        """Language a sample is spoken in, from its role"""
+        if role in ['target1', 'target2']:
+            return self.target_lang
+        # source, presentation and anything else are in the known language
+        return self.known_lang
 
-        return results
+    def sample_id(self, text: str, role: str) -> str:
+        return self.generate_deterministic_uuid(text, self.sample_language(role), role, "natural")
 
-    def create_sample_entry(self, text: str, role: str, duration: float = None) -> Dict[str, Any]:
+    def create_sample_entry(self, text: str, role: str, duration: float = None,
+                            sample_id: str = None) -> Dict[str, Any]:
         """Create a sample entry for the samples dictionary"""
-        # Determine language based on role
-        if role in ['target1', 'target2']:
-            language = self.target_lang
-        elif role == 'source':
-            language = self.known_lang
-        elif role == 'presentation':
-            language = self.known_lang
-        else:
-            language = self.known_lang  # Default to known language
-
+        language = self.sample_language(role)
         cadence = "natural"
-        sample_id = self.generate_deterministic_uuid(text, language, role, cadence)
+        if sample_id is None:
+            sample_id = self.generate_deterministic_uuid(text, language, role, cadence)
+
+        # Fill in durations of audio that already exists in samples_database
+        if self.sample_index is not None and duration is None:
+            known_sample = self.sample_index.get(sample_id)
+            if known_sample:
+                duration = known_sample['duration']
+            else:
+                self.missing_samples[sample_id] = {"text": text, "role": role, "language": language}
 
         return {
             "duration": duration,
@@ -241,107 +539,257 @@ class SpanishToAPMLTransformer:
             "role": role
         }
 
-    def collect_samples(self, seeds: List[Dict]) -> Dict[str, List[Dict]]:
-        """Collect all unique phrases and create sample entries"""
+    def collect_seed_samples(self, seed: Dict) -> Dict[str, List[str]]:
+        """
+        Collect the sample texts used by a single seed
+
+        Returns {text: [roles]} in first-seen order. seed_sample_ids() pairs
+        the roles with their sample ids for build_samples().
+        """
         samples = {}
 
-        for seed in seeds:
-            # Add seed sentence (known)
-            known_text = seed['node']['known']['text']
-            if known_text not in samples:
-                samples[known_text] = [self.create_sample_entry(known_text, "source")]
-
-            # Add seed sentence (target) - two versions
-            target_text = seed['node']['target']['text']
-            if target_text not in samples:
-                samples[target_text] = [
-                    self.create_sample_entry(target_text, "target1"),
-                    self.create_sample_entry(target_text, "target2")
-                ]
-
-            # Add introduction items
-            for item in seed.get('introduction_items', []):
-                # Known text
-                item_known = item['node']['known']['text']
-                if item_known not in samples:
-                    samples[item_known] = [self.create_sample_entry(item_known, "source")]
-
-                # Target text - two versions
-                item_target = item['node']['target']['text']
-                if item_target not in samples:
-                    samples[item_target] = [
-                        self.create_sample_entry(item_target, "target1"),
-                        self.create_sample_entry(item_target, "target2")
-                    ]
-
-                # Presentation
-                presentation = item.get('presentation', '')
-                if presentation:
-                    # Add the full presentation
-                    if presentation not in samples:
-                        samples[presentation] = [self.create_sample_entry(presentation, "presentation")]
-
-                    # Extract and add tagged phrases (e.g., {target1}'estoy' means I'm)
-                    tagged_phrases = self.extract_tagged_phrases(presentation)
-                    for tag, phrase in tagged_phrases:
-                        # Only create samples for target language tags
-                        if tag in ['target1', 'target2']:
-                            if phrase not in samples:
-                                # Create both target1 and target2 for consistency
-                                samples[phrase] = [
-                                    self.create_sample_entry(phrase, "target1"),
-                                    self.create_sample_entry(phrase, "target2")
-                                ]
-                        elif tag == 'source':
-                            if phrase not in samples:
-                                samples[phrase] = [self.create_sample_entry(phrase, "source")]
-
-                # Sub-nodes
-                for node in item.get('nodes', []):
-                    node_known = node['known']['text']
-                    node_target = node['target']['text']
-
-                    if node_known not in samples:
-                        samples[node_known] = [self.create_sample_entry(node_known, "source")]
-
-                    if node_target not in samples:
-                        samples[node_target] = [
-                            self.create_sample_entry(node_target, "target1"),
-                            self.create_sample_entry(node_target, "target2")
-                        ]
+        def add(text: str, roles: List[str]):
+            if text not in samples:
+                samples[text] = roles
+
+        # Seed sentence - known once, target in two versions
+        add(seed['node']['known']['text'], ["source"])
+        add(seed['node']['target']['text'], ["target1", "target2"])
+
+        # Add introduction items
+        for item in seed.get('introduction_items', []):
+            add(item['node']['known']['text'], ["source"])
+            add(item['node']['target']['text'], ["target1", "target2"])
+
+            # Presentation
+            presentation = item.get('presentation', '')
+            if presentation:
+                # Add the full presentation
+                add(presentation, ["presentation"])
+
+                # Extract and add tagged phrases (e.g., {target1}'estoy' means I'm)
+                for tag, phrase in self.extract_tagged_phrases(presentation):
+                    # Only create samples for target language tags
+                    if tag in ['target1', 'target2']:
+                        # Create both target1 and target2 for consistency
+                        add(phrase, ["target1", "target2"])
+                    elif tag == 'source':
+                        add(phrase, ["source"])
+
+            # Sub-nodes
+            for node in item.get('nodes', []):
+                add(node['known']['text'], ["source"])
+                add(node['target']['text'], ["target1", "target2"])
 
         return samples
 
-    def load_encouragements(self, italian_course_path: str) -> tuple:
-        """Load encouragements from Italian reference course"""
+    def seed_sample_ids(self, samples: Dict[str, List[str]]) -> List[list]:
+        """[[text, [[role, sample_id], ...]], ...] for one seed's {text: [roles]}"""
+        return [[text, [[role, self.sample_id(text, role)] for role in roles]] for text, roles in samples.items()]
+
+    def build_samples(self, seed_samples: List[List[list]]) -> Dict[str, List[Dict]]:
+        """Merge per-seed sample ids (in seed order) into the samples map"""
+        samples = {}
+        self.missing_samples = {}
+
+        for per_seed in seed_samples:
+            for text, role_ids in per_seed:
+                if text not in samples:
+                    samples[text] = [self.create_sample_entry(text, role, sample_id=sample_id)
+                                     for role, sample_id in role_ids]
+
+        return samples
+
+    def collect_samples(self, seeds: List[Dict]) -> Dict[str, List[Dict]]:
+        """Collect all unique phrases and create sample entries"""
+        return self.build_samples([self.seed_sample_ids(self.collect_seed_samples(seed)) for seed in seeds])
+
+    @property
+    def build_dir(self) -> Path:
+        """Per-course directory for incremental build files, outside the course tree"""
+        course_path = str(self.course_dir.resolve())
+        digest = hashlib.sha1(course_path.encode('utf-8')).hexdigest()[:10]
+        return BUILD_CACHE_DIR / f"{self.course_dir.resolve().name}-{digest}"
+
+    def source_digests(self) -> Dict[str, str]:
+        """SHA-256 of each source file loaded by load_source_files()"""
+        return {path.name: file_sha256(path) for path in self.source_files}
+
+    def load_build_state(self) -> Dict[str, Any]:
+        """
+        Load the previous build state
+
+        Returns an empty dict when there is nothing usable to build on,
+        which makes the build a full rebuild.
+        """
+        state_file = self.build_dir / BUILD_STATE_FILE
+        if not state_file.exists():
+            print("  No previous build state - doing a full build")
+            return {}
+
         try:
-            with open(italian_course_path, 'r', encoding='utf-8') as f:
-                it_course = json.load(f)
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  WARNING: Could not load previous build ({e}) - doing a full build")
+            return {}
+
+        if state.get('format') != BUILD_FORMAT_VERSION:
+            print("  Build state is from an older transformer - doing a full build")
+            return {}
+
+        return state
+
+    def write_missing_samples(self, missing_file: Path):
+        """List the samples that still need audio generating"""
+        missing_file = Path(missing_file)
+        text = json.dumps({
+            "total_missing": len(self.missing_samples),
+            "samples": self.missing_samples
+        }, ensure_ascii=False, indent=2)
+        write_if_changed(missing_file, text)
+        self.missing_samples_file = missing_file
+
+        print(f"  {len(self.missing_samples)} samples have no audio yet - listed in {missing_file}")
+
+    def _relative_to_course(self, path) -> str:
+        """Store paths inside the course directory by name so state stays portable"""
+        path = Path(path)
+        if path.resolve().parent == self.course_dir.resolve():
+            return path.name
+        return str(path.resolve())
+
+    def write_build_state(self, output_file: Path, course: Dict[str, Any], sources: Dict[str, str],
+                          seed_states: Dict[str, Dict]):
+        """Record per-seed input hashes and outputs for the next incremental build"""
+        state = {
+            "format": BUILD_FORMAT_VERSION,
+            "manifest": self._relative_to_course(output_file),
+            "introduction": course['introduction'],
+            "slice_id": course['slices'][0]['id'],
+            "sources": sources,
+            "seeds": seed_states
+        }
+
+        write_if_changed(self.build_dir / BUILD_STATE_FILE, json.dumps(state, ensure_ascii=False))
 
-            first_slice = it_course['slices'][0]
-            pooled = first_slice.get('pooledEncouragements', [])
-            ordered = first_slice.get('orderedEncouragements', [])
+    @staticmethod
+    def load_encouragement_cache() -> Dict[str, Any]:
+        """Read ENCOURAGEMENT_CACHE_FILE; an unreadable cache is treated as empty"""
+        if not ENCOURAGEMENT_CACHE_FILE.exists():
+            return {}
+        try:
+            with open(ENCOURAGEMENT_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  WARNING: Ignoring unreadable encouragement cache: {e}")
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    @staticmethod
+    def valid_encouragement_entry(entry) -> bool:
+        """Whether a cache entry has every field load_encouragements relies on"""
+        return (isinstance(entry, dict)
+                and isinstance(entry.get('sha256'), str)
+                and isinstance(entry.get('pooled'), list)
+                and isinstance(entry.get('ordered'), list)
+                and 'mtime' in entry and 'size' in entry)
+
+    @staticmethod
+    def load_encouragements(italian_course_path: str) -> tuple:
+        """
+        Load encouragements from Italian reference course
 
-            print(f"  Loaded {len(pooled)} pooled encouragements")
-            print(f"  Loaded {len(ordered)} ordered encouragements")
+        The pools are cached in ENCOURAGEMENT_CACHE_FILE keyed by the
+        reference file's mtime/size and SHA-256, so the multi-megabyte
+        reference course is only parsed when it actually changes. A missing,
+        corrupt or incomplete cache entry is a cache miss; the pools are
+        only empty when the reference course itself can't be parsed.
+        """
+        reference = Path(italian_course_path).resolve()
+        cache = APMLTransformer.load_encouragement_cache()
+        entry = cache.get(str(reference))
+        if not APMLTransformer.valid_encouragement_entry(entry):
+            entry = None
 
-            return pooled, ordered
+        try:
+            stat = reference.stat()
+
+            source = None
+            digest = None
+            if entry and (entry['mtime'], entry['size']) == (stat.st_mtime, stat.st_size):
+                source = "cache"
+            elif entry:
+                # mtime changed - fall back to the content hash before paying
+                # for a full parse
+                digest = file_sha256(reference)
+                if entry['sha256'] == digest:
+                    source = "cache (touched)"
+
+            if source is None:
+                digest = digest or file_sha256(reference)
+                with open(reference, 'r', encoding='utf-8') as f:
+                    it_course = json.load(f)
+
+                first_slice = it_course['slices'][0]
+                entry = {
+                    'sha256': digest,
+                    'pooled': first_slice.get('pooledEncouragements', []),
+                    'ordered': first_slice.get('orderedEncouragements', [])
+                }
+                source = "reference course"
         except Exception as e:
             print(f"  WARNING: Could not load encouragements: {e}")
             return [], []
 
-    def transform(self, output_file: str = None, italian_reference: str = None) -> Dict[str, Any]:
-        """Transform Spanish course to APML format"""
+        if source != "cache":
+            entry.update({'mtime': stat.st_mtime, 'size': stat.st_size})
+            cache[str(reference)] = entry
+            try:
+                ENCOURAGEMENT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+                with open(ENCOURAGEMENT_CACHE_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(cache, f, ensure_ascii=False)
+            except OSError as e:
+                print(f"  WARNING: Could not write encouragement cache: {e}")
+
+        pooled, ordered = entry['pooled'], entry['ordered']
+
+        print(f"  Loaded {len(pooled)} pooled encouragements (from {source})")
+        print(f"  Loaded {len(ordered)} ordered encouragements")
+
+        return pooled, ordered
+
+    def transform(self, output_file: str = None, italian_reference: str = None,
+                  incremental: bool = False, encouragements: Tuple[List, List] = None,
+                  missing_samples_file: str = None) -> Dict[str, Any]:
+        """
+        Transform course to APML format
+
+        encouragements: preloaded (pooled, ordered) pools - batch builds pass
+        these so the reference course is only read once
+        missing_samples_file: where to list samples without audio (default:
+        missing_samples.json next to the manifest); needs a sample index
+        """
         print("\nTransforming to APML format...")
 
+        # Previous build to reuse unchanged seeds from (incremental mode only)
+        state, sources = {}, {}
+        if incremental:
+            state = self.load_build_state()
+            sources = self.source_digests()
+
+        previous_states = state.get('seeds', {})
+        # Identical source files mean identical per-seed inputs - skip hashing
+        sources_unchanged = bool(state) and state.get('sources') == sources
+
         # Create main course structure
         course = {
-            "id": "en-es",
-            "known": "en",
-            "target": "es",
+            "id": f"{self.known_lang}-{self.target_lang}",
+            "known": self.known_lang,
+            "target": self.target_lang,
             "version": "3.2.0",
             "status": "alpha",
-            "introduction": {
+            "introduction": state.get('introduction') or {
                 "id": str(uuid.uuid4()).upper(),
                 "cadence": "natural",
                 "role": "presentation",
@@ -352,12 +800,14 @@ class SpanishToAPMLTransformer:
 
         # Load encouragements from Italian reference if provided
         pooled_enc, ordered_enc = [], []
-        if italian_reference:
+        if encouragements is not None:
+            pooled_enc, ordered_enc = encouragements
+        elif italian_reference:
             pooled_enc, ordered_enc = self.load_encouragements(italian_reference)
 
         # Create a single slice with all seeds
         slice_data = {
-            "id": str(uuid.uuid4()).upper(),
+            "id": state.get('slice_id') or str(uuid.uuid4()).upper(),
             "seeds": [],
             "pooledEncouragements": pooled_enc,
             "orderedEncouragements": ordered_enc,
@@ -369,55 +819,179 @@ class SpanishToAPMLTransformer:
         seed_ids = sorted(self.seed_pairs.keys())
         print(f"  Processing {len(seed_ids)} seeds...")
 
+        seed_states = {}
+        seed_outputs = []
+        seed_samples = []
+        rebuilt = 0
+
         for i, seed_id in enumerate(seed_ids, 1):
             if i % 50 == 0:
                 print(f"    Processed {i}/{len(seed_ids)} seeds...")
 
-            try:
-                seed_entry = self.create_seed(seed_id)
-                slice_data['seeds'].append(seed_entry)
-            except Exception as e:
-                print(f"    WARNING: Failed to process {seed_id}: {e}")
-                continue
+            prev = previous_states.get(seed_id)
+            if prev and sources_unchanged:
+                input_hash = prev['hash']
+            else:
+                input_hash = self.seed_input_hash(seed_id)
+
+            if prev and prev['hash'] == input_hash:
+                # Unchanged inputs - reuse the serialized seed entry and its
+                # sample ids as-is (decoding is far cheaper than re-encoding)
+                output, samples = prev['output'], prev['samples']
+                seed_entry = json.loads(output)
+            else:
+                try:
+                    seed_entry = self.create_seed(seed_id)
+                except Exception as e:
+                    print(f"    WARNING: Failed to process {seed_id}: {e}")
+                    continue
+                output = json.dumps(seed_entry, ensure_ascii=False, indent=2)
+                samples = self.seed_sample_ids(self.collect_seed_samples(seed_entry))
+                rebuilt += 1
+
+            slice_data['seeds'].append(seed_entry)
+            seed_outputs.append(output)
+            seed_samples.append(samples)
+            seed_states[seed_id] = {"hash": input_hash, "output": output, "samples": samples}
+
+        if incremental:
+            print(f"  Rebuilt {rebuilt} seeds, reused {len(slice_data['seeds']) - rebuilt} unchanged")
 
         # Collect all samples
         print(f"  Collecting samples from {len(slice_data['seeds'])} seeds...")
-        slice_data['samples'] = self.collect_samples(slice_data['seeds'])
+        slice_data['samples'] = self.build_samples(seed_samples)
         print(f"  Generated {len(slice_data['samples'])} unique sample entries")
 
         course['slices'].append(slice_data)
 
         print(f"  Created course with {len(slice_data['seeds'])} seeds")
 
-        # Write output
+        # Write output - incremental builds update the previous manifest in place
+        if output_file is None and state and (self.course_dir / state['manifest']).exists():
+            output_file = self.course_dir / state['manifest']
         if output_file is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = self.course_dir / f"Spanish_for_English_speakers_COURSE_{timestamp}.json"
+            output_file = self.course_dir / f"{self.target_name}_for_{self.known_name}_speakers_COURSE_{timestamp}.json"
+
+        if write_if_changed(output_file, manifest_text(course, seed_outputs)):
+            print(f"\nWrote output to: {output_file}")
+        else:
+            print(f"\nOutput unchanged: {output_file}")
 
-        print(f"\nWriting output to: {output_file}")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(course, f, ensure_ascii=False, indent=2)
+        if self.sample_index is not None:
+            self.write_missing_samples(missing_samples_file or Path(output_file).parent / MISSING_SAMPLES_FILE)
+
+        if incremental:
+            self.build_dir.mkdir(parents=True, exist_ok=True)
+            self.write_build_state(output_file, course, sources, seed_states)
 
         print("✓ Transformation complete!")
 
         return course
 
-def main():
-    import sys
+class SpanishToAPMLTransformer(APMLTransformer):
+    """Spanish for English speakers, regardless of the course directory name"""
 
-    if len(sys.argv) < 2:
-        print("Usage: python3 transform_spanish_to_apml_format.py <course_directory> [italian_reference] [output_file]")
+    def __init__(self, course_dir: str):
+        super().__init__(course_dir, known_code='eng', target_code='spa')
+
+def find_course_dirs(courses_root: Path) -> List[Path]:
+    """Course directories under courses_root that have everything a manifest build needs"""
+    registry = CourseRegistry.discover(courses_root)
+    return [Path(course.path) for course in registry.select()
+            if all(name in course.artifacts for name in REQUIRED_ARTIFACTS)]
+
+def build_course(course_dir: str, encouragements: Tuple[List, List], incremental: bool = False,
+                 sample_index: SampleIndex = None) -> Dict[str, Any]:
+    """Build one course manifest (process pool worker) and return a short summary"""
+    transformer = APMLTransformer(course_dir, sample_index=sample_index)
+    transformer.load_source_files()
+    course = transformer.transform(incremental=incremental, encouragements=encouragements)
+
+    return {
+        'course_dir': str(course_dir),
+        'id': course['id'],
+        'seeds': sum(len(s['seeds']) for s in course['slices']),
+        'missing_samples': len(transformer.missing_samples),
+        'missing_samples_file': str(transformer.missing_samples_file)
+    }
+
+def build_all_courses(courses_root: Path, italian_reference: str = None, incremental: bool = False,
+                      workers: int = None) -> List[Dict[str, Any]]:
+    """Build manifests for every course under courses_root in parallel"""
+    course_dirs = find_course_dirs(courses_root)
+    print(f"Found {len(course_dirs)} buildable courses in {courses_root}")
+
+    # Load encouragements once - every worker gets the same pools
+    encouragements = ([], [])
+    if italian_reference:
+        encouragements = APMLTransformer.load_encouragements(italian_reference)
+
+    # Refresh the sample index once here so workers don't race on the index file
+    sample_index = SampleIndex().load()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(build_course, str(course_dir), encouragements, incremental, sample_index): course_dir
+            for course_dir in course_dirs
+        }
+        for future in as_completed(futures):
+            course_dir = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"  WARNING: Failed to build {course_dir.name}: {e}")
+
+    return sorted(results, key=lambda r: r['course_dir'])
+
+def main():
+    incremental = '--incremental' in sys.argv
+    build_all = '--all' in sys.argv
+    args = [a for a in sys.argv[1:] if a not in ('--incremental', '--all')]
+
+    missing_samples_file = None
+    if '--missing-samples' in args:
+        index = args.index('--missing-samples')
+        if index + 1 >= len(args) or build_all:
+            print("Error: --missing-samples takes a file path and only applies to single-course builds")
+            sys.exit(1)
+        missing_samples_file = args[index + 1]
+        del args[index:index + 2]
+
+    if len(args) < 1:
+        print("Usage: python3 transform_spanish_to_apml_format.py <course_directory> [italian_reference] [output_file] [--incremental] [--missing-samples PATH]")
+        print("       python3 transform_spanish_to_apml_format.py --all <courses_root> [italian_reference] [--incremental]")
         print("\nExample:")
         print("  python3 transform_spanish_to_apml_format.py public/vfs/courses/spa_for_eng /path/to/Italian_course.json")
+        print("  python3 transform_spanish_to_apml_format.py public/vfs/courses/spa_for_eng /path/to/Italian_course.json --incremental")
+        print("  python3 transform_spanish_to_apml_format.py --all public/vfs/courses /path/to/Italian_course.json")
         sys.exit(1)
 
-    course_dir = sys.argv[1]
-    italian_ref = sys.argv[2] if len(sys.argv) > 2 else None
-    output_file = sys.argv[3] if len(sys.argv) > 3 else None
+    if build_all:
+        italian_ref = args[1] if len(args) > 1 else None
+        results = build_all_courses(Path(args[0]), italian_reference=italian_ref, incremental=incremental)
+
+        print(f"\n=== SUMMARY ===")
+        for result in results:
+            print(f"  {Path(result['course_dir']).name}: {result['id']} ({result['seeds']} seeds, "
+                  f"{result['missing_samples']} samples missing audio, listed in {result['missing_samples_file']})")
+        print(f"Built {len(results)} course manifests")
+        return
+
+    course_dir = args[0]
+    italian_ref = args[1] if len(args) > 1 else None
+    output_file = args[2] if len(args) > 2 else None
+
+    try:
+        transformer = APMLTransformer(course_dir, sample_index=SampleIndex().load())
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    transformer = SpanishToAPMLTransformer(course_dir)
     transformer.load_source_files()
-    course = transformer.transform(output_file, italian_reference=italian_ref)
+    course = transformer.transform(output_file, italian_reference=italian_ref, incremental=incremental,
+                                   missing_samples_file=missing_samples_file)
 
     print(f"\n=== SUMMARY ===")
     print(f"Course ID: {course['id']}")
@@ -425,6 +999,7 @@ def main():
     print(f"Target language: {course['target']}")
     print(f"Total slices: {len(course['slices'])}")
     print(f"Total seeds: {sum(len(s['seeds']) for s in course['slices'])}")
+    print(f"Samples missing audio: {len(transformer.missing_samples)} (listed in {transformer.missing_samples_file})")
 
 if __name__ == '__main__':
     main()
@@ -5,58 +5,47 @@ Verify ALL practice_phrases in baskets are consistently [English, Spanish]
 Check every single practice phrase to ensure order is correct.
 """
 
-import json
 import sys
 from pathlib import Path
 from detect_all_swaps import LanguageDetector
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from phrase_table import PhraseTable
+
 def verify_baskets(file_path: Path, detector: LanguageDetector):
     """Verify all practice_phrases are [English, Spanish]"""
     print(f"\nVerifying: {file_path.name}")
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    table = PhraseTable.from_basket_file(file_path)
+    strings = table.pool.strings
+    known, target, position = table.columns['known'], table.columns['target'], table.columns['position']
 
-    total_baskets = 0
-    total_phrases = 0
+    total_baskets = table.basket_count
+    total_phrases = len(table)
     swapped_baskets = []
     swapped_phrases_count = 0
 
-    if 'baskets' in data:
-        for basket_id, basket in data['baskets'].items():
-            total_baskets += 1
-
-            practice_phrases = basket.get('practice_phrases', [])
-            if not isinstance(practice_phrases, list):
-                continue
-
-            basket_has_swaps = False
-            basket_swapped_count = 0
-
-            for i, phrase in enumerate(practice_phrases):
-                if not isinstance(phrase, (list, tuple)) or len(phrase) < 2:
-                    continue
-
-                total_phrases += 1
-                # Check first 2 elements (English, Spanish)
-                pair = [phrase[0], phrase[1]]
-                is_swapped, score1, score2 = detector.is_swapped(pair)
-
-                if is_swapped:
-                    if not basket_has_swaps:
-                        swapped_baskets.append({
-                            'basket_id': basket_id,
-                            'phrases': []
-                        })
-                        basket_has_swaps = True
-
-                    swapped_baskets[-1]['phrases'].append({
-                        'index': i,
-                        'phrase': pair,
-                        'scores': [score1, score2]
-                    })
-                    basket_swapped_count += 1
-                    swapped_phrases_count += 1
+    for basket_id, rows in table.group_by('basket').items():
+        swapped_phrases = []
+
+        for row in rows:
+            # Check the (known, target) pair
+            pair = [strings[known[row]], strings[target[row]]]
+            is_swapped, score1, score2 = detector.is_swapped(pair)
+
+            if is_swapped:
+                swapped_phrases.append({
+                    'index': position[row],
+                    'phrase': pair,
+                    'scores': [score1, score2]
+                })
+
+        if swapped_phrases:
+            swapped_baskets.append({
+                'basket_id': basket_id,
+                'phrases': swapped_phrases
+            })
+            swapped_phrases_count += len(swapped_phrases)
 
     print(f"\n{'='*60}")
     print(f"RESULTS FOR {file_path.name}")
@@ -16,39 +16,14 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Any
 
-def detect_languages(course_dir: Path) -> tuple:
-    """Detect source and target languages from directory name"""
-    dir_name = course_dir.name
-
-    # Map ISO 639-3 codes to full names
-    lang_map = {
-        'spa': 'spanish',
-        'fra': 'french',
-        'deu': 'german',
-        'cmn': 'mandarin',
-        'ita': 'italian',
-        'jpn': 'japanese',
-        'kor': 'korean',
-        'eng': 'english',
-        'por': 'portuguese',
-        'rus': 'russian'
-    }
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_registry import LANGUAGE_NAMES, course_languages
 
+def detect_languages(course_dir: Path) -> tuple:
+    """Detect source and target languages (lower-case names) from directory name"""
     # Expected format: xxx_for_yyy (e.g., spa_for_eng)
-    parts = dir_name.split('_for_')
-    if len(parts) != 2:
-        raise ValueError(f"Invalid directory format: {dir_name}. Expected: xxx_for_yyy")
-
-    target_code = parts[0]
-    source_code = parts[1]
-
-    target_lang = lang_map.get(target_code)
-    source_lang = lang_map.get(source_code)
-
-    if not target_lang or not source_lang:
-        raise ValueError(f"Unknown language code: {target_code} or {source_code}")
-
-    return source_lang, target_lang
+    target_code, source_code = course_languages(course_dir.name)
+    return LANGUAGE_NAMES[source_code].lower(), LANGUAGE_NAMES[target_code].lower()
 
 def migrate_seed_pairs(file_path: Path, source_lang: str, target_lang: str, dry_run: bool = False) -> int:
     """Migrate seed_pairs.json from arrays to explicit labels"""
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Phrase Rules - table-driven checks for practice phrases
+
+Rules live in per-language JSON tables (scripts/basket_review_rules/<lang>.json)
+and describe text in that language, so a course xxx_for_yyy checks its
+target phrases with the xxx table and its known phrases with the yyy table.
+
+All literals of a table are compiled into one combined, trie-shaped
+regex: each phrase is scanned once at a cost that barely depends on the
+number of rules, and only the rules whose literals occurred are
+evaluated further.
+
+A rule:
+  {
+    "id": "late_xianzai",
+    "type": "unnatural_chinese",          issue type
+    "severity": "moderate",               minor | moderate | major
+    "issue": "Awkward word order: ...",   message
+    "min_complexity": 4,                  optional bounds on the phrase's LEGO count
+    "max_complexity": 5,
+    "all": [clause, ...]                  every clause must hold
+  }
+
+A clause holds when one of its literals occurs:
+  {
+    "any": ["现在"],                      literals (at least one must occur)
+    "where": "anywhere",                  anywhere | start | end | whole
+    "min_offset": 6,                      optional: the first occurrence starts at or after this index
+    "followed_by": ["你说"]               optional: one of these occurs after the first occurrence
+  }
+
+Usage:
+  rules = load_rule_set('cmn')
+  for rule in rules.match(target, complexity):
+      print(rule['id'], rule['issue'])
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+RULES_DIR = Path(__file__).resolve().parent / 'basket_review_rules'
+WHERE_VALUES = ('anywhere', 'start', 'end', 'whole')
+
+def trie_pattern(literals: Iterable[str]) -> str:
+    """
+    One regex matching any of the literals, factored as a trie
+
+    'ab', 'abc', 'ad' -> a(?:b(?:c)?|d). Shared prefixes are matched once,
+    so a scan costs about the same however many literals there are, and the
+    greedy optional tails make each match the longest literal at its start.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[None] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char is not None]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f"(?:{body})?" if None in node else body
+
+    return build(trie)
+
+class LiteralScanner:
+    """
+    Every (overlapping) occurrence of a set of literals, in one regex scan
+
+    The literals are compiled into a single trie-shaped regex. Each search
+    reports the longest literal starting at the match position; shorter
+    literals starting there are its prefixes and come from a precomputed
+    prefix table. The next search starts one character later, so
+    overlapping occurrences are found too.
+    """
+
+    def __init__(self, literals: Iterable[str]):
+        literals = list(dict.fromkeys(literals))
+        if any(not literal for literal in literals):
+            raise ValueError("Empty literal in rule table")
+
+        self.pattern = re.compile(trie_pattern(literals)) if literals else None
+        # Each literal with the literals that are its prefixes (itself included)
+        self.prefixes = {literal: [other for other in literals if literal.startswith(other)]
+                         for literal in literals}
+
+    def find(self, text: str) -> Dict[str, List[int]]:
+        """{literal: start offsets, ascending} for every literal occurring in text"""
+        found = {}
+        if self.pattern is None:
+            return found
+
+        search = self.pattern.search
+        match = search(text)
+        while match:
+            start = match.start()
+            for literal in self.prefixes[match.group()]:
+                found.setdefault(literal, []).append(start)
+            match = search(text, start + 1)
+        return found
+
+def validate_rule(rule: dict, source: str):
+    for key in ('id', 'type', 'severity', 'issue', 'all'):
+        if key not in rule:
+            raise ValueError(f"{source}: rule {rule.get('id', '?')!r} has no {key!r}")
+    for clause in rule['all']:
+        if not clause.get('any'):
+            raise ValueError(f"{source}: rule {rule['id']!r} has a clause without literals")
+        if clause.get('where', 'anywhere') not in WHERE_VALUES:
+            raise ValueError(f"{source}: rule {rule['id']!r} has where={clause['where']!r}")
+
+class RuleSet:
+    def __init__(self, rules: List[dict], source: str = 'rules'):
+        for rule in rules:
+            validate_rule(rule, source)
+        self.rules = rules
+
+        literals = []
+        for rule in rules:
+            for clause in rule['all']:
+                literals += clause['any'] + clause.get('followed_by', [])
+        self.scanner = LiteralScanner(literals)
+        # Phrases below every rule's minimum complexity need no scan at all
+        self.min_complexity = min((rule.get('min_complexity') for rule in rules), default=None,
+                                  key=lambda bound: float('-inf') if bound is None else bound)
+
+        # Rules worth evaluating when a literal occurs: those whose first clause uses it
+        self.by_literal = {}
+        for index, rule in enumerate(rules):
+            for literal in rule['all'][0]['any']:
+                self.by_literal.setdefault(literal, []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @staticmethod
+    def _clause_holds(clause: dict, text: str, found: Dict[str, List[int]]) -> bool:
+        starts = [(start, literal) for literal in clause['any'] for start in found.get(literal, ())]
+        if not starts:
+            return False
+
+        where = clause.get('where', 'anywhere')
+        if where != 'anywhere':
+            starts = [(start, literal) for start, literal in starts
+                      if (where != 'start' or start == 0)
+                      and (where != 'end' or start + len(literal) == len(text))
+                      and (where != 'whole' or (start == 0 and len(literal) == len(text)))]
+            if not starts:
+                return False
+
+        first_start, first_literal = min(starts)
+        if first_start < clause.get('min_offset', 0):
+            return False
+
+        followed_by = clause.get('followed_by')
+        if followed_by:
+            first_end = first_start + len(first_literal)
+            if not any(start >= first_end for literal in followed_by for start in found.get(literal, ())):
+                return False
+
+        return True
+
+    def match(self, text: str, complexity=None) -> List[dict]:
+        """Rules that hold for text, in table order (one scan of text)"""
+        if not self.rules or not isinstance(text, str):
+            return []
+        if complexity is not None and self.min_complexity is not None and complexity < self.min_complexity:
+            return []
+
+        found = self.scanner.find(text)
+        if not found:
+            return []
+
+        candidates = sorted({index for literal in found for index in self.by_literal.get(literal, ())})
+        matched = []
+        for index in candidates:
+            rule = self.rules[index]
+            if complexity is not None and (complexity < rule.get('min_complexity', complexity)
+                                           or complexity > rule.get('max_complexity', complexity)):
+                continue
+            if all(self._clause_holds(clause, text, found) for clause in rule['all']):
+                matched.append(rule)
+        return matched
+
+_rule_sets = {}
+
+def load_rule_set(language: str, rules_dir: Path = RULES_DIR) -> RuleSet:
+    """The compiled rule table for a language code (empty if there is no table)"""
+    rule_set = _rule_sets.get((language, rules_dir))
+    if rule_set is None:
+        path = Path(rules_dir) / f"{language}.json"
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                rule_set = RuleSet(json.load(f)['rules'], str(path))
+        else:
+            rule_set = RuleSet([], str(path))
+        _rule_sets[(language, rules_dir)] = rule_set
+    return rule_set
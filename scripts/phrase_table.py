@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Phrase Table - basket practice phrases as columns
+
+Basket files nest practice phrases per LEGO, either positionally
+([known, target, metadata, complexity]) or as {"known", "target"} objects.
+PhraseTable flattens them once into one row per phrase:
+
+  basket      LEGO / basket id (S0101L03)        string column
+  seed        seed id (S0101)                    string column
+  known       known-language phrase              string column
+  target      target-language phrase             string column
+  complexity  LEGO count, -1 when not recorded   array('i')
+  position    index in the basket's list         array('I')
+
+String columns are array('I') ids into one shared pool of interned
+strings, so repeated seeds, baskets and phrases are stored once and
+filters compare integers. Filters return row selections (array('I')),
+which count_by / group_by / top aggregate without rescanning the JSON.
+basket_count counts every basket read, including baskets with no phrases.
+
+Usage:
+  table = PhraseTable.from_basket_file(Path('lego_baskets.json'))
+  table.count_by('complexity')                       # phrases by complexity
+  long_rows = table.select(min_complexity=4)
+  table.top('seed', flagged_rows, 10)                # seeds with most issues
+"""
+
+import json
+import re
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+STRING_COLUMNS = ('basket', 'seed', 'known', 'target')
+NUMBER_COLUMNS = ('complexity', 'position')
+COMPLEXITY_UNKNOWN = -1
+COMPLEXITY_MAX = 2 ** 31 - 1  # largest value array('i') holds
+
+SEED_PREFIX_PATTERN = re.compile(r'^(S\d{4})')
+SEED_FILE_PATTERN = re.compile(r'^seed_(S\d{4})_baskets$')
+
+class PhraseRow(NamedTuple):
+    basket: str
+    seed: str
+    known: str
+    target: str
+    complexity: int
+    position: int
+
+def seed_of(basket_id: str, default: str = '') -> str:
+    """'S0101L03' -> 'S0101'"""
+    match = SEED_PREFIX_PATTERN.match(basket_id)
+    return match.group(1) if match else default
+
+def phrase_fields(phrase) -> Optional[Tuple[str, str, int]]:
+    """(known, target, complexity) of a practice phrase in either shape, None if it has no pair"""
+    if isinstance(phrase, (list, tuple)):
+        if len(phrase) < 2:
+            return None
+        known, target = phrase[0], phrase[1]
+        complexity = phrase[3] if len(phrase) >= 4 else None
+    elif isinstance(phrase, dict):
+        if 'known' not in phrase or 'target' not in phrase:
+            return None
+        known, target = phrase['known'], phrase['target']
+        complexity = phrase.get('complexity')
+    else:
+        return None
+
+    if (not isinstance(complexity, int) or isinstance(complexity, bool)
+            or not 0 <= complexity <= COMPLEXITY_MAX):
+        complexity = COMPLEXITY_UNKNOWN
+    return str(known), str(target), complexity
+
+class StringPool:
+    """Interned strings addressed by integer id"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return string_id
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+class PhraseTable:
+    def __init__(self):
+        self.pool = StringPool()
+        self.columns: Dict[str, array] = {name: array('I') for name in STRING_COLUMNS}
+        self.columns['complexity'] = array('i')
+        self.columns['position'] = array('I')
+        self.basket_count = 0
+
+    def __len__(self) -> int:
+        return len(self.columns['complexity'])
+
+    # Building
+
+    def append(self, basket: str, seed: str, known: str, target: str, complexity: int, position: int):
+        intern = self.pool.intern
+        columns = self.columns
+        columns['basket'].append(intern(basket))
+        columns['seed'].append(intern(seed))
+        columns['known'].append(intern(known))
+        columns['target'].append(intern(target))
+        columns['complexity'].append(complexity)
+        columns['position'].append(position)
+
+    def add_baskets(self, data: dict, seed_id: str = ''):
+        """
+        Append the phrases of a loaded basket file
+
+        Course files keep their baskets under 'baskets'; per-seed files are
+        the basket mapping itself. A basket's seed comes from its id, else
+        seed_id.
+        """
+        baskets = data['baskets'] if isinstance(data.get('baskets'), dict) else data
+        for basket_id, basket in baskets.items():
+            self.basket_count += 1
+            if not isinstance(basket, dict):
+                continue
+            practice_phrases = basket.get('practice_phrases', [])
+            if not isinstance(practice_phrases, list):
+                continue
+
+            seed = seed_of(basket_id, seed_id)
+            for position, phrase in enumerate(practice_phrases):
+                fields = phrase_fields(phrase)
+                if fields:
+                    known, target, complexity = fields
+                    self.append(basket_id, seed, known, target, complexity, position)
+
+    def extend(self, other: 'PhraseTable') -> int:
+        """Append another table's rows; returns the offset its row indices now start at"""
+        offset = len(self)
+        remap = array('I', (self.pool.intern(value) for value in other.pool.strings))
+        for name in STRING_COLUMNS:
+            self.columns[name].extend(remap[string_id] for string_id in other.columns[name])
+        for name in NUMBER_COLUMNS:
+            self.columns[name].extend(other.columns[name])
+        self.basket_count += other.basket_count
+        return offset
+
+    @classmethod
+    def from_basket_file(cls, path: Path) -> 'PhraseTable':
+        return cls.from_basket_files([path])
+
+    @classmethod
+    def from_basket_files(cls, paths: Iterable[Path]) -> 'PhraseTable':
+        table = cls()
+        for path in paths:
+            path = Path(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            match = SEED_FILE_PATTERN.match(path.stem)
+            table.add_baskets(data, match.group(1) if match else '')
+        return table
+
+    # Reading
+
+    def value(self, column: str, row: int):
+        value = self.columns[column][row]
+        return self.pool.strings[value] if column in STRING_COLUMNS else value
+
+    def values(self, column: str, rows: Iterable[int] = None) -> list:
+        data = self.columns[column]
+        if rows is None:
+            rows = range(len(self))
+        if column in STRING_COLUMNS:
+            strings = self.pool.strings
+            return [strings[data[row]] for row in rows]
+        return [data[row] for row in rows]
+
+    def row(self, row: int) -> PhraseRow:
+        return PhraseRow(*(self.value(column, row) for column in PhraseRow._fields))
+
+    def rows(self, rows: Iterable[int] = None) -> Iterable[PhraseRow]:
+        for row in (range(len(self)) if rows is None else rows):
+            yield self.row(row)
+
+    # Filters and aggregates
+
+    def select(self, rows: Iterable[int] = None, *, basket: str = None, seed: str = None,
+               complexity: int = None, min_complexity: int = None, max_complexity: int = None,
+               known_complexity: bool = False) -> array:
+        """
+        Row indices matching every given condition, in row order
+
+        rows narrows an earlier selection; known_complexity drops rows
+        without a recorded complexity.
+        """
+        selection = array('I', range(len(self)) if rows is None else rows)
+
+        for column, wanted in (('basket', basket), ('seed', seed)):
+            if wanted is None:
+                continue
+            string_id = self.pool.lookup(wanted)
+            if string_id is None:
+                return array('I')
+            data = self.columns[column]
+            selection = array('I', (row for row in selection if data[row] == string_id))
+
+        if known_complexity and min_complexity is None:
+            min_complexity = 0
+        if complexity is not None or min_complexity is not None or max_complexity is not None:
+            data = self.columns['complexity']
+            low = complexity if complexity is not None else min_complexity
+            high = complexity if complexity is not None else max_complexity
+            selection = array('I', (row for row in selection
+                                    if (low is None or data[row] >= low) and (high is None or data[row] <= high)))
+        return selection
+
+    def count_by(self, column: str, rows: Iterable[int] = None) -> Counter:
+        """Rows per value of column (a row listed twice in rows counts twice)"""
+        data = self.columns[column]
+        counts = Counter(data if rows is None else (data[row] for row in rows))
+        if column in STRING_COLUMNS:
+            strings = self.pool.strings
+            return Counter({strings[value]: count for value, count in counts.items()})
+        return counts
+
+    def group_by(self, column: str, rows: Iterable[int] = None) -> Dict[object, array]:
+        """Value of column -> its row indices, in first-seen order"""
+        data = self.columns[column]
+        groups = {}
+        for row in (range(len(self)) if rows is None else rows):
+            groups.setdefault(data[row], array('I')).append(row)
+        if column in STRING_COLUMNS:
+            strings = self.pool.strings
+            return {strings[value]: group for value, group in groups.items()}
+        return groups
+
+    def top(self, column: str, rows: Iterable[int] = None, n: int = 10) -> List[Tuple[object, int]]:
+        """The n most frequent values of column, e.g. the seeds with most flagged rows"""
+        return self.count_by(column, rows).most_common(n)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Summarise basket practice phrases as a phrase table')
+    parser.add_argument('files', nargs='+', type=Path, help='Basket files (lego_baskets.json, seed_SXXXX_baskets.json)')
+    parser.add_argument('--top', type=int, default=10, help='Seeds to list (default: 10)')
+    args = parser.parse_args()
+
+    table = PhraseTable.from_basket_files(args.files)
+    print(f"{len(table)} phrases, {table.basket_count} baskets, "
+          f"{len(table.count_by('seed'))} seeds, {len(table.pool)} distinct strings")
+
+    print("\nPhrases by complexity:")
+    for complexity, count in sorted(table.count_by('complexity').items()):
+        label = 'unknown' if complexity == COMPLEXITY_UNKNOWN else complexity
+        print(f"  {label}: {count}")
+
+    print("\nSeeds with most phrases:")
+    for seed, count in table.top('seed', n=args.top):
+        print(f"  {seed or '(none)'}: {count}")
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,46 @@
 #!/usr/bin/env python3
 """
 Review Chinese language learning baskets for grammar and naturalness quality.
-Seeds: S0101-S0150
+Seeds: S0101-S0150 by default
+
+Checks come from per-language rule tables (basket_review_rules/<lang>.json,
+see phrase_rules.py): a course's target phrases are checked with its target
+language's table and its known phrases with the known language's table.
+
+Courses and their seed_SXXXX_baskets.json files are found through the
+course registry, so any set of courses and seed ranges can be reviewed.
+Each file is reviewed independently (in a process pool) and the per-file
+results are merged into the course's statistics and severity buckets.
+
+Usage:
+  python3 review_baskets_s0101_s0150.py [--courses cmn_for_eng ...] [--seeds S0101-S0150]
+                                        [--basket-dir phase5_outputs] [--output report.json]
+                                        [--workers N]
 """
 
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import defaultdict
-
-# Base directory
-BASE_DIR = Path("/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/public/vfs/courses/cmn_for_eng/phase5_outputs")
-
-# Track issues
-issues = {
-    'minor': [],
-    'moderate': [],
-    'major': []
-}
-
-# Statistics
-stats = {
-    'total_phrases': 0,
-    'seeds_reviewed': 0,
-    'by_complexity': defaultdict(int),
-    'seeds_with_issues': set()
-}
+from typing import List, NamedTuple
+
+from course_registry import CourseRegistry, format_seed_ranges, parse_seed_ranges
+from phrase_rules import load_rule_set
+from phrase_table import PhraseTable
+
+DEFAULT_COURSES = ['cmn_for_eng']
+DEFAULT_SEEDS = 'S0101-S0150'
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+SEVERITIES = ['minor', 'moderate', 'major']
+
+class FileReview(NamedTuple):
+    """Everything learned from one seed_SXXXX_baskets.json file"""
+    seed_id: str
+    table: PhraseTable
+    # Issues, and the table row each one was raised on
+    issues: List[dict]
+    issue_rows: List[int]
 
 def categorize_issue(issue_type, complexity):
     """Categorize issue severity based on type and complexity."""
@@ -40,220 +55,112 @@ def categorize_issue(issue_type, complexity):
     else:
         return 'minor'
 
-def check_phrase(known, target, complexity, seed_id, lego_id):
-    """Check a single practice phrase for issues."""
+def check_phrase(known, target, complexity, seed_id, lego_id, target_lang='cmn', known_lang='eng'):
+    """Check a single practice phrase against the target- and known-language rule tables."""
     phrase_issues = []
 
-    # Check for specific patterns that are problematic
-
-    # 1. Awkward Chinese word order patterns
-    if complexity >= 4:
-        # Check for "现在...更多" patterns that might be awkward
-        if "现在" in target and target.index("现在") > 5:
-            # 现在 appearing late in sentence can be awkward
-            if "了解更多" in target or "做这个" in target:
-                phrase_issues.append({
-                    'type': 'unnatural_chinese',
-                    'severity': 'moderate',
-                    'known': known,
-                    'target': target,
-                    'complexity': complexity,
-                    'seed': seed_id,
-                    'lego': lego_id,
-                    'issue': 'Awkward word order: 现在 placement sounds unnatural'
-                })
-
-        # Check for missing 的 in noun phrases
-        if "这个语言" in target and "的" not in target.split("这个语言")[0][-5:]:
-            if "关于" in target:
-                # Should be 关于这个语言的 not 关于这个语言
-                pass  # This one might be OK
-
-        # Check for awkward "试图听" patterns
-        if "试图听" in target:
-            following = target.split("试图听", 1)[1] if "试图听" in target else ""
-            if "你说" in following:
-                # "试图听你说" is a bit awkward, better would be "试着听你说" or "想听你说"
-                phrase_issues.append({
-                    'type': 'unnatural_chinese',
-                    'severity': 'moderate',
-                    'known': known,
-                    'target': target,
-                    'complexity': complexity,
-                    'seed': seed_id,
-                    'lego': lego_id,
-                    'issue': '试图听 + person + verb is awkward; better: 想听, 试着听, or 努力听'
-                })
-
-        # Check for 如果 without consequence clause
-        if "如果" in target and complexity <= 5:
-            # Single 如果 clause without consequence is a fragment
-            if target.startswith("如果"):
-                phrase_issues.append({
-                    'type': 'grammar_error',
-                    'severity': 'moderate',
-                    'known': known,
-                    'target': target,
-                    'complexity': complexity,
-                    'seed': seed_id,
-                    'lego': lego_id,
-                    'issue': '如果 clause without consequence - incomplete conditional'
-                })
-
-    # 2. Awkward English patterns
-    if complexity >= 4:
-        # "I'd like this language" is wrong - should be "I'd like to learn/speak this language"
-        if known == "I'd like this language":
-            phrase_issues.append({
-                'type': 'unnatural_english',
-                'severity': 'major',
-                'known': known,
-                'target': target,
-                'complexity': complexity,
-                'seed': seed_id,
-                'lego': lego_id,
-                'issue': '"I\'d like this language" is ungrammatical - needs verb (learn/speak/study)'
-            })
-
-        # "You shouldn't worry if it's not like that" is awkward
-        if "shouldn't worry if" in known:
-            phrase_issues.append({
-                'type': 'unnatural_english',
-                'severity': 'moderate',
-                'known': known,
-                'target': target,
-                'complexity': complexity,
-                'seed': seed_id,
-                'lego': lego_id,
-                'issue': '"worry if" is awkward; better: "worry about whether" or "worry that"'
-            })
-
-        # "I'm enjoying many more this language" is ungrammatical
-        if "many more this language" in known or "many more about" in known:
+    # One scan per side, however many rules the tables hold
+    for rules, text in ((load_rule_set(target_lang), target), (load_rule_set(known_lang), known)):
+        for rule in rules.match(text, complexity):
             phrase_issues.append({
-                'type': 'unnatural_english',
-                'severity': 'major',
+                'type': rule['type'],
+                'severity': rule['severity'],
                 'known': known,
                 'target': target,
                 'complexity': complexity,
                 'seed': seed_id,
                 'lego': lego_id,
-                'issue': '"many more" without noun is incomplete or awkward'
-            })
-
-    # 3. Grammar errors in longer phrases (4-5 LEGOs)
-    if complexity >= 4:
-        # Check for missing articles in English
-        if " language" in known and "this language" not in known and "a language" not in known:
-            # Might need article
-            pass
-
-        # Check for Chinese grammar issues
-        # "我想这个语言" is wrong - should be "我喜欢" or "我想学"
-        if target == "我想这个语言":
-            phrase_issues.append({
-                'type': 'unnatural_chinese',
-                'severity': 'major',
-                'known': known,
-                'target': target,
-                'complexity': complexity,
-                'seed': seed_id,
-                'lego': lego_id,
-                'issue': '我想这个语言 is wrong - 想 needs a verb phrase or clause, not just noun'
-            })
-
-        # "如果你想它不是那样的" - 想 should be 认为
-        if "你想它" in target or "你想这" in target:
-            phrase_issues.append({
-                'type': 'unnatural_chinese',
-                'severity': 'major',
-                'known': known,
-                'target': target,
-                'complexity': complexity,
-                'seed': seed_id,
-                'lego': lego_id,
-                'issue': '想 (want) should be 认为/觉得 (think) when followed by clause'
-            })
-
-        # Word order: "试图说它不是那样的" is OK but can check others
-        # "准备好了只要你想就..." pattern check
-        if "准备好了只要" in target:
-            # This is a compressed conditional, check if it makes sense
-            pass
-
-        # "我需要多一点时间为了更多的" - awkward use of 为了
-        if "为了更多的" in target and target.endswith("为了更多的"):
-            phrase_issues.append({
-                'type': 'unnatural_chinese',
-                'severity': 'moderate',
-                'known': known,
-                'target': target,
-                'complexity': complexity,
-                'seed': seed_id,
-                'lego': lego_id,
-                'issue': '为了更多的 at end is incomplete - needs noun after 的'
+                'issue': rule['issue'],
+                'rule': rule['id']
             })
 
     return phrase_issues
 
-def review_basket_file(filepath):
-    """Review a single basket file."""
+def review_basket_file(filepath, target_lang='cmn', known_lang='eng'):
+    """Review a single basket file; the result is self-contained (safe to compute in a worker)."""
     seed_id = filepath.stem.replace('_baskets', '')
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
+    table = PhraseTable.from_basket_file(filepath)
+    columns = table.columns
+    strings = table.pool.strings
     seed_issues = []
+    issue_rows = []
+
+    # Only phrases that record their complexity are reviewed
+    for row in table.select(known_complexity=True):
+        phrase_issues = check_phrase(strings[columns['known'][row]], strings[columns['target'][row]],
+                                     columns['complexity'][row], seed_id, strings[columns['basket'][row]],
+                                     target_lang, known_lang)
+        seed_issues.extend(phrase_issues)
+        issue_rows.extend([row] * len(phrase_issues))
+
+    return FileReview(seed_id, table, seed_issues, issue_rows)
+
+def review_files(basket_files, target_lang='cmn', known_lang='eng', workers=None):
+    """
+    Review basket files, in a process pool unless workers is 1
+
+    Results come back in basket_files order.
+    """
+    if workers == 1 or len(basket_files) < 2:
+        return [review_basket_file(filepath, target_lang, known_lang) for filepath in basket_files]
+
+    count = len(basket_files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A few chunks per worker keeps the pickling overhead low
+        chunksize = max(1, count // ((workers or os.cpu_count() or 1) * 4))
+        return list(executor.map(review_basket_file, basket_files, [target_lang] * count,
+                                 [known_lang] * count, chunksize=chunksize))
+
+def merge_reviews(reviews):
+    """
+    Reduce file reviews into (stats, issues by severity, phrase table, issue rows)
+
+    The phrase tables are concatenated; issue rows index the combined table.
+    """
+    table = PhraseTable()
+    issue_rows = []
+    stats = {
+        'seeds_reviewed': 0,
+        'seeds_with_issues': []
+    }
+    issues = {severity: [] for severity in SEVERITIES}
+
+    for review in reviews:
+        offset = table.extend(review.table)
+        issue_rows.extend(offset + row for row in review.issue_rows)
+        stats['seeds_reviewed'] += 1
+        if review.issues:
+            stats['seeds_with_issues'].append(review.seed_id)
+        for issue in review.issues:
+            severity = issue['severity']
+            issues[severity if severity in issues else 'minor'].append(issue)
+
+    reviewed = table.select(known_complexity=True)
+    stats['total_phrases'] = len(reviewed)
+    stats['by_complexity'] = table.count_by('complexity', reviewed)
+    return stats, issues, table, issue_rows
+
+def default_report_path(code, seed_ranges, multiple_courses):
+    """scripts/basket_review_s0101_s0150_report.json, prefixed with the course code when reviewing several"""
+    slug = format_seed_ranges(seed_ranges).lower().replace('-', '_').replace(',', '_').replace(' ', '_')
+    prefix = f"{code}_" if multiple_courses else ''
+    return SCRIPTS_DIR / f"basket_review_{prefix}{slug}_report.json"
+
+def review_course(course, basket_files, seed_ranges, report_path, workers=None):
+    """Review one course's basket files, print the summary and write the report."""
+    code = course.code
 
-    for lego_id, lego_data in data.items():
-        practice_phrases = lego_data.get('practice_phrases', [])
-
-        for phrase in practice_phrases:
-            if len(phrase) >= 4:
-                known, target, metadata, complexity = phrase[0], phrase[1], phrase[2], phrase[3]
-                stats['total_phrases'] += 1
-                stats['by_complexity'][complexity] += 1
-
-                # Check the phrase
-                phrase_issues = check_phrase(known, target, complexity, seed_id, lego_id)
-
-                if phrase_issues:
-                    stats['seeds_with_issues'].add(seed_id)
-                    seed_issues.extend(phrase_issues)
-
-                    for issue in phrase_issues:
-                        severity = issue['severity']
-                        if severity == 'major':
-                            issues['major'].append(issue)
-                        elif severity == 'moderate':
-                            issues['moderate'].append(issue)
-                        else:
-                            issues['minor'].append(issue)
-
-    stats['seeds_reviewed'] += 1
-    return seed_issues
-
-def main():
-    """Main review function."""
     print("=" * 80)
-    print("Chinese Language Learning Baskets Review: Seeds S0101-S0150")
+    print(f"Language Learning Baskets Review: {code}, {format_seed_ranges(seed_ranges)}")
     print("=" * 80)
     print()
 
-    # Find all basket files in range
-    basket_files = []
-    for i in range(101, 151):
-        filepath = BASE_DIR / f"seed_S{i:04d}_baskets.json"
-        if filepath.exists():
-            basket_files.append(filepath)
-
     print(f"Found {len(basket_files)} basket files to review")
     print()
 
-    # Review each file
-    for filepath in sorted(basket_files):
-        print(f"Reviewing {filepath.name}...", end='\r')
-        review_basket_file(filepath)
+    # Review the files in parallel, then reduce
+    stats, issues, table, issue_rows = merge_reviews(review_files(sorted(basket_files), course.target, course.known, workers))
 
     print("\n" + "=" * 80)
     print("REVIEW COMPLETE")
@@ -309,8 +216,8 @@ def main():
             print("-" * 80)
             for i, issue in enumerate(issues['major'][:10], 1):
                 print(f"{i}. [{issue['seed']}:{issue['lego']}] Complexity {issue['complexity']}")
-                print(f"   English: {issue['known']}")
-                print(f"   Chinese: {issue['target']}")
+                print(f"   {course.known_name}: {issue['known']}")
+                print(f"   {course.target_name}: {issue['target']}")
                 print(f"   Problem: {issue['issue']}")
                 print()
 
@@ -321,8 +228,8 @@ def main():
             shown = min(10 - len(issues['major']), len(issues['moderate']))
             for i, issue in enumerate(issues['moderate'][:shown], 1):
                 print(f"{i}. [{issue['seed']}:{issue['lego']}] Complexity {issue['complexity']}")
-                print(f"   English: {issue['known']}")
-                print(f"   Chinese: {issue['target']}")
+                print(f"   {course.known_name}: {issue['known']}")
+                print(f"   {course.target_name}: {issue['target']}")
                 print(f"   Problem: {issue['issue']}")
                 print()
 
@@ -332,24 +239,17 @@ def main():
         print("=" * 80)
         print()
 
-        seed_issue_count = defaultdict(int)
-        for severity in ['major', 'moderate', 'minor']:
-            for issue in issues[severity]:
-                seed_issue_count[issue['seed']] += 1
-
-        sorted_seeds = sorted(seed_issue_count.items(), key=lambda x: x[1], reverse=True)
-        for seed, count in sorted_seeds[:10]:
+        for seed, count in table.top('seed', issue_rows, 10):
             print(f"  {seed}: {count} issues")
         print()
 
     # Write detailed report to file
-    report_path = "/Users/tomcassidy/SSi/ssi-dashboard-v7-clean/scripts/basket_review_s0101_s0150_report.json"
     with open(report_path, 'w', encoding='utf-8') as f:
         json.dump({
             'stats': {
                 'seeds_reviewed': stats['seeds_reviewed'],
                 'total_phrases': stats['total_phrases'],
-                'seeds_with_issues': list(stats['seeds_with_issues']),
+                'seeds_with_issues': stats['seeds_with_issues'],
                 'by_complexity': dict(stats['by_complexity'])
             },
             'issues': issues,
@@ -358,5 +258,44 @@ def main():
 
     print(f"Detailed report written to: {report_path}")
 
+def main():
+    """Main review function."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Review practice baskets for grammar and naturalness')
+    parser.add_argument('--courses', nargs='+', default=DEFAULT_COURSES,
+                        help=f"Course code glob patterns (default: {' '.join(DEFAULT_COURSES)})")
+    parser.add_argument('--seeds', default=DEFAULT_SEEDS,
+                        help=f"Seed ranges, e.g. S0101-S0150,S0200 or 'all' (default: {DEFAULT_SEEDS})")
+    parser.add_argument('--basket-dir',
+                        help='Course subdirectory with seed_SXXXX_baskets.json files (default: the fullest one)')
+    parser.add_argument('--courses-root', type=Path, help='Courses directory (default: public/vfs/courses)')
+    parser.add_argument('--output', type=Path, help='Report path (only with a single course)')
+    parser.add_argument('--workers', type=int,
+                        help='Files reviewed in parallel (default: one per CPU, 1 = no subprocesses)')
+    args = parser.parse_args()
+
+    try:
+        seed_ranges = None if args.seeds == 'all' else parse_seed_ranges(args.seeds)
+    except ValueError as e:
+        parser.error(str(e))
+
+    registry = CourseRegistry.discover(args.courses_root) if args.courses_root else CourseRegistry.discover()
+    courses = [course for course in registry.select(args.courses) if course.basket_dirs]
+    if not courses:
+        parser.error(f"No course matching {' '.join(args.courses)} has seed_SXXXX_baskets.json files")
+    if args.output and len(courses) > 1:
+        parser.error('--output needs a single course')
+
+    for course in courses:
+        try:
+            basket_files = registry.seed_basket_files(course.code, seed_ranges, args.basket_dir)
+        except KeyError as e:
+            print(f"Skipping {course.code}: {e.args[0]}")
+            continue
+        report_path = args.output or default_report_path(course.code, seed_ranges, len(courses) > 1)
+        review_course(course, basket_files, seed_ranges, report_path, args.workers)
+        print()
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Fake LLM Server - local stand-in for the Anthropic Messages API
+
+Serves POST /v1/messages with Messages API shaped responses so the
+model-based tools (and llm_scheduler.py) can be exercised end to end,
+through the real SDK and HTTP stack, without an API key.
+
+It answers the two prompt shapes the tools send:
+- Haiku quality gate chunks: flags empty phrases as malformed
+- Swap hunter pair batches: every pair in [English, Spanish] order
+and can inject latency, 429 rate limits, 529 overloads and truncated
+(max_tokens) answers. Requests with "stream": true get a server-sent
+event stream like the real API's.
+
+Usage:
+  python3 fake_llm_server.py [--port 8765] [--latency 0.2] [--rate-limit-every N]
+                             [--overload-rate R] [--truncate-rate R]
+
+  ANTHROPIC_API_KEY=test python3 haiku_quality_gate.py <course_dir> --base-url http://127.0.0.1:8765
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_canned_answers import answer_pairs, answer_validation
+
+def default_responder(prompt: str) -> str:
+    if 'DATA TO VALIDATE:' in prompt:
+        return json.dumps(answer_validation(prompt), ensure_ascii=False)
+    if 'Pairs:\n' in prompt:
+        return json.dumps(answer_pairs(prompt), ensure_ascii=False)
+    return json.dumps({"english_index": 0, "spanish_index": 1, "confidence": "high",
+                       "reasoning": "fake server"})
+
+class FakeLLMServer:
+    """
+    Threaded fake Messages API on localhost
+
+    rate_limit_every=N answers every Nth request with a 429 (retry-after
+    set to retry_after seconds); overload_rate answers that fraction of
+    requests with a 529; truncate_rate cuts that fraction of answers in
+    half (stop_reason "max_tokens"). Counters record what the server saw,
+    including the peak number of concurrent requests.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.05,
+                 rate_limit_every: int = 0, overload_rate: float = 0.0, retry_after: float = 0.1,
+                 responder=default_responder, seed: int = 0, truncate_rate: float = 0.0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.overload_rate = overload_rate
+        self.truncate_rate = truncate_rate
+        self.retry_after = retry_after
+        self.responder = responder
+        self.requests = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+        self.truncated = 0
+        self.active = 0
+        self.peak_concurrent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                server._handle(self)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _send(self, handler, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _stream(self, handler, message: dict, delta_chars: int = 64):
+        """Send a message as Messages API server-sent events, a few characters per delta"""
+        text = message['content'][0]['text']
+        events = [('message_start', {"type": "message_start", "message": dict(
+                      message, content=[], stop_reason=None,
+                      usage={"input_tokens": message['usage']['input_tokens'], "output_tokens": 1})}),
+                  ('content_block_start', {"type": "content_block_start", "index": 0,
+                                           "content_block": {"type": "text", "text": ""}})]
+        for start in range(0, len(text), delta_chars):
+            events.append(('content_block_delta', {"type": "content_block_delta", "index": 0,
+                                                   "delta": {"type": "text_delta",
+                                                             "text": text[start:start + delta_chars]}}))
+        events += [('content_block_stop', {"type": "content_block_stop", "index": 0}),
+                   ('message_delta', {"type": "message_delta",
+                                      "delta": {"stop_reason": message['stop_reason'], "stop_sequence": None},
+                                      "usage": {"output_tokens": message['usage']['output_tokens']}}),
+                   ('message_stop', {"type": "message_stop"})]
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+        for name, data in events:
+            handler.wfile.write(f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8'))
+            handler.wfile.flush()
+
+    def _error(self, handler, status: int, error_type: str, message: str, headers: dict = None):
+        self._send(handler, status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+
+    def _handle(self, handler):
+        if handler.path.split('?', 1)[0] != '/v1/messages':
+            self._error(handler, 404, 'not_found_error', f'Unknown path {handler.path}')
+            return
+
+        body = json.loads(handler.rfile.read(int(handler.headers.get('Content-Length', 0))) or b'{}')
+
+        with self._lock:
+            self.requests += 1
+            rate_limit = self.rate_limit_every and self.requests % self.rate_limit_every == 0
+            overload = not rate_limit and self._random.random() < self.overload_rate
+            truncate = self._random.random() < self.truncate_rate
+            if rate_limit:
+                self.rate_limited += 1
+            elif overload:
+                self.overloaded += 1
+            elif truncate:
+                self.truncated += 1
+            self.active += 1
+            self.peak_concurrent = max(self.peak_concurrent, self.active)
+
+        try:
+            if rate_limit:
+                self._error(handler, 429, 'rate_limit_error', 'Number of requests has exceeded your rate limit',
+                            {'retry-after': str(self.retry_after)})
+                return
+
+            time.sleep(self.latency)
+            if overload:
+                self._error(handler, 529, 'overloaded_error', 'Overloaded')
+                return
+
+            content = body.get('messages', [{}])[0].get('content', '')
+            if not isinstance(content, str):
+                content = ''.join(block.get('text', '') for block in content)
+            text = self.responder(content)
+            stop_reason = "end_turn"
+            if truncate:
+                text = text[:len(text) // 2]
+                stop_reason = "max_tokens"
+
+            message = {
+                "id": f"msg_fake_{self.requests}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get('model', 'fake'),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": stop_reason,
+                "stop_sequence": None,
+                "usage": {"input_tokens": len(content) // 4 + 1, "output_tokens": len(text) // 4 + 1}
+            }
+            if body.get('stream'):
+                self._stream(handler, message)
+            else:
+                self._send(handler, 200, message)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local fake of the Anthropic Messages API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2,
+                        help='Seconds to wait before answering (default: 0.2)')
+    parser.add_argument('--rate-limit-every', type=int, default=0,
+                        help='Answer every Nth request with a 429 (default: never)')
+    parser.add_argument('--overload-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with a 529 (default: 0)')
+    parser.add_argument('--truncate-rate', type=float, default=0.0,
+                        help='Fraction of answers cut off halfway, as if max_tokens was hit (default: 0)')
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.rate_limit_every, args.overload_rate,
+                           truncate_rate=args.truncate_rate)
+    print(f"Fake LLM server listening on {server.url} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{server.requests} requests, {server.rate_limited} rate limited, "
+              f"{server.overloaded} overloaded, {server.truncated} truncated, "
+              f"peak {server.peak_concurrent} concurrent")
+        server.httpd.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -19,18 +19,128 @@ Examples:
   # Audit only (report issues)
   python3 haiku_quality_gate.py public/vfs/courses/spa_for_eng
 
-  # Audit + fix automatically
+  # Audit + apply the suggested fixes, then re-validate the fixed baskets
   python3 haiku_quality_gate.py public/vfs/courses/spa_for_eng --fix
 
   # Sample first 100 seeds only (faster, cheaper)
   python3 haiku_quality_gate.py public/vfs/courses/spa_for_eng --sample-size 100
+
+  # Offline run against the mock client (no API key, measures throughput)
+  python3 haiku_quality_gate.py public/vfs/courses/spa_for_eng --mock
+
+With --prefilter the gate is tiered: a fast local pass (LanguageDetector
+swap scores, the basket review rule checks and a few structural checks)
+scores every phrase, and only baskets at or above --risk-threshold plus a
+random --audit-rate sample are sent to the model.
+
+Baskets are split into token-budgeted chunks (--chunk-tokens) which are
+validated concurrently (--workers). Requests go through the shared
+llm_scheduler.py, which keeps within --rpm/--tpm, retries rate limits and
+overloads with jittered backoff, and reports latency and throughput.
+Per-chunk results are merged into a single report.
+
+Responses are parsed tolerantly (llm_json.py): fences and preamble are
+ignored, and when a response is cut off the complete issues are salvaged
+and the chunk is reported under "partial_chunks" instead of being thrown
+away. With --stream responses are streamed and issues are extracted as
+they arrive.
+
+With --fix, every issue's suggested_fix is applied to
+lego_baskets_deduplicated.json in one write, but only where the phrase
+still reads current_value. Only the touched baskets are then validated
+again; the applied and skipped fixes are logged to
+haiku_quality_gate_fixes.json.
+
+--base-url points the client at another endpoint, e.g. fake_llm_server.py
+for an end-to-end run without the API.
+
+Verdicts are cached per basket in llm_verdict_cache.sqlite in the course
+directory (see llm_verdict_cache.py), so re-running the gate on unchanged
+baskets makes no API calls. Use --no-cache or --clear-cache to bypass or
+reset it.
+
+Every finished chunk is appended to haiku_quality_gate_checkpoint.jsonl
+in the course directory as it completes (see llm_checkpoint.py). If a
+run dies partway, --resume skips the chunks already in the log and
+assembles the report from it.
 """
 
 import json
 import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from anthropic import Anthropic
+from types import SimpleNamespace
+
+# Local checks live with the other course scripts
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / 'scripts' / 'fixes'))
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from detect_all_swaps import LanguageDetector
+from course_registry import course_languages
+from phrase_rules import load_rule_set
+from review_baskets_s0101_s0150 import check_phrase
+from llm_verdict_cache import VerdictCache, DEFAULT_TTL_DAYS, make_key
+from llm_checkpoint import CheckpointLog
+from llm_scheduler import LLMScheduler, DEFAULT_RPM, DEFAULT_TPM, format_metrics
+from llm_json import JSONItemExtractor, parse_response, read_stream
+from llm_canned_answers import answer_validation
+
+MODEL = "claude-haiku-4-5-20251001"
+
+# Bump whenever create_validation_prompt changes meaningfully - cached
+# verdicts from older prompts are then ignored
+PROMPT_VERSION = "1"
+CACHE_FILE = "llm_verdict_cache.sqlite"
+CHECKPOINT_FILE = "haiku_quality_gate_checkpoint.jsonl"
+MAX_TOKENS = 4000
+
+# Basket JSON tokens per request - keeps each response well inside MAX_TOKENS
+DEFAULT_CHUNK_TOKENS = 6000
+DEFAULT_WORKERS = 4
+
+# Prefilter: phrase risk scores (0-100); a basket's risk is its riskiest phrase
+DEFAULT_RISK_THRESHOLD = 50
+DEFAULT_AUDIT_RATE = 0.05
+RULE_SEVERITY_RISK = {'major': 70, 'moderate': 50, 'minor': 30}
+
+SUMMARY_KEYS = ['grammar_errors', 'swaps', 'malformed', 'total_issues']
+ISSUE_SUMMARY_KEYS = {'grammar_error': 'grammar_errors', 'swap': 'swaps', 'malformed': 'malformed'}
+
+FIX_LOG_FILE = "haiku_quality_gate_fixes.json"
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+def serialize_baskets(baskets: dict) -> str:
+    """Compact JSON for the prompt - indentation only costs tokens"""
+    return json.dumps(baskets, ensure_ascii=False, separators=(',', ':'))
+
+def chunk_baskets(baskets: dict, token_budget: int = DEFAULT_CHUNK_TOKENS) -> list:
+    """Split baskets (in basket ID order) into chunks of at most token_budget tokens"""
+    chunks = []
+    current = {}
+    used = 0
+
+    for basket_id in sorted(baskets.keys()):
+        cost = estimate_tokens(serialize_baskets({basket_id: baskets[basket_id]}))
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current = {}
+            used = 0
+        current[basket_id] = baskets[basket_id]
+        used += cost
+
+    if current:
+        chunks.append(current)
+
+    return chunks
 
 def create_validation_prompt(baskets_sample: dict, target_lang: str, source_lang: str) -> str:
     """Create validation prompt for Haiku"""
@@ -48,7 +158,7 @@ EXPECTED FORMAT:
 - Order MUST be [English, Spanish] (NOT [Spanish, English])
 
 DATA TO VALIDATE:
-{json.dumps(baskets_sample, ensure_ascii=False, indent=2)}
+{serialize_baskets(baskets_sample)}
 
 CHECK FOR:
 1. ❌ Grammar errors in English (e.g., "I to can", "would to have", "to to")
@@ -83,36 +193,232 @@ RESPOND WITH JSON:
 
 Be thorough and flag EVERY issue you find!"""
 
-def validate_with_haiku(client, baskets_sample: dict, target_lang: str = "spanish",
-                       source_lang: str = "english") -> dict:
-    """Send baskets to Haiku for validation"""
-
-    prompt = create_validation_prompt(baskets_sample, target_lang, source_lang)
-
-    try:
-        message = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=4000,
-            temperature=0,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+def validate_chunk(client, baskets_sample: dict, target_lang: str = "spanish",
+                   source_lang: str = "english", stream: bool = False, on_issue=None) -> dict:
+    """
+    Send one chunk of baskets to Haiku for validation (raises on failure)
 
-        response_text = message.content[0].text.strip()
+    A response that was cut short still yields its complete issues; the
+    result is then marked "truncated" and claims no baskets as checked.
+    With stream=True each issue is passed to on_issue as it arrives.
+    """
 
-        # Remove markdown code blocks if present
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            response_text = '\n'.join([l for l in lines if not l.startswith('```')])
-
-        result = json.loads(response_text)
-        return result
+    prompt = create_validation_prompt(baskets_sample, target_lang, source_lang)
+    request = dict(
+        model=MODEL,
+        max_tokens=MAX_TOKENS,
+        temperature=0,
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
+
+    if stream:
+        response_text, error = read_stream(client.messages.create(stream=True, **request),
+                                           JSONItemExtractor('issues_found'), on_issue)
+    else:
+        message = client.messages.create(**request)
+        response_text, error = message.content[0].text, None
+
+    result, complete = parse_response(response_text, 'issues_found')
+    if not isinstance(result, dict) or (not complete and not result.get('issues_found')):
+        raise error or ValueError(f"no usable JSON in response ({len(response_text)} chars)")
+
+    if not complete:
+        issues = result['issues_found']
+        result = {
+            "total_baskets_checked": 0,
+            "total_phrases_checked": 0,
+            "issues_found": issues,
+            "summary": summarize_issues(issues),
+            "truncated": True
+        }
+    return result
+
+def merge_results(results: list) -> dict:
+    """Merge per-chunk validation results into a single report"""
+    merged = {
+        "total_baskets_checked": 0,
+        "total_phrases_checked": 0,
+        "issues_found": [],
+        "summary": {key: 0 for key in SUMMARY_KEYS}
+    }
+
+    for result in results:
+        merged['total_baskets_checked'] += result.get('total_baskets_checked', 0) or 0
+        merged['total_phrases_checked'] += result.get('total_phrases_checked', 0) or 0
+        merged['issues_found'].extend(result.get('issues_found', []))
+        for key, count in result.get('summary', {}).items():
+            merged['summary'][key] = merged['summary'].get(key, 0) + (count or 0)
+
+    return merged
+
+def summarize_issues(issues: list) -> dict:
+    summary = {key: 0 for key in SUMMARY_KEYS}
+    for issue in issues:
+        key = ISSUE_SUMMARY_KEYS.get(issue.get('issue_type'))
+        if key:
+            summary[key] += 1
+    summary['total_issues'] = len(issues)
+    return summary
+
+def basket_verdict(basket: dict, issues: list) -> dict:
+    """Single-basket result in the same shape as a chunk result"""
+    phrases = basket.get('practice_phrases', [])
+    return {
+        "total_baskets_checked": 1,
+        "total_phrases_checked": len(phrases) if isinstance(phrases, list) else 0,
+        "issues_found": issues,
+        "summary": summarize_issues(issues)
+    }
+
+def split_chunk_result(chunk: dict, result: dict) -> dict:
+    """Split a chunk result into per-basket verdicts for the cache"""
+    issues_by_basket = {basket_id: [] for basket_id in chunk}
+    for issue in result.get('issues_found', []):
+        if issue.get('basket_id') in issues_by_basket:
+            issues_by_basket[issue['basket_id']].append(issue)
+
+    return {basket_id: basket_verdict(chunk[basket_id], issues_by_basket[basket_id])
+            for basket_id in chunk}
+
+def cache_payload(basket_id: str, basket: dict, target_lang: str, source_lang: str) -> dict:
+    return {"basket_id": basket_id, "basket": basket, "languages": [source_lang, target_lang]}
 
-    except Exception as e:
-        print(f"❌ Error calling Haiku: {e}")
+def validate_with_haiku(client, baskets_sample: dict, target_lang: str = "spanish",
+                        source_lang: str = "english", chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                        workers: int = DEFAULT_WORKERS, cache: VerdictCache = None,
+                        checkpoint: CheckpointLog = None, stream: bool = False, on_issue=None) -> dict:
+    """
+    Validate baskets with Haiku in token-budgeted chunks
+
+    Baskets with a cached verdict are not sent again. The rest are chunked
+    and run concurrently on a bounded thread pool (pass an LLMScheduler as
+    client to rate-limit and retry the requests). With a checkpoint log,
+    each chunk result is logged as it arrives, chunks already in the log
+    are skipped, and chunk results are read back from the log. Chunks
+    whose response was cut off keep their salvaged issues but are neither
+    cached nor logged as done. Returns the merged report (failed and
+    truncated chunks are listed under "failed_chunks" and
+    "partial_chunks"), or None if every chunk failed.
+    """
+    results = []
+    to_validate = {}
+
+    for basket_id, basket in baskets_sample.items():
+        cached = None
+        if cache is not None:
+            cached = cache.get(MODEL, PROMPT_VERSION, cache_payload(basket_id, basket, target_lang, source_lang))
+        if cached is not None:
+            results.append(cached)
+        else:
+            to_validate[basket_id] = basket
+
+    if cache is not None:
+        print(f"  {len(results)} baskets answered from cache, {len(to_validate)} to validate")
+
+    chunks = chunk_baskets(to_validate, chunk_tokens)
+    keys = [make_key(MODEL, PROMPT_VERSION, [chunk, source_lang, target_lang]) for chunk in chunks]
+    print(f"  {len(chunks)} chunks (≤{chunk_tokens} tokens each), {workers} concurrent requests")
+
+    pending = [(key, chunk) for key, chunk in zip(keys, chunks) if checkpoint is None or key not in checkpoint]
+    if checkpoint is not None and len(pending) < len(chunks):
+        print(f"  {len(chunks) - len(pending)} chunks already done in {checkpoint.path.name}, skipping")
+
+    chunk_results = {}
+    failed_chunks = []
+    partial_chunks = []
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(validate_chunk, client, chunk, target_lang, source_lang, stream, on_issue): (key, chunk)
+            for key, chunk in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            key, chunk = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ Error calling Haiku for {min(chunk)}..{max(chunk)}: {e}")
+                failed_chunks.append(sorted(chunk.keys()))
+                if checkpoint is not None:
+                    checkpoint.record_failure(key, f"{type(e).__name__}: {e}", baskets=[min(chunk), max(chunk)])
+            else:
+                if result.get('truncated'):
+                    print(f"  ⚠️  Response for {min(chunk)}..{max(chunk)} was cut off - "
+                          f"salvaged {len(result['issues_found'])} issues")
+                    partial_chunks.append(sorted(chunk.keys()))
+                    results.append(result)
+                    if checkpoint is not None:
+                        checkpoint.record_failure(key, "truncated response", baskets=[min(chunk), max(chunk)])
+                    continue
+
+                chunk_results[key] = result
+                if checkpoint is not None:
+                    checkpoint.record(key, result, baskets=[min(chunk), max(chunk)])
+                if cache is not None:
+                    for basket_id, verdict in split_chunk_result(chunk, result).items():
+                        cache.put(MODEL, PROMPT_VERSION,
+                                  cache_payload(basket_id, chunk[basket_id], target_lang, source_lang), verdict)
+            if done % 10 == 0:
+                print(f"  Validated {done}/{len(pending)} chunks...")
+
+    elapsed = time.monotonic() - started
+    print(f"  Finished {len(pending)} chunks in {elapsed:.1f}s "
+          f"({sum(len(chunk) for _, chunk in pending) / max(elapsed, 1e-9):.1f} baskets/s)")
+
+    # The log holds every finished chunk, including those from earlier runs
+    source = checkpoint.completed if checkpoint is not None else chunk_results
+    results.extend(source[key] for key in keys if key in source)
+
+    if failed_chunks and not results:
         return None
 
+    merged = merge_results(results)
+    merged['failed_chunks'] = failed_chunks
+    merged['partial_chunks'] = partial_chunks
+    return merged
+
+class MockHaikuClient:
+    """
+    Offline stand-in for the Anthropic client
+
+    Answers with llm_canned_answers, as fake_llm_server.py does (empty
+    phrases are malformed), after a simulated latency and with estimated
+    token usage. failure_rate injects errors to exercise retries.
+    """
+
+    def __init__(self, latency: float = 0.2, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, model, max_tokens, messages, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+
+        time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("mock overloaded_error")
+
+        text = json.dumps(answer_validation(messages[0]['content']), ensure_ascii=False)
+        # Report usage like the API does, so the scheduler settles its reservations
+        input_tokens = estimate_tokens(messages[0]['content'])
+        output_tokens = estimate_tokens(text)
+        if kwargs.get('stream'):
+            return ([SimpleNamespace(type='message_start', message=SimpleNamespace(
+                        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=1)))]
+                    + [SimpleNamespace(type='content_block_delta', delta=SimpleNamespace(text=text[i:i + 64]))
+                       for i in range(0, len(text), 64)]
+                    + [SimpleNamespace(type='message_delta', usage=SimpleNamespace(output_tokens=output_tokens))])
+        return SimpleNamespace(content=[SimpleNamespace(text=text)],
+                               usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+
 def sample_baskets(baskets: dict, sample_size: int = None) -> dict:
     """Sample baskets for validation (all or subset)"""
     if sample_size is None:
@@ -121,15 +427,185 @@ def sample_baskets(baskets: dict, sample_size: int = None) -> dict:
     basket_ids = sorted(baskets.keys())[:sample_size]
     return {bid: baskets[bid] for bid in basket_ids}
 
+def phrase_texts(phrase):
+    """(known, target, complexity) from an array or labelled practice phrase"""
+    if isinstance(phrase, dict):
+        return phrase.get('known'), phrase.get('target'), phrase.get('complexity', 0)
+    if isinstance(phrase, (list, tuple)):
+        known = phrase[0] if len(phrase) > 0 else None
+        target = phrase[1] if len(phrase) > 1 else None
+        complexity = phrase[3] if len(phrase) > 3 and isinstance(phrase[3], int) else 0
+        return known, target, complexity
+    return None, None, 0
+
+def score_phrase(detector: LanguageDetector, known, target, complexity: int,
+                 basket_id: str, target_lang: str = None, known_lang: str = None) -> int:
+    """Local risk score (0-100) for one practice phrase (rule tables only with target_lang)"""
+    if not isinstance(known, str) or not isinstance(target, str) or not known.strip() or not target.strip():
+        return 100
+
+    risk = 0
+
+    # Swapped [Spanish, English] pair
+    is_swapped, known_score, target_score = detector.is_swapped([known, target])
+    if is_swapped:
+        risk = max(risk, min(100, 60 + int(known_score - target_score)))
+
+    # Untranslated / duplicated word ("to to", "I to can")
+    if known.strip().lower() == target.strip().lower():
+        risk = max(risk, 60)
+    words = known.lower().split()
+    if any(a == b for a, b in zip(words, words[1:])):
+        risk = max(risk, 60)
+
+    # Rule table checks from the basket reviewer, with the course's own tables
+    if target_lang is not None:
+        for issue in check_phrase(known, target, complexity, basket_id[:5], basket_id,
+                                  target_lang, known_lang):
+            risk = max(risk, RULE_SEVERITY_RISK.get(issue['severity'], 30))
+
+    return risk
+
+def prefilter_baskets(baskets: dict, risk_threshold: int = DEFAULT_RISK_THRESHOLD,
+                      audit_rate: float = DEFAULT_AUDIT_RATE, seed: int = None,
+                      target_lang: str = None, known_lang: str = None) -> tuple:
+    """
+    Score every basket locally and pick the ones worth sending to the model
+
+    Returns (escalated_baskets, report). Baskets at or above risk_threshold
+    are always escalated; audit_rate of the remaining baskets are escalated
+    at random so the local pass itself stays audited. The rule step uses
+    the target_lang/known_lang tables and is skipped when neither exists.
+    """
+    detector = LanguageDetector()
+    if target_lang is not None and not (len(load_rule_set(target_lang)) or len(load_rule_set(known_lang))):
+        target_lang = known_lang = None
+    rng = random.Random(seed)
+
+    risky, audit = [], []
+    for basket_id in sorted(baskets.keys()):
+        phrases = baskets[basket_id].get('practice_phrases', [])
+        risk = 0
+        for phrase in phrases if isinstance(phrases, list) else []:
+            known, target, complexity = phrase_texts(phrase)
+            risk = max(risk, score_phrase(detector, known, target, complexity, basket_id,
+                                          target_lang, known_lang))
+            if risk >= 100:
+                break
+
+        if risk >= risk_threshold:
+            risky.append(basket_id)
+        elif rng.random() < audit_rate:
+            audit.append(basket_id)
+
+    escalated = {bid: baskets[bid] for bid in sorted(risky + audit)}
+    report = {
+        'baskets_scored': len(baskets),
+        'escalated_risky': len(risky),
+        'escalated_audit': len(audit),
+        'escalated_fraction': len(escalated) / len(baskets) if baskets else 0.0,
+        'risk_threshold': risk_threshold,
+        'audit_rate': audit_rate,
+        'rule_tables': [target_lang, known_lang] if target_lang is not None else None
+    }
+    return escalated, report
+
+def text_pair(value) -> list:
+    """[known, target] from an issue value or practice phrase, or None"""
+    known, target, _ = phrase_texts(value)
+    if not isinstance(known, str) or not isinstance(target, (str, type(None))):
+        return None
+    return [known.strip(), (target or '').strip()]
+
+def apply_fixes(baskets: dict, issues: list) -> tuple:
+    """
+    Apply each issue's suggested_fix to the baskets, in place
+
+    A fix is only applied while the phrase still reads current_value, so
+    stale issues (and a second fix for an already fixed phrase) are
+    skipped rather than clobbering newer text. Returns (applied, skipped).
+    """
+    applied, skipped = [], []
+
+    for issue in issues:
+        basket = baskets.get(issue.get('basket_id'))
+        phrases = basket.get('practice_phrases') if isinstance(basket, dict) else None
+        index = issue.get('phrase_index')
+        current = text_pair(issue.get('current_value'))
+        fix = text_pair(issue.get('suggested_fix'))
+
+        entry = {
+            'basket_id': issue.get('basket_id'),
+            'phrase_index': index,
+            'issue_type': issue.get('issue_type')
+        }
+
+        if not isinstance(phrases, list) or not isinstance(index, int) or not 0 <= index < len(phrases):
+            skipped.append(dict(entry, reason='phrase not found'))
+        elif current is None or fix is None or not fix[0] or not fix[1]:
+            skipped.append(dict(entry, reason='no usable current_value/suggested_fix'))
+        elif fix == current:
+            skipped.append(dict(entry, reason='suggested_fix is unchanged'))
+        elif text_pair(phrases[index]) != current:
+            skipped.append(dict(entry, reason='current_value no longer matches', found=text_pair(phrases[index])))
+        else:
+            phrase = phrases[index]
+            if isinstance(phrase, dict):
+                phrase['known'], phrase['target'] = fix
+            else:
+                phrase[0] = fix[0]
+                if len(phrase) > 1:
+                    phrase[1] = fix[1]
+                else:
+                    phrase.append(fix[1])
+            applied.append(dict(entry, before=current, after=fix))
+
+    return applied, skipped
+
+def write_json_atomic(path: Path, data):
+    """Write JSON to a sibling temp file, then swap it in"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
 def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='Haiku Quality Gate for lego_baskets.json')
     parser.add_argument('course_dir', help='Course directory path')
     parser.add_argument('--fix', action='store_true',
-                       help='Automatically fix issues (not just report)')
+                       help='Apply suggested fixes and re-validate the touched baskets (not just report)')
     parser.add_argument('--sample-size', type=int,
                        help='Validate only first N baskets (default: all)')
+    parser.add_argument('--chunk-tokens', type=int, default=DEFAULT_CHUNK_TOKENS,
+                       help=f'Basket tokens per request (default: {DEFAULT_CHUNK_TOKENS})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Concurrent requests (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--prefilter', action='store_true',
+                       help='Score baskets locally and only send risky ones (plus an audit sample) to the model')
+    parser.add_argument('--risk-threshold', type=int, default=DEFAULT_RISK_THRESHOLD,
+                       help=f'Prefilter risk score (0-100) that escalates a basket (default: {DEFAULT_RISK_THRESHOLD})')
+    parser.add_argument('--audit-rate', type=float, default=DEFAULT_AUDIT_RATE,
+                       help=f'Fraction of low-risk baskets escalated at random (default: {DEFAULT_AUDIT_RATE})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ignore cached verdicts and do not record new ones')
+    parser.add_argument('--clear-cache', action='store_true',
+                       help='Drop all cached verdicts for this model before running')
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_TTL_DAYS,
+                       help=f'Ignore cached verdicts older than this (default: {DEFAULT_TTL_DAYS})')
+    parser.add_argument('--resume', action='store_true',
+                       help=f'Skip chunks already finished in {CHECKPOINT_FILE} from an interrupted run')
+    parser.add_argument('--stream', action='store_true',
+                       help='Stream responses and extract issues as they arrive')
+    parser.add_argument('--mock', action='store_true',
+                       help='Use the offline mock client instead of the API')
+    parser.add_argument('--base-url',
+                       help='Send requests to this endpoint instead of the API (e.g. fake_llm_server.py)')
+    parser.add_argument('--rpm', type=int,
+                       help=f'Requests per minute budget (default: {DEFAULT_RPM}, none with --mock)')
+    parser.add_argument('--tpm', type=int,
+                       help=f'Tokens per minute budget (default: {DEFAULT_TPM}, none with --mock)')
 
     args = parser.parse_args()
 
@@ -139,13 +615,23 @@ def main():
         print(f"❌ Error: Directory not found: {course_dir}")
         sys.exit(1)
 
-    # Check for API key
-    api_key = os.environ.get('ANTHROPIC_API_KEY')
-    if not api_key:
-        print("❌ Error: ANTHROPIC_API_KEY environment variable not set")
-        sys.exit(1)
+    if args.mock:
+        client = MockHaikuClient()
+    else:
+        # Check for API key
+        api_key = os.environ.get('ANTHROPIC_API_KEY')
+        if not api_key:
+            print("❌ Error: ANTHROPIC_API_KEY environment variable not set")
+            sys.exit(1)
 
-    client = Anthropic(api_key=api_key)
+        from anthropic import Anthropic
+        # The scheduler does the retrying
+        client = Anthropic(api_key=api_key, base_url=args.base_url, max_retries=0)
+
+    # API rate limits don't apply to the mock: offline runs measure the pipeline itself
+    rpm = args.rpm if args.rpm is not None or args.mock else DEFAULT_RPM
+    tpm = args.tpm if args.tpm is not None or args.mock else DEFAULT_TPM
+    client = LLMScheduler(client, rpm=rpm, tpm=tpm, max_in_flight=args.workers)
 
     # Load baskets
     baskets_file = course_dir / 'lego_baskets_deduplicated.json'
@@ -157,7 +643,7 @@ def main():
     print(f"HAIKU QUALITY GATE - Phase 5 Validation")
     print(f"{'='*60}")
     print(f"Course: {course_dir.name}")
-    print(f"Model: Claude Haiku 4.5")
+    print(f"Model: {'Mock client (offline)' if args.mock else 'Claude Haiku 4.5'}")
     print(f"Mode: {'FIX' if args.fix else 'AUDIT'}")
 
     with open(baskets_file, 'r', encoding='utf-8') as f:
@@ -173,15 +659,103 @@ def main():
         print(f"Sample: ALL {len(baskets)} baskets")
         baskets_to_check = baskets
 
+    prefilter_report = None
+    if args.prefilter:
+        try:
+            target_lang, known_lang = course_languages(course_dir.name)
+        except ValueError as e:
+            print(f"⚠️  {e}: prefilter runs without rule tables")
+            target_lang = known_lang = None
+        baskets_to_check, prefilter_report = prefilter_baskets(
+            baskets_to_check, args.risk_threshold, args.audit_rate,
+            target_lang=target_lang, known_lang=known_lang)
+        print(f"\nPrefilter: scored {prefilter_report['baskets_scored']} baskets locally")
+        print(f"  Escalated {prefilter_report['escalated_risky']} risky + "
+              f"{prefilter_report['escalated_audit']} audit baskets "
+              f"({prefilter_report['escalated_fraction']:.1%})")
+
     print(f"\nValidating {len(baskets_to_check)} baskets...")
 
     # Validate with Haiku
-    result = validate_with_haiku(client, baskets_to_check)
+    cache = None
+    if not args.no_cache and not args.mock:
+        cache = VerdictCache(course_dir / CACHE_FILE, ttl_days=args.cache_ttl_days)
+        if args.clear_cache:
+            print(f"Cleared {cache.invalidate(model=MODEL)} cached verdicts")
+        cache.purge_expired()
+
+    checkpoint = CheckpointLog(course_dir / CHECKPOINT_FILE, resume=args.resume,
+                               tool='haiku_quality_gate', model=MODEL, prompt_version=PROMPT_VERSION)
+    if checkpoint.resumed:
+        print(f"Resuming: {checkpoint.resumed} finished chunks in {CHECKPOINT_FILE}")
+
+    # With --stream, issues are reported while chunks are still coming in
+    streamed = []
+    def on_issue(issue):
+        streamed.append(issue)
+        if len(streamed) % 25 == 0:
+            print(f"  ... {len(streamed)} issues received so far")
+
+    result = validate_with_haiku(client, baskets_to_check, chunk_tokens=args.chunk_tokens,
+                                 workers=args.workers, cache=cache, checkpoint=checkpoint,
+                                 stream=args.stream, on_issue=on_issue)
 
     if not result:
         print("\n❌ Validation failed")
         sys.exit(1)
 
+    if prefilter_report:
+        result['prefilter'] = prefilter_report
+
+    if args.fix and result.get('issues_found'):
+        issues = result['issues_found']
+        print(f"\n🔧 FIX mode: applying suggested fixes for {len(issues)} issues")
+
+        applied, skipped = apply_fixes(baskets, issues)
+        print(f"  Applied {len(applied)} fixes, skipped {len(skipped)}")
+        reasons = {}
+        for entry in skipped:
+            reasons[entry['reason']] = reasons.get(entry['reason'], 0) + 1
+        for reason, count in reasons.items():
+            print(f"    {count} × {reason}")
+
+        touched = sorted({entry['basket_id'] for entry in applied})
+        revalidated = None
+        if applied:
+            # One write for the whole batch of fixes
+            write_json_atomic(baskets_file, data)
+            print(f"  Patched {baskets_file.name} ({len(touched)} baskets)")
+
+            print(f"\nRe-validating {len(touched)} fixed baskets...")
+            revalidated = validate_with_haiku(client, {bid: baskets[bid] for bid in touched},
+                                              chunk_tokens=args.chunk_tokens, workers=args.workers,
+                                              cache=cache, checkpoint=checkpoint, stream=args.stream)
+            if not revalidated:
+                print("\n❌ Re-validation failed")
+                sys.exit(1)
+
+            # Issues in untouched baskets stand; fixed baskets take their new verdicts
+            touched_ids = set(touched)
+            remaining = [i for i in issues if i.get('basket_id') not in touched_ids]
+            remaining.extend(revalidated.get('issues_found', []))
+            result['issues_found'] = remaining
+            result['summary'] = summarize_issues(remaining)
+            result['failed_chunks'] = result.get('failed_chunks', []) + revalidated.get('failed_chunks', [])
+            result['partial_chunks'] = result.get('partial_chunks', []) + revalidated.get('partial_chunks', [])
+
+        result['fixes'] = {
+            'applied': applied,
+            'skipped': skipped,
+            'revalidated_baskets': touched,
+            'revalidation_summary': revalidated.get('summary') if revalidated else None
+        }
+        write_json_atomic(course_dir / FIX_LOG_FILE, result['fixes'])
+        print(f"  Fix log saved: {FIX_LOG_FILE}")
+
+    checkpoint.close()
+    result['scheduler'] = client.metrics()
+    print(f"  Scheduler: {format_metrics(result['scheduler'])}")
+
     # Report results
     print(f"\n{'='*60}")
     print(f"VALIDATION RESULTS")
@@ -197,9 +771,17 @@ def main():
     print(f"  Malformed: {summary.get('malformed', 0)}")
     print(f"  Total: {summary.get('total_issues', 0)}")
 
+    if result.get('failed_chunks'):
+        failed = sum(len(chunk) for chunk in result['failed_chunks'])
+        print(f"\n⚠️  {len(result['failed_chunks'])} chunks ({failed} baskets) could not be validated")
+    if result.get('partial_chunks'):
+        partial = sum(len(chunk) for chunk in result['partial_chunks'])
+        print(f"\n⚠️  {len(result['partial_chunks'])} chunks ({partial} baskets) were only partly validated "
+              f"(response cut off)")
+
     issues = result.get('issues_found', [])
 
-    if issues:
+    if issues or result.get('failed_chunks') or result.get('partial_chunks'):
         print(f"\n⚠️  QUALITY GATE: FAILED")
         print(f"\nFirst 10 issues:")
         for issue in issues[:10]:
@@ -214,9 +796,8 @@ def main():
             json.dump(result, f, ensure_ascii=False, indent=2)
         print(f"\n📄 Full report saved: {report_file.name}")
 
-        if args.fix:
-            print(f"\n🔧 FIX mode enabled - but auto-fix not implemented yet")
-            print(f"   Use the report to manually fix or run a separate Haiku fix script")
+        if args.fix and result.get('fixes'):
+            print(f"\n🔧 {len(result['fixes']['applied'])} fixes applied - the issues above are what remains")
 
         print(f"\n❌ Quality gate FAILED - fix issues before generating manifest")
         sys.exit(1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+LLM Canned Answers - deterministic stand-ins for the model's answers
+
+Shared by the offline mock client in haiku_quality_gate.py (--mock) and
+fake_llm_server.py, so both answer the tools' prompts the same way:
+- quality gate chunks: empty phrases are flagged as malformed
+- swap hunter pair batches: every pair is in [English, Spanish] order
+"""
+
+import json
+import re
+
+PAIR_INDEX_PATTERN = re.compile(r'^\[(\d+)\]', re.MULTILINE)
+
+def answer_validation(prompt: str) -> dict:
+    """Quality gate answer for a chunk prompt: empty phrases are malformed"""
+    data = prompt.split('DATA TO VALIDATE:\n', 1)[1].split('\n\nCHECK FOR:', 1)[0]
+    baskets = json.loads(data)
+
+    phrases = 0
+    issues = []
+    for basket_id, basket in baskets.items():
+        for i, phrase in enumerate(basket.get('practice_phrases', [])):
+            phrases += 1
+            if isinstance(phrase, (list, tuple)) and len(phrase) >= 2 and (not phrase[0] or not phrase[1]):
+                issues.append({
+                    "basket_id": basket_id,
+                    "phrase_index": i,
+                    "issue_type": "malformed",
+                    "current_value": phrase[:2],
+                    "suggested_fix": phrase[:2],
+                    "severity": "high",
+                    "explanation": "empty value"
+                })
+
+    return {
+        "total_baskets_checked": len(baskets),
+        "total_phrases_checked": phrases,
+        "issues_found": issues,
+        "summary": {"grammar_errors": 0, "swaps": 0, "malformed": len(issues), "total_issues": len(issues)}
+    }
+
+def answer_pairs(prompt: str) -> list:
+    """Swap hunter answer for a pair batch prompt: nothing is swapped"""
+    pairs = prompt.split('Pairs:\n', 1)[1].split('\n\nRespond with', 1)[0]
+    return [{"index": int(index), "english_index": 0, "spanish_index": 1,
+             "confidence": "high", "reasoning": "fake server"}
+            for index in PAIR_INDEX_PATTERN.findall(pairs)]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+LLM Checkpoint Log - append-only record of finished model requests
+
+Each completed chunk (quality gate) or batch (swap hunter) is appended
+to a JSONL log in the course directory as soon as its result arrives, so
+a run that dies partway loses at most the requests in flight. With
+resume=True the log is read back first: finished chunks are skipped and
+the final report is assembled from the logged results.
+
+Chunks are keyed by content (model, prompt version and the exact chunk
+sent, see llm_verdict_cache.make_key), so a resumed run only reuses a
+result when it would have sent the same request.
+
+Log records, one JSON object per line:
+  {"type": "run", "started_at": ..., "resume": true, ...}
+  {"type": "chunk", "key": ..., "result": ..., "at": ..., ...}
+  {"type": "failed", "key": ..., "error": ..., "at": ..., ...}
+
+Usage:
+  checkpoint = CheckpointLog(course_dir / 'haiku_quality_gate_checkpoint.jsonl', resume=args.resume)
+  if key not in checkpoint:
+      checkpoint.record(key, validate(chunk))
+  results = [checkpoint.get(key) for key in keys if key in checkpoint]
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+class CheckpointLog:
+    def __init__(self, path: Path, resume: bool = False, **run_info):
+        self.path = Path(path)
+        self.completed = {}
+        self.failed = {}
+        self.resumed = 0
+        self._lock = threading.Lock()
+
+        torn = False
+        if resume and self.path.exists():
+            torn = self._load()
+            self.resumed = len(self.completed)
+
+        # A fresh run starts a new log; a resumed run keeps appending
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if torn:
+            # Terminate the partial line a killed run left behind
+            self._file.write('\n')
+        self._write(dict({'type': 'run', 'started_at': time.time(), 'resume': resume}, **run_info))
+
+    def _load(self) -> bool:
+        """Read finished chunks from an existing log; True if its last line is torn"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+        for line in text.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('type') == 'chunk':
+                self.completed[record['key']] = record['result']
+                self.failed.pop(record['key'], None)
+            elif record.get('type') == 'failed':
+                self.failed[record['key']] = record.get('error')
+
+        return bool(text) and not text.endswith('\n')
+
+    def _write(self, record: dict):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.completed
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.completed.get(key)
+
+    def record(self, key: str, result: Any, **meta):
+        """Log a finished chunk's result"""
+        self._write(dict({'type': 'chunk', 'key': key, 'result': result, 'at': time.time()}, **meta))
+        self.completed[key] = result
+        self.failed.pop(key, None)
+
+    def record_failure(self, key: str, error: str, **meta):
+        """Log a chunk that gave up (a resumed run tries it again)"""
+        self._write(dict({'type': 'failed', 'key': key, 'error': error, 'at': time.time()}, **meta))
+        self.failed[key] = error
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+LLM JSON - tolerant, incremental JSON extraction from model responses
+
+Model responses are JSON wrapped in whatever the model felt like adding:
+code fences, a sentence of preamble, trailing notes - or cut off when the
+output hits max_tokens or the connection drops. Dropping fence lines and
+calling json.loads throws the whole (paid for) response away in all of
+those cases.
+
+JSONItemExtractor scans text incrementally and returns each complete
+element of one JSON array as soon as its closing bracket arrives - the
+"issues_found" array of the quality gate's object, or the swap hunter's
+top-level verdict array. Feed it streamed text deltas to act on items
+before the response finishes; whatever was complete when the text ended
+is salvaged.
+
+parse_response() is the one-shot form: the longest complete JSON value
+in the text, otherwise the array items salvaged from a cut-off one.
+
+Usage:
+  value, complete = parse_response(message.content[0].text, array_key='issues_found')
+
+  extractor = JSONItemExtractor('issues_found')
+  text, error = read_stream(client.messages.create(..., stream=True), extractor, on_item=handle)
+
+The examples in parse_response() run with: python3 -m doctest llm_json.py
+"""
+
+import json
+import re
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+FENCE_PATTERN = re.compile(r'^\s*```[\w-]*\s*$', re.MULTILINE)
+
+# Sent by llm_scheduler when it retries a stream that broke off partway
+RESTART_EVENT = 'stream_restart'
+
+class JSONItemExtractor:
+    """
+    Incrementally extract the elements of one array from a JSON response
+
+    array_key names the array inside the top-level object; None means the
+    top-level value is itself the array. Text before the first { or [
+    (fences, preamble) is skipped. feed() returns the elements completed
+    by the new text; all completed elements so far are in .items.
+    """
+
+    def __init__(self, array_key: str = None):
+        self.array_key = array_key
+        self.reset()
+
+    def reset(self):
+        """Forget everything fed so far (the response is starting over)"""
+        self.items = []
+        self._item_chars = None
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_chars = None
+        self._last_string = None
+        self._last_significant = None
+        self._target_depth = None
+
+    def feed(self, text: str) -> List[Any]:
+        completed = []
+
+        for char in text:
+            if self._item_chars is not None:
+                self._item_chars.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = ''.join(self._string_chars) if self._string_chars is not None else None
+                    self._string_chars = None
+                    self._last_significant = '"'
+                elif self._string_chars is not None:
+                    self._string_chars.append(char)
+                continue
+
+            if not self._started:
+                if char not in '{[':
+                    continue
+                self._started = True
+
+            if char == '"':
+                self._in_string = True
+                # Only keys of the top-level object are worth remembering
+                self._string_chars = [] if self._depth == 1 else None
+            elif char in '{[':
+                opens_target = (self._target_depth is None and char == '[' and (
+                    (self.array_key is None and self._depth == 0) or
+                    (self.array_key is not None and self._depth == 1 and self._last_significant == ':'
+                     and self._last_string == self.array_key)))
+                if self._target_depth is not None and self._depth == self._target_depth:
+                    self._item_chars = [char]
+                self._depth += 1
+                if opens_target:
+                    self._target_depth = self._depth
+                self._last_significant = char
+            elif char in '}]':
+                self._depth -= 1
+                if self._target_depth is not None and self._depth == self._target_depth and self._item_chars is not None:
+                    item_text = ''.join(self._item_chars)
+                    self._item_chars = None
+                    try:
+                        item = json.loads(item_text)
+                    except json.JSONDecodeError:
+                        pass
+                    else:
+                        self.items.append(item)
+                        completed.append(item)
+                elif self._target_depth is not None and self._depth < self._target_depth:
+                    # The target array has closed
+                    self._target_depth = -1
+                self._last_significant = char
+            elif not char.isspace():
+                self._last_significant = char
+
+        return completed
+
+def strip_fences(text: str) -> str:
+    return FENCE_PATTERN.sub('', text)
+
+def closing_index(text: str, start: int) -> Optional[int]:
+    """Index just past the bracket closing the one at start, None if the text ends first"""
+    depth = 0
+    in_string = escape = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return None
+
+def parse_response(text: str, array_key: str = None) -> Tuple[Optional[Any], bool]:
+    """
+    Best-effort JSON from a model response: (value, complete)
+
+    Every { or [ is a candidate start; brackets in the preamble that are
+    not JSON (or are small JSON values) don't stop the scan. The longest
+    complete JSON value wins and is returned with complete=True - unless
+    a candidate running to the end of the text without closing is longer,
+    in which case the response was cut off and the complete elements of
+    the expected array are salvaged from it - as {array_key: items} or a
+    bare list - with complete=False. (None, False) if nothing could be
+    recovered.
+
+    >>> parse_response('Note [x]: [{"a": 1}]')
+    ([{'a': 1}], True)
+    >>> parse_response('Results for [S0001L01..S0002L01]: {"issues_found": []}', 'issues_found')
+    ({'issues_found': []}, True)
+    >>> parse_response('See [1]: [{"a": 1}, {"b": 2}, {"c"')
+    ([{'a': 1}, {'b': 2}], False)
+    """
+    text = strip_fences(text or '')
+    decoder = json.JSONDecoder()
+
+    best = None
+    best_span = 0
+    truncated_at = None
+    start = 0
+    while True:
+        start = min((index for index in (text.find('{', start), text.find('[', start)) if index >= 0),
+                    default=-1)
+        if start < 0:
+            break
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            if closing_index(text, start) is None:
+                # Runs to the end of the text: everything after is inside it
+                truncated_at = start
+                break
+            start += 1
+            continue
+        if end - start > best_span:
+            best, best_span = value, end - start
+        start = end
+
+    if truncated_at is not None and len(text) - truncated_at > best_span:
+        extractor = JSONItemExtractor(array_key)
+        extractor.feed(text[truncated_at:])
+        if extractor.items:
+            if array_key is None:
+                return extractor.items, False
+            return {array_key: extractor.items}, False
+    if best_span:
+        return best, True
+    return None, False
+
+def stream_text(events: Iterable) -> Iterable[str]:
+    """Text deltas from a streamed Messages API response"""
+    for event in events:
+        if getattr(event, 'type', None) == 'content_block_delta':
+            text = getattr(getattr(event, 'delta', None), 'text', None)
+            if text:
+                yield text
+
+def read_stream(events: Iterable, extractor: JSONItemExtractor = None,
+                on_item: Callable[[Any], None] = None) -> Tuple[str, Optional[Exception]]:
+    """
+    Consume a streamed response, feeding the extractor as text arrives
+
+    on_item is called for each array element the moment it completes.
+    When the stream restarts (a retried request), the text and extractor
+    start over and on_item is only called again once the new response
+    gets past the number of items already reported. Returns (full text
+    received, error) - a stream that breaks off returns the text so far
+    and the error instead of raising.
+    """
+    parts = []
+    reported = 0
+    try:
+        for event in events:
+            if getattr(event, 'type', None) == RESTART_EVENT:
+                parts = []
+                if extractor is not None:
+                    extractor.reset()
+                continue
+            for text in stream_text([event]):
+                parts.append(text)
+                if extractor is not None:
+                    for item in extractor.feed(text):
+                        if len(extractor.items) > reported:
+                            reported = len(extractor.items)
+                            if on_item is not None:
+                                on_item(item)
+    except Exception as e:
+        return ''.join(parts), e
+    return ''.join(parts), None
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+LLM Scheduler - rate-limit-aware wrapper shared by the model-based tools
+
+Wraps an Anthropic-style client (anything with messages.create) and
+enforces, across all threads using it:
+- a requests-per-minute budget
+- a tokens-per-minute budget (input estimate + max_tokens reserved up
+  front, settled against the response's usage once it arrives)
+- a bounded window of in-flight requests
+- retries with full-jitter exponential backoff on rate limits, overload
+  and connection errors (honouring retry-after when the API sends one)
+
+Latency and throughput are tracked and available from metrics().
+
+Streamed requests (stream=True) return a generator over the stream's
+events that holds its in-flight slot until the stream has been read to
+the end (or closed), and settles the token reservation from the usage in
+the message_start / message_delta events. A stream that breaks off with
+a retryable error is requested again; if events had already been
+delivered, a {"type": "stream_restart"} event comes first so the reader
+can drop what it collected (llm_json.read_stream does).
+
+The scheduler exposes the same messages.create interface as the client,
+so tools pass it wherever they used the client. Build the real client
+with max_retries=0 so retries are not done twice.
+
+rpm or tpm None means no such budget (e.g. for an offline mock client).
+
+Usage:
+  client = LLMScheduler(Anthropic(api_key=key, max_retries=0), rpm=50, tpm=50000)
+  message = client.messages.create(model=MODEL, max_tokens=200, messages=[...])
+  print(format_metrics(client.metrics()))
+
+Test end to end against fake_llm_server.py (pass its URL as base_url).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+
+DEFAULT_RPM = 50
+DEFAULT_TPM = 50000
+DEFAULT_MAX_IN_FLIGHT = 4
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+WINDOW_SECONDS = 60.0
+
+# HTTP statuses worth retrying: timeout, conflict, rate limit, overload
+RETRYABLE_STATUSES = {408, 409, 429}
+
+# Event yielded when a broken stream is retried after delivering events
+RESTART_EVENT = 'stream_restart'
+
+def estimate_request_tokens(kwargs: dict) -> int:
+    """Tokens to reserve for a request: prompt estimate (~4 chars/token) + max_tokens"""
+    chars = len(kwargs.get('system', '') or '')
+    for message in kwargs.get('messages', []):
+        content = message.get('content', '')
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(block.get('text', '')) for block in content if isinstance(block, dict))
+    return chars // 4 + 1 + kwargs.get('max_tokens', 0)
+
+def error_status(exc: Exception) -> Optional[int]:
+    """HTTP status of an API error, or None for connection-level errors"""
+    status = getattr(exc, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(exc: Exception) -> bool:
+    status = error_status(exc)
+    if status is None:
+        # Connection errors and timeouts are transient; a bad call is not
+        return not isinstance(exc, (TypeError, ValueError, KeyError, AttributeError))
+    return status in RETRYABLE_STATUSES or status >= 500
+
+def retry_after(exc: Exception) -> Optional[float]:
+    """Seconds the API asked us to wait, if it said"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get('retry-after')))
+    except (TypeError, ValueError):
+        return None
+
+def stream_usage(event, usage: SimpleNamespace):
+    """Collect input/output token counts from a streamed event into usage"""
+    event_type = getattr(event, 'type', None)
+    if event_type == 'message_start':
+        reported = getattr(getattr(event, 'message', None), 'usage', None)
+    elif event_type == 'message_delta':
+        reported = getattr(event, 'usage', None)
+    else:
+        return
+    for field in ('input_tokens', 'output_tokens'):
+        value = getattr(reported, field, None)
+        if isinstance(value, int):
+            setattr(usage, field, value)
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class LLMScheduler:
+    def __init__(self, client, rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_cap: float = BACKOFF_CAP, seed: int = None):
+        self.client = client
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._random = random.Random(seed)
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._budget = threading.Condition()
+        # Requests sent in the last minute: [sent_at, tokens]
+        self._window = deque()
+
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._counts = {'requests': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'rate_limited': 0}
+        self._tokens = {'input': 0, 'output': 0}
+        self._throttled_seconds = 0.0
+        self._first_sent = None
+        self._last_done = None
+        self._active = 0
+        self._peak_in_flight = 0
+
+        self.messages = SimpleNamespace(create=self.create)
+
+    def _acquire_budget(self, tokens: int) -> list:
+        """Block until the minute window has room for one more request of tokens"""
+        waited_from = time.monotonic()
+        with self._budget:
+            while True:
+                now = time.monotonic()
+                while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+                    self._window.popleft()
+
+                used = sum(entry[1] for entry in self._window)
+                # An oversized request still goes through once the window is empty
+                if ((self.rpm is None or len(self._window) < self.rpm)
+                        and (self.tpm is None or used + tokens <= self.tpm or not self._window)):
+                    entry = [now, tokens]
+                    self._window.append(entry)
+                    break
+
+                self._budget.wait(timeout=max(0.01, self._window[0][0] + WINDOW_SECONDS - now))
+
+        waited = time.monotonic() - waited_from
+        with self._lock:
+            self._throttled_seconds += waited
+        return entry
+
+    def _settle(self, entry: list, usage):
+        """Replace a request's reserved tokens with what it actually used"""
+        input_tokens = getattr(usage, 'input_tokens', None)
+        output_tokens = getattr(usage, 'output_tokens', None)
+        if not isinstance(input_tokens, int) or not isinstance(output_tokens, int):
+            return
+
+        with self._budget:
+            entry[1] = input_tokens + output_tokens
+            self._budget.notify_all()
+        with self._lock:
+            self._tokens['input'] += input_tokens
+            self._tokens['output'] += output_tokens
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        requested = retry_after(exc)
+        if requested is not None:
+            return min(requested, self.backoff_cap)
+        # Full jitter: uniform over [0, base * 2^attempt]
+        return self._random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _begin(self, tokens: int) -> list:
+        """Take an in-flight slot and budget for one attempt; returns its window entry"""
+        self._in_flight.acquire()
+        try:
+            entry = self._acquire_budget(tokens)
+        except BaseException:
+            self._in_flight.release()
+            raise
+
+        with self._lock:
+            self._counts['requests'] += 1
+            self._active += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._active)
+            if self._first_sent is None:
+                self._first_sent = time.monotonic()
+        return entry
+
+    def _end(self):
+        with self._lock:
+            self._active -= 1
+            self._last_done = time.monotonic()
+        self._in_flight.release()
+
+    def _succeeded(self, entry: list, usage, latency: float):
+        self._settle(entry, usage)
+        with self._lock:
+            self._counts['succeeded'] += 1
+            self._latencies.append(latency)
+
+    def _retry_or_raise(self, attempt: int, error: Exception):
+        """Count a failed attempt; raise it if it is final, else wait out the backoff"""
+        with self._lock:
+            if error_status(error) == 429:
+                self._counts['rate_limited'] += 1
+            if attempt == self.max_retries or not is_retryable(error):
+                self._counts['failed'] += 1
+                raise error
+            self._counts['retries'] += 1
+
+        time.sleep(self._backoff(attempt, error))
+
+    def create(self, **kwargs):
+        """messages.create with rate limiting, a bounded in-flight window and retries"""
+        tokens = estimate_request_tokens(kwargs)
+        if kwargs.get('stream'):
+            return self._create_stream(kwargs, tokens)
+
+        for attempt in range(self.max_retries + 1):
+            entry = self._begin(tokens)
+            started = time.monotonic()
+            try:
+                response = self.client.messages.create(**kwargs)
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            finally:
+                latency = time.monotonic() - started
+                self._end()
+
+            if error is None:
+                self._succeeded(entry, getattr(response, 'usage', None), latency)
+                return response
+
+            self._retry_or_raise(attempt, error)
+
+    def _create_stream(self, kwargs: dict, tokens: int):
+        """The events of a streamed request; each attempt holds its slot until read or closed"""
+        for attempt in range(self.max_retries + 1):
+            entry = self._begin(tokens)
+            started = time.monotonic()
+            usage = SimpleNamespace(input_tokens=None, output_tokens=None)
+            delivered = False
+            error = None
+            stream = None
+            try:
+                stream = self.client.messages.create(**kwargs)
+                for event in stream:
+                    stream_usage(event, usage)
+                    delivered = True
+                    yield event
+            except Exception as e:
+                error = e
+            finally:
+                close = getattr(stream, 'close', None)
+                if close is not None:
+                    close()
+                latency = time.monotonic() - started
+                self._end()
+
+            if error is None:
+                self._succeeded(entry, usage, latency)
+                return
+
+            self._retry_or_raise(attempt, error)
+            if delivered:
+                yield SimpleNamespace(type=RESTART_EVENT)
+
+    def metrics(self) -> dict:
+        """Request counts, latency percentiles and achieved throughput"""
+        with self._lock:
+            elapsed = (self._last_done - self._first_sent) if self._first_sent and self._last_done else 0.0
+            minutes = max(elapsed, 1e-9) / 60
+            return dict(self._counts,
+                        input_tokens=self._tokens['input'],
+                        output_tokens=self._tokens['output'],
+                        latency_p50=round(percentile(self._latencies, 0.50), 3),
+                        latency_p95=round(percentile(self._latencies, 0.95), 3),
+                        latency_max=round(max(self._latencies, default=0.0), 3),
+                        peak_in_flight=self._peak_in_flight,
+                        throttled_seconds=round(self._throttled_seconds, 3),
+                        elapsed_seconds=round(elapsed, 3),
+                        requests_per_minute=round(self._counts['requests'] / minutes, 1) if elapsed else 0.0,
+                        tokens_per_minute=round(sum(self._tokens.values()) / minutes, 1) if elapsed else 0.0)
+
+def format_metrics(metrics: dict) -> str:
+    return (f"{metrics['succeeded']}/{metrics['requests']} requests ok, "
+            f"{metrics['retries']} retries ({metrics['rate_limited']} rate limited), "
+            f"{metrics['failed']} failed | latency p50 {metrics['latency_p50']:.2f}s "
+            f"p95 {metrics['latency_p95']:.2f}s | {metrics['requests_per_minute']:.0f} req/min, "
+            f"{metrics['tokens_per_minute']:.0f} tok/min | peak {metrics['peak_in_flight']} in flight, "
+            f"{metrics['throttled_seconds']:.1f}s throttled")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+LLM Verdict Cache - content-addressed memo for model-based validators
+
+Verdicts are keyed by (model, prompt template version, normalized input),
+so re-running a validator on unchanged course data makes no API calls.
+Bumping a tool's prompt template version or switching model naturally
+misses the cache; entries older than the TTL are ignored and purged.
+
+Storage is a single SQLite file (stdlib only).
+
+Usage:
+  cache = VerdictCache(course_dir / 'llm_verdict_cache.sqlite')
+  verdict = cache.get(MODEL, PROMPT_VERSION, payload)
+  if verdict is None:
+      verdict = ask_model(payload)
+      cache.put(MODEL, PROMPT_VERSION, payload, verdict)
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_TTL_DAYS = 30
+
+def normalize_input(value: Any, collapse_whitespace: bool = False) -> Any:
+    """
+    NFC-normalize strings and strip outer whitespace, recursively
+
+    Inner whitespace is kept by default, so a phrase with a doubled or
+    stray space doesn't share a key with the clean phrase; validators
+    that don't judge formatting can set collapse_whitespace.
+    """
+    if isinstance(value, str):
+        value = unicodedata.normalize('NFC', value)
+        return ' '.join(value.split()) if collapse_whitespace else value.strip()
+    if isinstance(value, dict):
+        return {str(k): normalize_input(v, collapse_whitespace) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(v, collapse_whitespace) for v in value]
+    return value
+
+def make_key(model: str, template_version: str, payload: Any, collapse_whitespace: bool = False) -> str:
+    """Content address for a (model, template version, input) triple"""
+    encoded = json.dumps([model, template_version, normalize_input(payload, collapse_whitespace)],
+                         ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class VerdictCache:
+    def __init__(self, path: Path, ttl_days: float = DEFAULT_TTL_DAYS, collapse_whitespace: bool = False):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_days * 86400
+        self.collapse_whitespace = collapse_whitespace
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS verdicts (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                template_version TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                verdict TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, model: str, template_version: str, payload: Any) -> Optional[Any]:
+        """Cached verdict, or None on a miss or expired entry"""
+        row = self.conn.execute(
+            "SELECT created_at, verdict FROM verdicts WHERE key = ?",
+            (make_key(model, template_version, payload, self.collapse_whitespace),)
+        ).fetchone()
+
+        if row is None or time.time() - row[0] > self.ttl_seconds:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, model: str, template_version: str, payload: Any, verdict: Any):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO verdicts (key, model, template_version, created_at, verdict) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (make_key(model, template_version, payload, self.collapse_whitespace), model, template_version,
+             time.time(), json.dumps(verdict, ensure_ascii=False))
+        )
+        self.conn.commit()
+
+    def invalidate(self, model: str = None, template_version: str = None) -> int:
+        """Drop verdicts for a model and/or template version (everything if neither given)"""
+        clauses, params = [], []
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        if template_version is not None:
+            clauses.append("template_version = ?")
+            params.append(template_version)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        deleted = self.conn.execute(f"DELETE FROM verdicts{where}", params).rowcount
+        self.conn.commit()
+        return deleted
+
+    def purge_expired(self) -> int:
+        deleted = self.conn.execute(
+            "DELETE FROM verdicts WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,)
+        ).rowcount
+        self.conn.commit()
+        return deleted
+
+    def close(self):
+        self.conn.close()